@@ -6,12 +6,29 @@
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
-import sqlite3
-import os
 from datetime import datetime
-from itemadapter import ItemAdapter
 from scrapy.exceptions import DropItem 
+from sqlalchemy import create_engine, select, func
+from sqlalchemy.exc import SQLAlchemyError
 from src.services.ai_service import AIService
+from src.database import get_database_url, get_engine_options
+from src.models.scholarship import Scholarship
+from src.models.catalog_state import CatalogState
+from src.models.scholarship_facet import ScholarshipFacet
+from src.models.scholarship_constraint import ScholarshipConstraint
+from src.models.user import User
+from src.models.saved_search import SavedSearch
+from src.models.saved_search_term import SavedSearchTerm
+from src.models.notification import Notification
+from src.services.facets import sync_scholarship_facets
+from src.services.eligibility import sync_scholarship_constraints
+from src.services.query_cache import bump_catalog_version
+from src.services.upsert import upsert
+from src.services.deadlines import parse_deadline
+from src.services.semantic_index import semantic_index
+from src.services.index_snapshot import publish_snapshot
+from src.services.saved_search import PERCOLATE_BATCH_SIZE, percolate_and_notify
+from src.services.model_recording import RecordingMiss
 import json
 
 # Ensure the path for ai_service is correct if it's not a direct sibling of pipelines.py
@@ -21,63 +38,59 @@ try:
 except ImportError:
     BackendAIService = None # Fallback if not found
 
+# Columns refreshed when a scholarship is crawled again; source_website and
+# extracted_date keep the values from the first crawl
+UPDATE_COLUMNS = (
+    'title', 'description', 'provider_organization', 'deadline', 'deadline_date', 'country_info',
+    'level_of_study', 'field_of_study', 'eligibility', 'academic_requirements', 'cgpa_requirements',
+    'amount_benefits', 'application_link', 'contact_email', 'keywords'
+)
+
 class ScholarshipDatabasePipeline:
     def __init__(self):
-        # Path to app.db
-        self.db_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'app.db')
-        self.connection = None
-        self.cursor = None
+        # Same database the API reads from (DATABASE_URL / DATABASE_PATH)
+        self.database_url = get_database_url()
+        self.engine = None
+        self.table = Scholarship.__table__
         self.ai_service = AIService()
+        # Newly inserted scholarships waiting to be matched against saved searches
+        self.pending_alerts = []
 
     def open_spider(self, spider):
-        """Open database connection when spider starts"""
+        """Open database engine when spider starts"""
         try:
-            self.connection = sqlite3.connect(self.db_path)
-            self.cursor = self.connection.cursor()
+            self.engine = create_engine(self.database_url, **get_engine_options(self.database_url))
             
-            # Create table if it doesn't exist
+            # Create tables if they don't exist
             self.create_table()
-            spider.logger.info(f"Connected to database: {self.db_path}")
+            spider.logger.info(f"Connected to database: {self.engine.url.render_as_string(hide_password=True)}")
             
         except Exception as e:
             spider.logger.error(f"Error connecting to database: {e}")
             raise
 
     def close_spider(self, spider):
-        """Close database connection when spider finishes"""
-        if self.connection:
-            self.connection.close()
+        """Send pending alerts and publish a new index snapshot for API workers, then dispose of pooled connections"""
+        if self.engine:
+            self.flush_alerts(spider)
+            try:
+                with self.engine.connect() as connection:
+                    name = publish_snapshot(connection)
+                spider.logger.info(f"Published index snapshot {name}")
+            except Exception as e:
+                spider.logger.error(f"Publishing index snapshot failed: {e}")
+            self.engine.dispose()
             spider.logger.info("Database connection closed")
 
     def create_table(self):
-        """Create scholarships table if it doesn't exist"""
-        create_table_query = """
-        CREATE TABLE IF NOT EXISTS scholarships (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT NOT NULL,
-            description TEXT,
-            provider_organization TEXT,
-            deadline TEXT,
-            country_info TEXT,
-            level_of_study TEXT,
-            field_of_study TEXT,
-            eligibility TEXT,
-            academic_requirements TEXT,
-            cgpa_requirements TEXT,
-            amount_benefits TEXT,
-            application_link TEXT,
-            contact_email TEXT,
-            keywords TEXT,
-            source_url TEXT UNIQUE,
-            source_website TEXT,
-            extracted_date TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        """Create the scholarship, catalog and alerting tables from the API models if they don't exist"""
+        Scholarship.metadata.create_all(
+            self.engine,
+            tables=[
+                self.table, ScholarshipFacet.__table__, ScholarshipConstraint.__table__, CatalogState.__table__,
+                User.__table__, SavedSearch.__table__, SavedSearchTerm.__table__, Notification.__table__
+            ]
         )
-        """
-        
-        self.cursor.execute(create_table_query)
-        self.connection.commit()
 
     def process_item(self, item, spider):
         """Process each scraped item, clean with AI and save to database"""
@@ -93,10 +106,12 @@ class ScholarshipDatabasePipeline:
         cleaned_data = None
         if BackendAIService:
             try:
-                ai_service_instance = BackendAIService()
+                ai_service_instance = self.ai_service
                 spider.logger.info(f"Calling AI Service to clean data for: {adapter.get('title')}")
                 cleaned_data = ai_service_instance.clean_scholarship_data(dict(item))
                 spider.logger.info(f"AI Service cleaned data successfully for: {adapter.get('title')}")
+            except RecordingMiss:
+                raise  # AI_RECORD_MODE=strict: a missing recording fails the item instead of storing raw data
             except Exception as e:
                 spider.logger.error(f"AI Service cleaning failed for {adapter.get('title')}: {e}")
                 cleaned_data = dict(item) # Fallback to raw item if AI cleaning fails
@@ -112,103 +127,90 @@ class ScholarshipDatabasePipeline:
             if isinstance(cleaned_data[key], list):
                 cleaned_data[key] = str(cleaned_data[key]) # Convert lists to strings for DB storage
                 
-        # Check if scholarship already exists (avoid duplicates)
-        check_query = "SELECT id FROM scholarships WHERE source_url = ?"
-        self.cursor.execute(check_query, (source_url,))
-        existing = self.cursor.fetchone()
-
         try:
-            if existing:
-                self.update_scholarship(cleaned_data, source_url, existing[0], spider)
-            else:
-                print('inserting--------------------------------------------------------------------------------')
-                self.insert_scholarship(cleaned_data, source_url, spider)
+            with self.engine.begin() as connection:
+                # Check if scholarship already exists (for logging; the upsert itself is race-safe)
+                existing = connection.execute(
+                    select(self.table.c.id).where(self.table.c.source_url == source_url)
+                ).first()
+                scholarship_id, record = self.save_scholarship(connection, cleaned_data, source_url)
+                bump_catalog_version(connection)
+
+            # Only index rows that actually committed
+            self.index_scholarship(scholarship_id, record, spider)
+            if not existing:
+                self.pending_alerts.append((scholarship_id, record))
+                if len(self.pending_alerts) >= PERCOLATE_BATCH_SIZE:
+                    self.flush_alerts(spider)
+
+            action = 'Updated existing' if existing else 'Inserted new'
+            spider.logger.info(f"{action} scholarship: {cleaned_data.get('title')}")
             return item
-        except sqlite3.Error as e:
+        except SQLAlchemyError as e:
             spider.logger.error(f"Database operation failed for {adapter.get('title')}: {e}")
-            self.connection.rollback()
             raise DropItem(f"Database error: {e}")
         except Exception as e:
             spider.logger.error(f"Unexpected error in process_item for {adapter.get('title')}: {e}")
             raise DropItem(f"Unexpected error: {e}")
-          
-    def insert_scholarship(self, cleaned_data, source_url, spider):
-        """Insert new scholarship record using cleaned data"""
-        insert_query = """
-        INSERT INTO scholarships (
-            title, description, provider_organization, deadline, country_info, level_of_study,
-            field_of_study, eligibility, academic_requirements, cgpa_requirements, amount_benefits, 
-            application_link, contact_email, keywords, source_url, source_website, extracted_date
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """
-        
-        values = (
-            cleaned_data.get('title'),
-            cleaned_data.get('description', ''), # Ensure description is handled
-            cleaned_data.get('provider_organization', ''),
-            cleaned_data.get('deadline', ''),
-            cleaned_data.get('country_info', ''),
-            cleaned_data.get('level_of_study', ''),
-            cleaned_data.get('field_of_study', ''),
-            cleaned_data.get('eligibility', ''),
-            cleaned_data.get('academic_requirements', ''),
-            cleaned_data.get('cgpa_requirements', ''),
-            cleaned_data.get('amount_benefits', ''),
-            cleaned_data.get('application_link', ''),
-            cleaned_data.get('contact_email', ''),
-            json.dumps(cleaned_data.get('keywords', [])) if cleaned_data.get('keywords') else '', # Store keywords as JSON string
-            source_url,
-            ItemAdapter(cleaned_data).get('source_website', ''),
-            datetime.now().isoformat()
-        )
-        
 
-        self.cursor.execute(insert_query, values)
-        self.connection.commit()
-        spider.logger.info(f"Inserted new scholarship: {cleaned_data.get('title')}")
-
-    def update_scholarship(self, cleaned_data, source_url, scholarship_id, spider):
-        """Update existing scholarship record"""
-        update_query = """
-        UPDATE scholarships SET
-            title = ?, description = ?, provider_organization = ?, deadline = ?, country_info = ?,
-            level_of_study = ?, field_of_study = ?, eligibility = ?, academic_requirements = ?,
-            cgpa_requirements = ?, amount_benefits = ?, application_link = ?, contact_email = ?,
-            keywords = ?, updated_at = CURRENT_TIMESTAMP
-        WHERE id = ?
-        """
-        
-        values = (
-            cleaned_data.get('title'),
-            cleaned_data.get('description', ''),
-            cleaned_data.get('provider_organization', ''),
-            cleaned_data.get('deadline', ''),
-            cleaned_data.get('country_info', ''),
-            cleaned_data.get('level_of_study', ''),
-            cleaned_data.get('field_of_study', ''),
-            cleaned_data.get('eligibility', ''),
-            cleaned_data.get('academic_requirements', ''),
-            cleaned_data.get('cgpa_requirements', ''),
-            cleaned_data.get('amount_benefits', ''),
-            cleaned_data.get('application_link', ''),
-            cleaned_data.get('contact_email', ''),
-            json.dumps(cleaned_data.get('keywords', [])) if cleaned_data.get('keywords') else '',
-            scholarship_id
+    def build_record(self, cleaned_data, source_url):
+        """Map cleaned item data onto scholarship columns"""
+        return {
+            'title': cleaned_data.get('title'),
+            'description': cleaned_data.get('description', ''), # Ensure description is handled
+            'provider_organization': cleaned_data.get('provider_organization', ''),
+            'deadline': cleaned_data.get('deadline', ''),
+            'deadline_date': parse_deadline(cleaned_data.get('deadline')),
+            'country_info': cleaned_data.get('country_info', ''),
+            'level_of_study': cleaned_data.get('level_of_study', ''),
+            'field_of_study': cleaned_data.get('field_of_study', ''),
+            'eligibility': cleaned_data.get('eligibility', ''),
+            'academic_requirements': cleaned_data.get('academic_requirements', ''),
+            'cgpa_requirements': cleaned_data.get('cgpa_requirements', ''),
+            'amount_benefits': cleaned_data.get('amount_benefits', ''),
+            'application_link': cleaned_data.get('application_link', ''),
+            'contact_email': cleaned_data.get('contact_email', ''),
+            'keywords': json.dumps(cleaned_data.get('keywords', [])) if cleaned_data.get('keywords') else '', # Store keywords as JSON string
+            'source_url': source_url,
+            'source_website': ItemAdapter(cleaned_data).get('source_website', ''),
+            'extracted_date': datetime.now().isoformat()
+        }
+
+    def save_scholarship(self, connection, cleaned_data, source_url):
+        """Insert or update a scholarship keyed on source_url, on any supported dialect"""
+        record = self.build_record(cleaned_data, source_url)
+        upsert(
+            connection,
+            self.table,
+            [record],
+            conflict_columns=['source_url'],
+            update_columns=UPDATE_COLUMNS,
+            extra_updates={'updated_at': func.current_timestamp()}
         )
-        
-        self.cursor.execute(update_query, values)
-        self.connection.commit()
-        spider.logger.info(f"Updated existing scholarship: {cleaned_data.get('title')}")
-        
-        # update the source_website and extracted_date if needed
-        # update_source_query = """
-        # UPDATE scholarships SET
-        #     source_website = ?, extracted_date = ?
-        # WHERE id = ?
-        # """
-        # update_values = (
-        #     ItemAdapter(cleaned_data).get('source_website', ''), # Get from original item if not in AI output
-        #     datetime.now().isoformat(), # Use current time for extracted_date
-        #     scholarship_id
-        # )
+        scholarship_id = connection.execute(
+            select(self.table.c.id).where(self.table.c.source_url == source_url)
+        ).scalar_one()
+        sync_scholarship_facets(connection, scholarship_id, record)
+        sync_scholarship_constraints(connection, scholarship_id, record)
+        return scholarship_id, record
+
+    def flush_alerts(self, spider):
+        """Match buffered new scholarships against saved searches and write notifications in one transaction"""
+        if not self.pending_alerts:
+            return
+        batch, self.pending_alerts = self.pending_alerts, []
+        try:
+            with self.engine.begin() as connection:
+                created = percolate_and_notify(connection, batch)
+            spider.logger.info(f"Saved-search alerts: {created} notifications for {len(batch)} new scholarships")
+        except Exception as e:
+            # Alerts are best effort; the scholarships themselves are already saved
+            spider.logger.error(f"Saved-search alerting failed for {len(batch)} scholarships: {e}")
 
+    def index_scholarship(self, scholarship_id, record, spider):
+        """Add or refresh the scholarship's vector in the semantic index"""
+        try:
+            semantic_index.upsert(scholarship_id, record)
+        except Exception as e:
+            # The index can be rebuilt from the table; never drop the item for it
+            spider.logger.error(f"Semantic index update failed for {record.get('title')}: {e}")
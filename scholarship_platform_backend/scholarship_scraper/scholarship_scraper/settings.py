@@ -34,9 +34,9 @@ ITEM_PIPELINES = {
 }
 
 # Database configuration
-DATABASE = {
-    'path': '../src/database/app.db',  # Path to SQLite database file, relative to scholarship_scraper dir
-}
+# The pipeline writes to the same database as the API: src/database/app.db,
+# or the file named by the DATABASE_PATH environment variable
+# (see src.database.get_database_path).
 
 # Configure AutoThrottle for better scraping behavior
 AUTOTHROTTLE_ENABLED = True
@@ -0,0 +1,205 @@
+"""
+Operational commands, run through the Flask CLI:
+
+    flask --app src.main recompute-recommendations --workers 8
+    flask --app src.main build-deadline-digest --days 7
+    flask --app src.main check-query-budgets --email student@example.com --password ...
+    flask --app src.main seed-data --scale 100k
+    flask --app src.main publish-index-snapshot
+    flask --app src.main load-test --users 50 --duration 60 --output load.json
+    flask --app src.main benchmark-ai --backend local --latency-ms 400 --concurrency 1,4,16
+    flask --app src.main prompt-budget-report --backend gemini --items 50
+"""
+import json
+import time
+
+import click
+from flask.cli import with_appcontext
+
+
+@click.command('recompute-recommendations')
+@click.option('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+@click.option('--shards', type=int, default=None, help='User shards; keep it fixed between a run and its resume')
+@click.option('--job', default=None, help='Job id for checkpoints (default: one per UTC day)')
+@click.option('--batch-size', type=int, default=None, help='Users scored per write and checkpoint')
+@click.option('--top-n', type=int, default=10, help='Matches kept per user')
+@click.option('--json', 'as_json', is_flag=True, help='Print the summary as JSON')
+def recompute_recommendations_command(workers, shards, job, batch_size, top_n, as_json):
+    """Recompute match scores for every user with the local scorer"""
+    from src.services.batch_recommend import BATCH_SIZE, recompute_all
+
+    summary = recompute_all(
+        workers=workers,
+        shards=shards,
+        job=job,
+        batch_size=batch_size or BATCH_SIZE,
+        top_n=top_n,
+        report=(lambda message: None) if as_json else click.echo
+    )
+    if as_json:
+        click.echo(json.dumps(summary, indent=2))
+
+
+@click.command('build-deadline-digest')
+@click.option('--days', type=int, default=None, help='Window of upcoming deadlines (default: DEADLINE_DIGEST_DAYS)')
+@with_appcontext
+def build_deadline_digest_command(days):
+    """Rebuild the upcoming-deadline digest the dashboard reads"""
+    from src.database import db
+    from src.services.deadline_digest import DIGEST_DAYS, build_deadline_digest
+
+    started = time.perf_counter()
+    with db.engine.begin() as connection:
+        rows = build_deadline_digest(connection, days=days or DIGEST_DAYS)
+    click.echo(f"Deadline digest: {rows} applications due within {days or DIGEST_DAYS} days "
+               f"({time.perf_counter() - started:.3f}s)")
+
+
+@click.command('check-query-budgets')
+@click.option('--email', required=True, help='Account the endpoints are requested as')
+@click.option('--password', required=True)
+@with_appcontext
+def check_query_budgets_command(email, password):
+    """Fail if a hot endpoint exceeds its SQL budget or shows an N+1 pattern"""
+    from flask import current_app
+    from src.services.query_budget import check_endpoint_budgets
+
+    client = current_app.test_client()
+    login = client.post('/api/auth/login', json={'email': email, 'password': password})
+    if login.status_code != 200:
+        raise click.ClickException(f"Login failed for {email}: {login.status_code}")
+
+    failed = False
+    for result in check_endpoint_budgets(client):
+        click.echo(f"{'FAIL' if result['error'] else 'ok  '} {result['queries']:>3}/{result['budget']:<3} "
+                   f"[{result['status']}] {result['path']}")
+        if result['error']:
+            failed = True
+            click.echo(result['error'])
+    if failed:
+        raise click.ClickException('Query budgets exceeded')
+
+
+@click.command('seed-data')
+@click.option('--scale', type=click.Choice(['1k', '10k', '100k', '1m'], case_sensitive=False), default='10k',
+              help='Preset sizes; --users/--scholarships/--applications-per-user override it')
+@click.option('--users', type=int, default=None)
+@click.option('--scholarships', type=int, default=None)
+@click.option('--applications-per-user', type=int, default=None)
+@click.option('--seed', type=int, default=42, help='Random seed, for reproducible data')
+@click.option('--build-index/--no-build-index', default=True, help='Rebuild the semantic index and publish a snapshot')
+@with_appcontext
+def seed_data_command(scale, users, scholarships, applications_per_user, seed, build_index):
+    """Bulk-insert synthetic users, scholarships and applications for scale testing"""
+    from src.database import db
+    from src.services.seed import SCALES, seed_database
+
+    preset_users, preset_scholarships, preset_applications = SCALES[scale.lower()]
+    summary = seed_database(
+        db.engine,
+        users=preset_users if users is None else users,
+        scholarships=preset_scholarships if scholarships is None else scholarships,
+        applications_per_user=preset_applications if applications_per_user is None else applications_per_user,
+        seed=seed,
+        report=click.echo
+    )
+
+    if build_index:
+        from src.services.catalog_stream import iter_catalog
+        from src.services.index_snapshot import publish_snapshot
+        from src.services.semantic_index import EMBEDDED_COLUMNS, semantic_index
+
+        started = time.perf_counter()
+        count = semantic_index.build(iter_catalog(EMBEDDED_COLUMNS))
+        name = publish_snapshot(db.session)
+        click.echo(f"Indexed {count} scholarships and published snapshot {name} ({time.perf_counter() - started:.3f}s)")
+
+    click.echo(json.dumps(summary, indent=2))
+
+
+@click.command('publish-index-snapshot')
+@with_appcontext
+def publish_index_snapshot_command():
+    """Publish a snapshot of the semantic index and facet postings for API workers"""
+    from src.database import db
+    from src.services.index_snapshot import publish_snapshot
+
+    started = time.perf_counter()
+    name = publish_snapshot(db.session)
+    click.echo(f"Published index snapshot {name} ({time.perf_counter() - started:.3f}s)")
+
+
+@click.command('load-test')
+@click.option('--base-url', default='http://localhost:5000', help='Running API to load')
+@click.option('--users', type=int, default=20, help='Concurrent virtual users (seeded accounts)')
+@click.option('--duration', type=float, default=30.0, help='Measured seconds')
+@click.option('--warmup', type=float, default=5.0, help='Seconds of traffic before measuring')
+@click.option('--first-user', type=int, default=1, help='Number of the first seeded account to use')
+@click.option('--seed', type=int, default=1, help='Random seed for the request mix')
+@click.option('--output', default=None, help='Also write the JSON results to this file')
+def load_test_command(base_url, users, duration, warmup, first_user, seed, output):
+    """Run the HTTP load-test mix against a local server and report latency percentiles as JSON"""
+    from src.services.load_test import run_load_test, write_results
+
+    result = run_load_test(base_url, users=users, duration=duration, warmup=warmup,
+                           first_user=first_user, seed=seed, report=lambda message: click.echo(message, err=True))
+    click.echo(write_results(result, output))
+
+
+@click.command('benchmark-ai')
+@click.option('--backend', type=click.Choice(['local', 'gemini']), default='local', show_default=True)
+@click.option('--latency-ms', type=float, default=None, help='Local backend latency per call (default: LOCAL_MODEL_LATENCY_MS)')
+@click.option('--jitter-ms', type=float, default=None, help='Local backend random extra latency')
+@click.option('--error-rate', type=float, default=None, help='Share of local backend calls that fail')
+@click.option('--concurrency', default='1,4,16', show_default=True, help='Comma-separated concurrency levels')
+@click.option('--profiles', type=int, default=16, show_default=True, help='Recommendation requests per level')
+@click.option('--catalog-size', type=int, default=20, show_default=True, help='Scholarships scored per recommendation')
+@click.option('--items', type=int, default=64, show_default=True, help='Items cleaned per level')
+@click.option('--seed', type=int, default=1, show_default=True)
+@click.option('--output', type=click.Path(dir_okay=False, writable=True), default=None, help='Also write the JSON here')
+def benchmark_ai_command(backend, latency_ms, jitter_ms, error_rate, concurrency, profiles, catalog_size, items, seed,
+                         output):
+    """Measure recommendation and cleaning throughput through AIService at several concurrency levels"""
+    from src.services.ai_benchmark import run_ai_benchmark
+    from src.services.load_test import write_results
+    from src.services.model_backends import get_backend, local_backend_from_env
+
+    if backend == 'local':
+        model = local_backend_from_env()
+        model.latency_ms = model.latency_ms if latency_ms is None else latency_ms
+        model.jitter_ms = model.jitter_ms if jitter_ms is None else jitter_ms
+        model.error_rate = model.error_rate if error_rate is None else error_rate
+    else:
+        model = get_backend('gemini')
+
+    levels = [int(level) for level in concurrency.split(',') if level.strip()]
+    result = run_ai_benchmark(model, levels, profiles=profiles, catalog_size=catalog_size, items=items, seed=seed,
+                              report=lambda message: click.echo(message, err=True))
+    click.echo(write_results(result, output))
+
+
+@click.command('prompt-budget-report')
+@click.option('--backend', type=click.Choice(['local', 'gemini']), default='local', show_default=True)
+@click.option('--items', type=int, default=100, show_default=True, help='Fixture items cleaned both ways')
+@click.option('--seed', type=int, default=1, show_default=True)
+@click.option('--output', type=click.Path(dir_okay=False, writable=True), default=None, help='Also write the JSON here')
+def prompt_budget_report_command(backend, items, seed, output):
+    """Compare prompt size, latency and extracted fields for whole-item and budgeted cleaning prompts"""
+    from src.services.ai_benchmark import prompt_budget_report
+    from src.services.load_test import write_results
+    from src.services.model_backends import get_backend
+
+    result = prompt_budget_report(get_backend(backend), items=items, seed=seed,
+                                  report=lambda message: click.echo(message, err=True))
+    click.echo(write_results(result, output))
+
+
+def register_commands(app):
+    app.cli.add_command(recompute_recommendations_command)
+    app.cli.add_command(build_deadline_digest_command)
+    app.cli.add_command(check_query_budgets_command)
+    app.cli.add_command(seed_data_command)
+    app.cli.add_command(publish_index_snapshot_command)
+    app.cli.add_command(load_test_command)
+    app.cli.add_command(benchmark_ai_command)
+    app.cli.add_command(prompt_budget_report_command)
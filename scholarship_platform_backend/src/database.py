@@ -1,12 +1,79 @@
 import os
+import sqlite3
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 
 db = SQLAlchemy()
 
+# One database file shared by the API and the crawler pipeline
+DEFAULT_DATABASE_PATH = os.path.join(os.path.dirname(__file__), 'database', 'app.db')
+
+# Applied to every new SQLite connection. WAL lets API readers keep reading
+# while the crawler writes; NORMAL sync is durable across app crashes in WAL
+# mode; busy_timeout makes concurrent writers wait instead of failing. It is
+# the only lock wait setting: pysqlite's connect timeout is left unset since
+# this pragma would override it on connect anyway.
+SQLITE_PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('cache_size', -64000),  # negative = KiB, so ~64 MB of page cache
+    ('mmap_size', 268435456),  # 256 MB
+    ('busy_timeout', 30000),  # ms
+    ('temp_store', 'MEMORY'),
+)
+
+def get_database_path():
+    """Path of the SQLite database file, overridable with DATABASE_PATH (ignored when DATABASE_URL is set)"""
+    return os.getenv('DATABASE_PATH', DEFAULT_DATABASE_PATH)
+
+def apply_sqlite_pragmas(dbapi_connection):
+    """Apply the shared concurrency and cache pragmas to a raw sqlite3 connection"""
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS:
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+def get_database_url():
+    """Database URL from DATABASE_URL, falling back to the shared SQLite file"""
+    url = os.getenv('DATABASE_URL')
+    if not url:
+        return f"sqlite:///{get_database_path()}"
+    # Heroku-style URLs use a scheme SQLAlchemy no longer accepts
+    if url.startswith('postgres://'):
+        url = 'postgresql://' + url[len('postgres://'):]
+    return url
+
+def get_engine_options(url):
+    """Connection pool settings shared by the API and the crawler pipeline"""
+    if url in ('sqlite://', 'sqlite:///:memory:'):
+        # In-memory databases live in a single connection; there is no pool to size
+        return {'connect_args': {'check_same_thread': False}}
+    options = {
+        'pool_size': int(os.getenv('DATABASE_POOL_SIZE', '10')),
+        'max_overflow': int(os.getenv('DATABASE_MAX_OVERFLOW', '20')),
+        'pool_recycle': int(os.getenv('DATABASE_POOL_RECYCLE', '1800')),
+        'pool_timeout': int(os.getenv('DATABASE_POOL_TIMEOUT', '30')),
+        'pool_pre_ping': True
+    }
+    if url.startswith('sqlite'):
+        # check_same_thread is off because pooled connections are handed
+        # between request threads
+        options['connect_args'] = {'check_same_thread': False}
+    return options
+
+@event.listens_for(Engine, 'connect')
+def _on_connect(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        apply_sqlite_pragmas(dbapi_connection)
+
 def init_db(app):
     """Initialize database with Flask app"""
-    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+    database_url = get_database_url()
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Pool sized for multi-threaded gunicorn workers
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = get_engine_options(database_url)
     
     db.init_app(app)
     
@@ -15,9 +82,26 @@ def init_db(app):
         from src.models.user import User
         from src.models.scholarship import Scholarship
         from src.models.application import Application
+        from src.models.catalog_state import CatalogState
+        from src.models.scholarship_facet import ScholarshipFacet
+        from src.models.scholarship_constraint import ScholarshipConstraint
+        from src.models.batch_checkpoint import BatchCheckpoint
+        from src.models.saved_search import SavedSearch
+        from src.models.saved_search_term import SavedSearchTerm
+        from src.models.notification import Notification
+        from src.models.deadline_digest import DeadlineDigest
+        from src.models.conversation import Conversation
+        from src.models.conversation_message import ConversationMessage
         
         db.create_all()
         
+        from src.migrations import run_migrations
+        run_migrations(db.engine)
+
+        if not CatalogState.query.get(1):
+            db.session.add(CatalogState(id=1, version=0))
+            db.session.commit()
+        
         # Create admin user if it doesn't exist
         admin_user = User.query.filter_by(email='admin@scholarsync.com').first()
         if not admin_user:
@@ -1,5 +1,5 @@
 import os, sqlite3, sys
-db_path = r"C:\Users\MJ\Desktop\scholarship_platform\\scholarship_platform_backend\\src\\database\\app.db"
+db_path = os.getenv('DATABASE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.db'))
 
 print("DB path:", db_path)
 print("Exists:", os.path.exists(db_path))
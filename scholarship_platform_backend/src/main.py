@@ -7,13 +7,19 @@ from flask_cors import CORS
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from src.database import init_db
+from src.cli import register_commands
 from src.routes.auth import auth_bp
 from src.routes.scholarships import scholarships_bp
 from src.routes.applications import applications_bp
 from src.routes.profile import profile_bp
 from src.routes.ai_assistant import ai_assistant_bp
+from src.routes.saved_searches import saved_searches_bp
+from src.routes.notifications import notifications_bp
+from src.routes.metrics import metrics_bp
+from src.services.metrics import init_metrics
 from src.services.scraper_service import ScraperService
 from src.models.scholarship import Scholarship
+from src.services.semantic_index import ensure_semantic_index
 
 def create_app():
     app = Flask(__name__)
@@ -38,10 +44,19 @@ def create_app():
     app.register_blueprint(applications_bp)
     app.register_blueprint(profile_bp)
     app.register_blueprint(ai_assistant_bp)
+    app.register_blueprint(saved_searches_bp)
+    app.register_blueprint(notifications_bp)
+    app.register_blueprint(metrics_bp)
+
+    # --- Request Metrics ---
+    init_metrics(app)
 
     # --- Initialize Database ---
     init_db(app)
 
+    # --- CLI Commands ---
+    register_commands(app)
+
     # --- Initial Scrape ---
     with app.app_context():
         if Scholarship.query.count() == 0:
@@ -51,6 +66,9 @@ def create_app():
             print("Initial scrape completed.")
         else:
             print(f"{Scholarship.query.count()} scholarships already in database.")
+        
+        # Build the semantic search index on first start; afterwards writers keep it current
+        ensure_semantic_index()
 
     return app
 
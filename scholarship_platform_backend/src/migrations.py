@@ -0,0 +1,147 @@
+"""
+Idempotent schema migrations for databases created before a model change.
+
+db.create_all() only creates missing tables, so indexes and columns added to
+existing tables are applied here. Each migration runs once and is recorded in
+the schema_migrations table.
+"""
+from sqlalchemy import bindparam, func, inspect, select, text
+
+
+# Application statuses in workflow order; any status not listed (a decision) ranks above them all
+APPLICATION_STATUS_ORDER = ['Draft', 'Submitted', 'Under Review', 'Awaiting Result']
+
+
+def _status_rank(status):
+    if status in APPLICATION_STATUS_ORDER:
+        return APPLICATION_STATUS_ORDER.index(status)
+    return len(APPLICATION_STATUS_ORDER) if status else -1
+
+
+def _merge_duplicate_applications(connection):
+    """
+    Collapse duplicate (user, scholarship) applications into one row: the most
+    advanced by status (oldest on a tie), with applied_date and
+    match_percentage filled from the others where it has none.
+    """
+    from src.models.application import Application
+
+    table = Application.__table__
+    pairs = connection.execute(
+        select(table.c.user_id, table.c.scholarship_id)
+        .group_by(table.c.user_id, table.c.scholarship_id)
+        .having(func.count() > 1)
+    ).all()
+
+    removed = 0
+    for user_id, scholarship_id in pairs:
+        rows = connection.execute(
+            select(table.c.id, table.c.status, table.c.applied_date, table.c.match_percentage)
+            .where(table.c.user_id == user_id, table.c.scholarship_id == scholarship_id)
+            .order_by(table.c.id)
+        ).all()
+        keeper = max(rows, key=lambda row: (_status_rank(row.status), -row.id))
+        others = [row for row in rows if row.id != keeper.id]
+        merged = {}
+        for column in ('applied_date', 'match_percentage'):
+            if getattr(keeper, column) is None:
+                filled = next((getattr(row, column) for row in others if getattr(row, column) is not None), None)
+                if filled is not None:
+                    merged[column] = filled
+        if merged:
+            connection.execute(table.update().where(table.c.id == keeper.id).values(**merged))
+        connection.execute(table.delete().where(table.c.id.in_([row.id for row in others])))
+        removed += len(others)
+
+    if removed:
+        print(f"Removed {removed} duplicate applications across {len(pairs)} user/scholarship pairs")
+    return removed
+
+
+def _application_indexes(connection):
+    from src.models.application import Application
+
+    # The unique index cannot be built while duplicate pairs exist
+    _merge_duplicate_applications(connection)
+    for index in Application.__table__.indexes:
+        index.create(connection, checkfirst=True)
+
+
+def _backfill_scholarship_facets(connection):
+    from src.services.catalog_stream import iter_catalog
+    from src.services.facets import FACETS, sync_scholarship_facets
+
+    columns = [column for column, _ in FACETS.values()]
+    for record in iter_catalog(columns, session=connection):
+        sync_scholarship_facets(connection, record['id'], record)
+
+
+def _compile_scholarship_constraints(connection):
+    from src.services.catalog_stream import iter_catalog
+    from src.services.eligibility import sync_scholarship_constraints
+
+    columns = ['title', 'level_of_study', 'cgpa_requirements', 'eligibility', 'academic_requirements']
+    for record in iter_catalog(columns, session=connection):
+        sync_scholarship_constraints(connection, record['id'], record)
+
+
+def _scholarship_deadline_date(connection):
+    from src.models.scholarship import Scholarship
+    from src.services.catalog_stream import iter_catalog
+    from src.services.deadlines import parse_deadline
+
+    table = Scholarship.__table__
+    columns = {column['name'] for column in inspect(connection).get_columns('scholarship')}
+    if 'deadline_date' not in columns:
+        connection.execute(text("ALTER TABLE scholarship ADD COLUMN deadline_date DATE"))
+    for index in table.indexes:
+        index.create(connection, checkfirst=True)
+
+    update = table.update().where(table.c.id == bindparam('row_id')).values(deadline_date=bindparam('parsed'))
+    batch = []
+    for record in iter_catalog(['deadline'], session=connection):
+        parsed = parse_deadline(record['deadline'])
+        if parsed:
+            batch.append({'row_id': record['id'], 'parsed': parsed})
+        if len(batch) >= 500:
+            connection.execute(update, batch)
+            batch = []
+    if batch:
+        connection.execute(update, batch)
+
+
+MIGRATIONS = [
+    ('0001_application_indexes', _application_indexes),
+    ('0002_backfill_scholarship_facets', _backfill_scholarship_facets),
+    # Re-derive facet rows with canonical taxonomy terms
+    ('0003_canonical_facet_terms', _backfill_scholarship_facets),
+    ('0004_compile_scholarship_constraints', _compile_scholarship_constraints),
+    ('0005_scholarship_deadline_date', _scholarship_deadline_date),
+    # Re-derive country terms now that "Latin America" and the like no longer resolve to a country
+    ('0006_qualified_country_facets', _backfill_scholarship_facets),
+    ('0007_qualified_country_constraints', _compile_scholarship_constraints),
+    # Recompile with negated nationality clauses skipped and test scores no longer read as CGPA
+    ('0008_negation_aware_constraints', _compile_scholarship_constraints),
+    # Recompile with gender set only by restrictive wording, not "women are encouraged"
+    ('0009_restrictive_gender_constraints', _compile_scholarship_constraints),
+    # Recompile with example and region-wide country lists left unknown
+    ('0010_partial_country_lists', _compile_scholarship_constraints),
+]
+
+
+def run_migrations(engine):
+    """Apply every migration not yet recorded in schema_migrations"""
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "id VARCHAR(100) PRIMARY KEY, applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+        ))
+        applied = {row[0] for row in connection.execute(text("SELECT id FROM schema_migrations"))}
+
+    for migration_id, migrate in MIGRATIONS:
+        if migration_id in applied:
+            continue
+        with engine.begin() as connection:
+            migrate(connection)
+            connection.execute(text("INSERT INTO schema_migrations (id) VALUES (:id)"), {'id': migration_id})
+        print(f"Applied migration {migration_id}")
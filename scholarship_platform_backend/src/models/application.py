@@ -2,6 +2,14 @@ from src.database import db
 from datetime import datetime
 
 class Application(db.Model):
+    __table_args__ = (
+        # One application per user and scholarship; also serves user_id-only lookups
+        db.Index('ix_application_user_scholarship', 'user_id', 'scholarship_id', unique=True),
+        db.Index('ix_application_user_status', 'user_id', 'status'),
+        db.Index('ix_application_user_match', 'user_id', 'match_percentage'),
+        db.Index('ix_application_scholarship_id', 'scholarship_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     scholarship_id = db.Column(db.Integer, db.ForeignKey('scholarship.id'), nullable=False)
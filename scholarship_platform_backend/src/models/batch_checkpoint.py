@@ -0,0 +1,15 @@
+from src.database import db
+
+class BatchCheckpoint(db.Model):
+    """Progress of one shard of a batch job, so an interrupted run resumes where it stopped"""
+    __tablename__ = 'batch_checkpoint'
+
+    job = db.Column(db.String(100), primary_key=True)  # e.g. recompute-recommendations:2026-10-19
+    shard = db.Column(db.Integer, primary_key=True)
+    last_id = db.Column(db.Integer, nullable=False, default=0)  # Last processed row id in this shard
+    processed = db.Column(db.Integer, nullable=False, default=0)
+    finished = db.Column(db.Boolean, nullable=False, default=False)
+    updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
+
+    def __repr__(self):
+        return f'<BatchCheckpoint {self.job}#{self.shard} @{self.last_id}>'
@@ -0,0 +1,11 @@
+from src.database import db
+
+class CatalogState(db.Model):
+    __tablename__ = 'catalog_state'
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)  # Bumped on every scholarship write
+    updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
+
+    def __repr__(self):
+        return f'<CatalogState v{self.version}>'
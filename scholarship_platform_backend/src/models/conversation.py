@@ -0,0 +1,29 @@
+from src.database import db
+from datetime import datetime
+
+class Conversation(db.Model):
+    """An assistant chat; turns older than the context window are folded into summary"""
+    __table_args__ = (
+        db.Index('ix_conversation_user_updated', 'user_id', 'updated_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    title = db.Column(db.String(255))
+    summary = db.Column(db.Text)  # Rolling summary of every message up to summarized_through
+    summarized_through = db.Column(db.Integer, nullable=False, default=0)  # Last conversation_message.id in summary
+    message_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'title': self.title,
+            'message_count': self.message_count,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def __repr__(self):
+        return f'<Conversation {self.id} user={self.user_id}>'
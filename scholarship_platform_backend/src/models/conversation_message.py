@@ -0,0 +1,26 @@
+from src.database import db
+from datetime import datetime
+
+class ConversationMessage(db.Model):
+    __tablename__ = 'conversation_message'
+    __table_args__ = (
+        db.Index('ix_conversation_message_conversation', 'conversation_id', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    conversation_id = db.Column(db.Integer, db.ForeignKey('conversation.id', ondelete='CASCADE'), nullable=False)
+    role = db.Column(db.String(20), nullable=False)  # 'user' or 'assistant'
+    content = db.Column(db.Text, nullable=False)
+    tokens = db.Column(db.Integer, nullable=False, default=0)  # Estimated, for windowing
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'role': self.role,
+            'content': self.content,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+    def __repr__(self):
+        return f'<ConversationMessage {self.id} {self.role}>'
@@ -0,0 +1,17 @@
+from src.database import db
+
+class DeadlineDigest(db.Model):
+    """Precomputed unsubmitted applications closing soon, rebuilt by the digest job"""
+    __tablename__ = 'deadline_digest'
+
+    # Primary key order serves the dashboard read: all rows of one user
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    application_id = db.Column(db.Integer, db.ForeignKey('application.id', ondelete='CASCADE'), primary_key=True)
+    scholarship_id = db.Column(db.Integer, db.ForeignKey('scholarship.id', ondelete='CASCADE'), nullable=False)
+    scholarship_title = db.Column(db.String(255))
+    deadline_date = db.Column(db.Date, nullable=False)
+    status = db.Column(db.String(50))
+    generated_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f'<DeadlineDigest {self.user_id} -> {self.scholarship_id} {self.deadline_date}>'
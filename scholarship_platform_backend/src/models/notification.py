@@ -0,0 +1,20 @@
+from src.database import db
+from datetime import datetime
+
+class Notification(db.Model):
+    __table_args__ = (
+        # One alert per saved search and scholarship, even if it is crawled again
+        db.Index('ix_notification_search_scholarship', 'saved_search_id', 'scholarship_id', unique=True),
+        db.Index('ix_notification_user_read', 'user_id', 'is_read', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    saved_search_id = db.Column(db.Integer, db.ForeignKey('saved_search.id', ondelete='CASCADE'))
+    scholarship_id = db.Column(db.Integer, db.ForeignKey('scholarship.id', ondelete='CASCADE'), nullable=False)
+    message = db.Column(db.String(500))
+    is_read = db.Column(db.Boolean, nullable=False, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<Notification {self.user_id} -> {self.scholarship_id}>'
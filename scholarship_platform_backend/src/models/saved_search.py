@@ -0,0 +1,22 @@
+from src.database import db
+from datetime import datetime
+
+class SavedSearch(db.Model):
+    """A user's stored filter and/or semantic search, evaluated against new scholarships"""
+    __tablename__ = 'saved_search'
+    __table_args__ = (
+        db.Index('ix_saved_search_user', 'user_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    name = db.Column(db.String(255), nullable=False)
+    filters = db.Column(db.Text)  # JSON {facet: [canonical terms]}; terms are also indexed in saved_search_term
+    query_text = db.Column(db.Text)  # Optional free-text query matched semantically
+    min_score = db.Column(db.Float)  # Semantic cut-off for query_text; NULL = default
+    facet_count = db.Column(db.Integer, nullable=False, default=0)  # Facets a scholarship must all match
+    is_active = db.Column(db.Boolean, nullable=False, default=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<SavedSearch {self.id} {self.name}>'
@@ -0,0 +1,16 @@
+from src.database import db
+
+class SavedSearchTerm(db.Model):
+    """Inverted index of saved-search predicates: (facet, value) -> saved searches wanting it"""
+    __tablename__ = 'saved_search_term'
+    __table_args__ = (
+        # Serves percolation: a new scholarship's facet values -> candidate searches
+        db.Index('ix_saved_search_term_lookup', 'facet', 'value', 'saved_search_id'),
+    )
+
+    saved_search_id = db.Column(db.Integer, db.ForeignKey('saved_search.id', ondelete='CASCADE'), primary_key=True)
+    facet = db.Column(db.String(20), primary_key=True)  # country, level, field
+    value = db.Column(db.String(100), primary_key=True)
+
+    def __repr__(self):
+        return f'<SavedSearchTerm {self.saved_search_id} {self.facet}={self.value}>'
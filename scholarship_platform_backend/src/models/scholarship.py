@@ -1,11 +1,17 @@
 from src.database import db
 
 class Scholarship(db.Model):
+    __table_args__ = (
+        # Range scans for upcoming deadlines (digest job, date filters)
+        db.Index('ix_scholarship_deadline_date', 'deadline_date'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text)
     provider_organization = db.Column(db.String(255))
     deadline = db.Column(db.String(255))
+    deadline_date = db.Column(db.Date)  # Parsed from deadline at write time; NULL when undated
     country_info = db.Column(db.String(100))
     level_of_study = db.Column(db.String(100))
     field_of_study = db.Column(db.String(255))
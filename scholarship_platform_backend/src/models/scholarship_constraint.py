@@ -0,0 +1,14 @@
+from src.database import db
+
+class ScholarshipConstraint(db.Model):
+    """Hard eligibility rules compiled from a scholarship's text at ingest"""
+    __tablename__ = 'scholarship_constraint'
+
+    scholarship_id = db.Column(db.Integer, db.ForeignKey('scholarship.id', ondelete='CASCADE'), primary_key=True)
+    level_mask = db.Column(db.Integer, nullable=False, default=0)  # Bit per study level; 0 = any level
+    min_cgpa_ratio = db.Column(db.Float)  # Minimum CGPA as a fraction of its scale; NULL = none stated
+    gender = db.Column(db.String(10))  # 'female' or 'male' when restricted
+    country_mask = db.Column(db.BigInteger, nullable=False, default=0)  # Bit per eligible nationality; 0 = any
+
+    def __repr__(self):
+        return f'<ScholarshipConstraint {self.scholarship_id}>'
@@ -0,0 +1,16 @@
+from src.database import db
+
+class ScholarshipFacet(db.Model):
+    """One normalized country/level/field value of a scholarship, filled at ingest"""
+    __tablename__ = 'scholarship_facet'
+    __table_args__ = (
+        # Serves facet filters and counts: (facet, value) -> scholarship ids
+        db.Index('ix_scholarship_facet_lookup', 'facet', 'value', 'scholarship_id'),
+    )
+
+    scholarship_id = db.Column(db.Integer, db.ForeignKey('scholarship.id', ondelete='CASCADE'), primary_key=True)
+    facet = db.Column(db.String(20), primary_key=True)  # country, level, field
+    value = db.Column(db.String(100), primary_key=True)
+
+    def __repr__(self):
+        return f'<ScholarshipFacet {self.scholarship_id} {self.facet}={self.value}>'
@@ -1,8 +1,19 @@
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, request, jsonify, session, current_app
 from src.models.user import User
 from src.models.scholarship import Scholarship
 from src.models.application import Application
 from src.services.ai_service import AIService
+from src.services.upsert import upsert
+from src.services.catalog_stream import iter_catalog
+from src.services.eligibility import eligible_clause
+from src.services.query_cache import get_catalog_version
+from src.services.recommendation_cache import recommendation_cache, profile_fingerprint
+from src.services.conversation_memory import (
+    MAX_MESSAGE_CHARS, delete_conversation, get_conversation, prompt_context, record_exchange, roll_up,
+    start_conversation
+)
+from src.models.conversation import Conversation
+from src.models.conversation_message import ConversationMessage
 from src.database import db
 import datetime
 
@@ -10,6 +21,12 @@ ai_assistant_bp = Blueprint('ai_assistant', __name__, url_prefix='/api/ai')
 
 ai_service = AIService()
 
+# Scholarship columns sent to the matcher
+MATCH_COLUMNS = (
+    'id', 'title', 'level_of_study', 'field_of_study', 'country_info',
+    'eligibility', 'deadline', 'amount_benefits', 'application_link'
+)
+
 @ai_assistant_bp.route('/chat', methods=['POST'])
 def chat():
     if 'user_id' not in session:
@@ -17,9 +34,25 @@ def chat():
     
     data = request.get_json()
     user_message = data.get('message', '')
+    conversation_id = data.get('conversation_id')  # Omit to start a new conversation
     
     if not user_message:
         return jsonify({'error': 'Message is required'}), 400
+    if not isinstance(user_message, str):
+        return jsonify({'error': 'Message must be a string'}), 400
+    if len(user_message) > MAX_MESSAGE_CHARS:
+        return jsonify({'error': f'Message must be at most {MAX_MESSAGE_CHARS} characters'}), 400
+    
+    # An integer id (or its digits as a string); anything else would reach the query as a type error
+    if isinstance(conversation_id, str) and conversation_id.strip().isdigit():
+        conversation_id = int(conversation_id)
+    if conversation_id is not None and (isinstance(conversation_id, bool) or not isinstance(conversation_id, int)):
+        return jsonify({'error': 'conversation_id must be an integer'}), 400
+    
+    if conversation_id:
+        conversation = get_conversation(session['user_id'], conversation_id)
+        if not conversation:
+            return jsonify({'error': 'Conversation not found'}), 404
     
     # Get user profile for context
     user = User.query.get(session['user_id'])
@@ -33,10 +66,18 @@ def chat():
     } if user else {}
     
     try:
-        ai_response = ai_service.generate_ai_response(user_message, user_profile)
+        if not conversation_id:
+            conversation = start_conversation(session['user_id'], user_message)
+        summary, history = prompt_context(conversation)
+        ai_response = ai_service.generate_ai_response(user_message, user_profile, history=history, summary=summary)
+        
+        record_exchange(conversation, user_message, ai_response)
+        roll_up(conversation, ai_service)
+        db.session.commit()
         
         return jsonify({
             'response': ai_response,
+            'conversation_id': conversation.id,
             'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat()
         }), 200
     except ValueError as e:
@@ -44,6 +85,54 @@ def chat():
     except Exception as e:
         return jsonify({'error': 'An unexpected error occurred: ' + str(e)}), 500
 
+@ai_assistant_bp.route('/conversations', methods=['GET'])
+def list_conversations():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    conversations = Conversation.query.filter_by(user_id=session['user_id']).order_by(
+        Conversation.updated_at.desc()
+    ).limit(limit).all()
+    
+    return jsonify({'conversations': [conversation.to_dict() for conversation in conversations]}), 200
+
+@ai_assistant_bp.route('/conversations/<int:conversation_id>', methods=['GET'])
+def get_conversation_messages(conversation_id):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    conversation = get_conversation(session['user_id'], conversation_id)
+    if not conversation:
+        return jsonify({'error': 'Conversation not found'}), 404
+    
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+    before = request.args.get('before', type=int)  # id of the oldest message already shown
+    query = ConversationMessage.query.filter_by(conversation_id=conversation.id)
+    if before:
+        query = query.filter(ConversationMessage.id < before)
+    messages = query.order_by(ConversationMessage.id.desc()).limit(limit + 1).all()
+    
+    return jsonify({
+        'conversation': conversation.to_dict(),
+        'messages': [message.to_dict() for message in reversed(messages[:limit])],
+        'next_before': messages[limit - 1].id if len(messages) > limit else None
+    }), 200
+
+@ai_assistant_bp.route('/conversations/<int:conversation_id>', methods=['DELETE'])
+def delete_conversation_route(conversation_id):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    conversation = get_conversation(session['user_id'], conversation_id)
+    if not conversation:
+        return jsonify({'error': 'Conversation not found'}), 404
+    
+    delete_conversation(conversation)
+    db.session.commit()
+    
+    return jsonify({'message': 'Conversation deleted successfully'}), 200
+
 @ai_assistant_bp.route('/personal-statement-tips', methods=['POST'])
 def personal_statement_tips():
     if 'user_id' not in session:
@@ -83,17 +172,8 @@ def personal_statement_tips():
     except Exception as e:
         return jsonify({'error': 'An unexpected error occurred: ' + str(e)}), 500
 
-@ai_assistant_bp.route('/match-scholarships', methods=['POST'])
-def match_scholarships():
-    if 'user_id' not in session:
-        return jsonify({'error': 'Authentication required'}), 401
-    
-    # Get user profile
-    user = User.query.get(session['user_id'])
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
-    
-    user_profile = {
+def _profile_for_matching(user):
+    return {
         'level_of_study': user.level_of_study,
         'course_of_study': user.course_of_study,
         'institution': user.institution,
@@ -103,53 +183,87 @@ def match_scholarships():
         'religion': user.religion,
         'skills_interests': user.skills_interests
     }
+
+def _compute_recommendations(user):
+    """Score the catalog for a user, save match percentages and refresh the cache"""
+    user_id = user.id  # Read before the commit expires the instance
+    user_profile = _profile_for_matching(user)
+    fingerprint = profile_fingerprint(user)
+    catalog_version = get_catalog_version(db.session)
+    
+    # Stream the catalog in chunks with only the columns matching needs,
+    # skipping scholarships the user is hard-ineligible for before any AI scoring
+    scholarship_data = iter_catalog(MATCH_COLUMNS, where=eligible_clause(user_profile))
+    recommendations = ai_service.get_scholarship_recommendations(user_profile, scholarship_data)
+    
+    # Save match percentages in one statement batch: new pairs become Draft
+    # applications, existing ones only get their score refreshed
+    now = datetime.datetime.utcnow()
+    upsert(
+        db.session.connection(),
+        Application.__table__,
+        [{
+            'user_id': user_id,
+            'scholarship_id': rec['id'],
+            'match_percentage': rec['match_percentage'],
+            'status': 'Draft',
+            'created_at': now
+        } for rec in recommendations],
+        conflict_columns=['user_id', 'scholarship_id'],
+        update_columns=['match_percentage']
+    )
+    
+    db.session.commit()
+    recommendation_cache.set(user_id, fingerprint, catalog_version, recommendations)
+    return recommendations
+
+def _revalidate_in_background(user_id):
+    app = current_app._get_current_object()
+    
+    def recompute():
+        with app.app_context():
+            try:
+                user = User.query.get(user_id)
+                if user:
+                    _compute_recommendations(user)
+            except Exception:
+                db.session.rollback()
+                raise
+            finally:
+                db.session.remove()
+    
+    recommendation_cache.revalidate_async(user_id, recompute)
+
+@ai_assistant_bp.route('/match-scholarships', methods=['POST'])
+def match_scholarships():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    # Get user profile
+    user = User.query.get(session['user_id'])
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
     
-    # Get all scholarships
-    scholarships = Scholarship.query.all()
-    
-    scholarship_data = []
-    for s in scholarships:
-        scholarship_data.append({
-            'id': s.id,
-            'title': s.title,
-            'level_of_study': s.level_of_study,
-            'field_of_study': s.field_of_study,
-            'country': s.country,
-            'eligibility': s.eligibility,
-            'deadline': s.deadline,
-            'amount_benefits': s.amount_benefits,
-            'application_link': s.application_link
-        })
+    # Unchanged profile and catalog: answer from the cache. If only the
+    # catalog moved on, serve the previous result and recompute behind it.
+    cached, cache_status = recommendation_cache.get(
+        user.id, profile_fingerprint(user), get_catalog_version(db.session)
+    )
+    if cached is not None:
+        if cache_status == 'stale':
+            _revalidate_in_background(user.id)
+        return jsonify({
+            'recommendations': cached,
+            'cache_status': cache_status
+        }), 200
     
     try:
-        recommendations = ai_service.get_scholarship_recommendations(user_profile, scholarship_data)
-        
-        # Update user's applications with match percentages
-        for rec in recommendations:
-            # Check if application exists
-            existing_app = Application.query.filter_by(
-                user_id=user.id,
-                scholarship_id=rec['id']
-            ).first()
-            
-            if existing_app:
-                existing_app.match_percentage = rec['match_percentage']
-            else:
-                # Create new application with match percentage
-                new_app = Application(
-                    user_id=user.id,
-                    scholarship_id=rec['id'],
-                    match_percentage=rec['match_percentage'],
-                    status='Draft'
-                )
-                db.session.add(new_app)
-        
-        db.session.commit()
+        recommendations = _compute_recommendations(user)
         
         return jsonify({
-            'recommendations': recommendations
+            'recommendations': recommendations,
+            'cache_status': cache_status
         }), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Failed to generate recommendations or update applications: ' + str(e)}), 500
-
@@ -1,7 +1,9 @@
 from flask import Blueprint, request, jsonify, session
 from src.models.application import Application
 from src.models.scholarship import Scholarship
+from src.services.deadline_digest import upcoming_deadlines
 from src.database import db
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 
 applications_bp = Blueprint('applications', __name__, url_prefix='/api/applications')
@@ -27,11 +29,19 @@ def get_user_applications():
             'applied_date': app.applied_date.isoformat() if app.applied_date else None,
             'match_percentage': app.match_percentage,
             'scholarship_deadline': scholarship.deadline,
-            'scholarship_country': scholarship.country
+            'scholarship_country': scholarship.country_info
         })
     
     return jsonify({'applications': result}), 200
 
+@applications_bp.route('/upcoming-deadlines', methods=['GET'])
+def get_upcoming_deadlines():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    # Precomputed by the deadline digest job; no join or date parsing per request
+    return jsonify({'upcoming': upcoming_deadlines(db.session, session['user_id'])}), 200
+
 @applications_bp.route('/', methods=['POST'])
 def create_application():
     if 'user_id' not in session:
@@ -57,7 +67,12 @@ def create_application():
     )
     
     db.session.add(application)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Lost a race with another request for the same (user, scholarship) pair
+        db.session.rollback()
+        return jsonify({'error': 'Application already exists'}), 400
     
     return jsonify({'message': 'Application created successfully', 'id': application.id}), 201
 
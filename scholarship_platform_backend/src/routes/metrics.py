@@ -0,0 +1,18 @@
+from flask import Blueprint, Response, request, jsonify, session
+from src.services.metrics import registry
+import hmac
+import os
+
+metrics_bp = Blueprint('metrics', __name__, url_prefix='/api/metrics')
+
+# When set, scrapers must send "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+@metrics_bp.route('', methods=['GET'])
+def get_metrics():
+    if METRICS_TOKEN and not session.get('is_admin'):
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        if not hmac.compare_digest(supplied, METRICS_TOKEN):
+            return jsonify({'error': 'Metrics token required'}), 401
+    
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
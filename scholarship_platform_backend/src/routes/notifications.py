@@ -0,0 +1,57 @@
+from flask import Blueprint, request, jsonify, session
+from src.models.notification import Notification
+from src.models.scholarship import Scholarship
+from src.database import db
+
+notifications_bp = Blueprint('notifications', __name__, url_prefix='/api/notifications')
+
+@notifications_bp.route('/', methods=['GET'])
+def get_notifications():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    user_id = session['user_id']
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    before = request.args.get('before', type=int)  # id of the last notification already shown
+    unread_only = request.args.get('unread', '').lower() in ('1', 'true', 'yes')
+    
+    query = db.session.query(Notification, Scholarship.title).join(
+        Scholarship, Notification.scholarship_id == Scholarship.id
+    ).filter(Notification.user_id == user_id)
+    if unread_only:
+        query = query.filter(Notification.is_read.is_(False))
+    if before:
+        query = query.filter(Notification.id < before)
+    rows = query.order_by(Notification.id.desc()).limit(limit + 1).all()
+    
+    unread_count = Notification.query.filter_by(user_id=user_id, is_read=False).count()
+    
+    return jsonify({
+        'notifications': [{
+            'id': n.id,
+            'scholarship_id': n.scholarship_id,
+            'scholarship_title': title,
+            'saved_search_id': n.saved_search_id,
+            'message': n.message,
+            'is_read': n.is_read,
+            'created_at': n.created_at.isoformat() if n.created_at else None
+        } for n, title in rows[:limit]],
+        'unread_count': unread_count,
+        'next_before': rows[limit - 1][0].id if len(rows) > limit else None
+    }), 200
+
+@notifications_bp.route('/read', methods=['POST'])
+def mark_notifications_read():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    data = request.get_json() or {}
+    ids = data.get('ids')  # Omit to mark everything read
+    
+    query = Notification.query.filter_by(user_id=session['user_id'], is_read=False)
+    if ids:
+        query = query.filter(Notification.id.in_(ids))
+    updated = query.update({'is_read': True}, synchronize_session=False)
+    db.session.commit()
+    
+    return jsonify({'message': 'Notifications marked as read', 'updated': updated}), 200
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify, session
 from src.models.user import User
+from src.services.recommendation_cache import recommendation_cache
 from src.database import db
 
 profile_bp = Blueprint('profile', __name__, url_prefix='/api/profile')
@@ -53,6 +54,9 @@ def update_profile():
     
     db.session.commit()
     
+    # Matches depend on the profile; the next request recomputes them
+    recommendation_cache.invalidate(user.id)
+    
     return jsonify({'message': 'Profile updated successfully'}), 200
 
 @profile_bp.route('/completion', methods=['GET'])
@@ -0,0 +1,91 @@
+from flask import Blueprint, request, jsonify, session
+from src.models.saved_search import SavedSearch
+from src.models.saved_search_term import SavedSearchTerm
+from src.models.notification import Notification
+from src.services.facets import FACETS, facet_filters_from_args
+from src.services.saved_search import (SAVED_SEARCH_SCORE_FLOOR, index_saved_query, saved_search_to_dict,
+                                       sync_saved_search_terms)
+from src.database import db
+import json
+
+saved_searches_bp = Blueprint('saved_searches', __name__, url_prefix='/api/saved-searches')
+
+def _invalid_saved_search(data):
+    """Error message for a malformed body, or None; filters, q and name must be strings"""
+    if not isinstance(data, dict):
+        return 'Request body must be a JSON object'
+    for param in [param for _, param in FACETS.values()] + ['q', 'name']:
+        if data.get(param) is not None and not isinstance(data[param], str):
+            return f'{param} must be a string'
+    min_score = data.get('min_score')
+    if min_score is not None:
+        if isinstance(min_score, bool) or not isinstance(min_score, (int, float)):
+            return 'min_score must be a number'
+        if not SAVED_SEARCH_SCORE_FLOOR <= min_score <= 1:
+            return f'min_score must be between {SAVED_SEARCH_SCORE_FLOOR} and 1'
+    return None
+
+@saved_searches_bp.route('/', methods=['GET'])
+def get_saved_searches():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    searches = SavedSearch.query.filter_by(user_id=session['user_id']).order_by(SavedSearch.id).all()
+    
+    return jsonify({'saved_searches': [saved_search_to_dict(s) for s in searches]}), 200
+
+@saved_searches_bp.route('/', methods=['POST'])
+def create_saved_search():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    data = request.get_json(silent=True)
+    if data is None:
+        data = {}
+    error = _invalid_saved_search(data)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    # Same filter params as GET /api/scholarships, resolved to canonical terms
+    filters = facet_filters_from_args(data)
+    query_text = (data.get('q') or '').strip() or None
+    if not filters and not query_text:
+        return jsonify({'error': 'At least one filter or a query is required'}), 400
+    
+    search = SavedSearch(
+        user_id=session['user_id'],
+        name=data.get('name') or query_text or 'My search',
+        filters=json.dumps(filters),
+        query_text=query_text,
+        min_score=data.get('min_score'),
+        facet_count=len(filters)
+    )
+    
+    db.session.add(search)
+    db.session.flush()
+    sync_saved_search_terms(db.session.connection(), search.id, filters)
+    db.session.commit()
+    
+    # Embedded once here; percolation only ever scores against the stored vector
+    index_saved_query(search.id, query_text)
+    
+    return jsonify({'message': 'Saved search created successfully', 'saved_search': saved_search_to_dict(search)}), 201
+
+@saved_searches_bp.route('/<int:saved_search_id>', methods=['DELETE'])
+def delete_saved_search(saved_search_id):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Authentication required'}), 401
+    
+    search = SavedSearch.query.filter_by(
+        id=saved_search_id,
+        user_id=session['user_id']
+    ).first_or_404()
+    
+    # Past notifications stay; they just lose the link to the search
+    SavedSearchTerm.query.filter_by(saved_search_id=search.id).delete()
+    Notification.query.filter_by(saved_search_id=search.id).update({'saved_search_id': None})
+    db.session.delete(search)
+    db.session.commit()
+    index_saved_query(saved_search_id, None)
+    
+    return jsonify({'message': 'Saved search deleted successfully'}), 200
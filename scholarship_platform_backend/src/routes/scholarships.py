@@ -2,7 +2,16 @@ from flask import Blueprint, request, jsonify, session
 from src.models.scholarship import Scholarship
 from src.models.application import Application
 from src.services.scraper_service import ScraperService
+from src.services.query_cache import scholarship_query_cache, get_catalog_version, bump_catalog_version, normalize_filter_key
+from src.services.facets import FACETS, apply_facet_filters, count_facets, facet_filter_key, facet_filters_from_args, sync_scholarship_facets
+from src.services.recommendation_cache import recommendation_cache
+from src.services.eligibility import sync_scholarship_constraints
+from src.services.semantic_index import semantic_index, get_search_index, EMBEDDED_COLUMNS
+from src.services.index_snapshot import snapshot_store
+from src.services.saved_search import percolate_and_notify
+from src.services.deadlines import parse_deadline
 from src.database import db
+from sqlalchemy import and_, or_
 import json
 from datetime import datetime
 
@@ -13,20 +22,27 @@ def get_scholarships():
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
     
-    # Filters
-    country_info = request.args.get('country_info')
-    level = request.args.get('level')
-    field = request.args.get('field')
+    # Filters; country, level and field resolve to canonical taxonomy terms
+    facet_filters = facet_filters_from_args(request.args)
     deadline = request.args.get('deadline')
     
+    # Identical filter combinations are most of our traffic; serve them from
+    # the cache until the catalog version moves on
+    cache_key = (
+        get_catalog_version(db.session),
+        page,
+        per_page,
+        facet_filter_key(facet_filters),
+        normalize_filter_key(request.args, 'deadline')
+    )
+    cached = scholarship_query_cache.get(cache_key)
+    if cached is not None:
+        return jsonify(cached), 200
+    
     query = Scholarship.query
     
-    if country_info:
-        query = query.filter(Scholarship.country_info.ilike(f'%{country_info}%'))
-    if level:
-        query = query.filter(Scholarship.level_of_study.ilike(f'%{level}%'))
-    if field:
-        query = query.filter(Scholarship.field_of_study.ilike(f'%{field}%'))
+    # Indexed equality joins on the facet table, not substring scans
+    query = apply_facet_filters(query, Scholarship.id, facet_filters)
     if deadline:
         query = query.filter(Scholarship.deadline.ilike(f'%{deadline}%'))
     
@@ -34,7 +50,7 @@ def get_scholarships():
         page=page, per_page=per_page, error_out=False
     )
     
-    return jsonify({
+    result = {
         'scholarships': [{
             'id': s.id,
             'title': s.title,
@@ -60,6 +76,97 @@ def get_scholarships():
         'total': scholarships.total,
         'pages': scholarships.pages,
         'current_page': page
+    }
+    scholarship_query_cache.set(cache_key, result)
+    
+    return jsonify(result), 200
+
+@scholarships_bp.route('/facets', methods=['GET'])
+def get_scholarship_facets():
+    # Counts per country/level/field value for the current filter set; takes
+    # the same filter params as the listing endpoint
+    filters = facet_filters_from_args(request.args)
+    limit = request.args.get('limit', 50, type=int)
+    
+    cache_key = ('facets', get_catalog_version(db.session), limit, facet_filter_key(filters))
+    cached = scholarship_query_cache.get(cache_key)
+    if cached is not None:
+        return jsonify(cached), 200
+    
+    # The memory-mapped snapshot answers from its postings when it is current
+    snapshot = snapshot_store.current()
+    if snapshot is not None and snapshot.catalog_version == cache_key[1]:
+        facets = snapshot.facet_counts(FACETS, filters, limit=limit)
+    else:
+        facets = count_facets(db.session, filters, limit=limit)
+    
+    result = {
+        'facets': facets,
+        'filters': filters
+    }
+    scholarship_query_cache.set(cache_key, result)
+    
+    return jsonify(result), 200
+
+def _semantic_results(matches):
+    """Load the matched scholarships in one query, keeping the ranking order"""
+    scholarships = {
+        s.id: s for s in Scholarship.query.filter(Scholarship.id.in_([sid for sid, _ in matches])).all()
+    } if matches else {}
+    
+    return [{
+        'id': s.id,
+        'title': s.title,
+        'description': s.description,
+        'provider_organization': s.provider_organization,
+        'deadline': s.deadline,
+        'country_info': s.country_info,
+        'level_of_study': s.level_of_study,
+        'field_of_study': s.field_of_study,
+        'amount_benefits': s.amount_benefits,
+        'application_link': s.application_link,
+        'score': round(score, 4)
+    } for s, score in ((scholarships.get(sid), score) for sid, score in matches) if s]
+
+@scholarships_bp.route('/semantic-search', methods=['GET'])
+def semantic_search():
+    query_text = request.args.get('q', '').strip()
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+    
+    if not query_text:
+        return jsonify({'error': 'Query parameter q is required'}), 400
+    
+    query_vector = semantic_index.embedder.embed([query_text])[0]
+    matches = get_search_index().search_vector(query_vector, limit=limit)
+    
+    return jsonify({'query': query_text, 'results': _semantic_results(matches)}), 200
+
+@scholarships_bp.route('/<int:scholarship_id>/similar', methods=['GET'])
+def get_similar_scholarships(scholarship_id):
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+    
+    search_index = get_search_index()
+    vector = search_index.vector_for(scholarship_id)
+    if vector is None:
+        # Not indexed yet; embed it on the fly
+        scholarship = Scholarship.query.get_or_404(scholarship_id)
+        record = {column: getattr(scholarship, column) for column in EMBEDDED_COLUMNS}
+        vector = semantic_index.embedder.embed([' '.join(str(v or '') for v in record.values())])[0]
+    
+    matches = search_index.search_vector(vector, limit=limit, exclude=[scholarship_id])
+    
+    return jsonify({'scholarship_id': scholarship_id, 'similar': _semantic_results(matches)}), 200
+
+@scholarships_bp.route('/cache-stats', methods=['GET'])
+def get_cache_stats():
+    # Admin only
+    if 'user_id' not in session or not session.get('is_admin'):
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    return jsonify({
+        'catalog_version': get_catalog_version(db.session),
+        'query_cache': scholarship_query_cache.stats(),
+        'recommendation_cache': recommendation_cache.stats()
     }), 200
 
 @scholarships_bp.route('/<int:scholarship_id>', methods=['GET'])
@@ -102,6 +209,7 @@ def create_scholarship():
         description=data.get('description', ''),
         provider_organization=data.get('provider_organization', ''),
         deadline=data.get('deadline', ''),
+        deadline_date=parse_deadline(data.get('deadline')),
         country_info=data.get('country_info', ''),
         level_of_study=data.get('level_of_study', ''),
         field_of_study=data.get('field_of_study', ''),
@@ -118,8 +226,17 @@ def create_scholarship():
     )
     
     db.session.add(scholarship)
+    db.session.flush()
+    sync_scholarship_facets(db.session.connection(), scholarship.id, data)
+    sync_scholarship_constraints(db.session.connection(), scholarship.id, data)
+    # Alert users whose saved searches match, in the same transaction
+    percolate_and_notify(db.session.connection(), [(scholarship.id, data)])
+    bump_catalog_version(db.session)
     db.session.commit()
     
+    # Searchable at once through the live index; the next crawl or publish-index-snapshot folds it into a snapshot
+    semantic_index.upsert(scholarship.id, {column: getattr(scholarship, column) for column in EMBEDDED_COLUMNS})
+    
     return jsonify({'message': 'Scholarship created successfully', 'id': scholarship.id}), 201
 
 @scholarships_bp.route('/suggested', methods=['GET'])
@@ -129,10 +246,37 @@ def get_suggested_scholarships():
     
     user_id = session['user_id']
     
-    # Get user's applications with match percentages
-    applications = db.session.query(Application, Scholarship).join(
+    # Keyset paging over the (user_id, match_percentage) index: only the page
+    # being shown is read and serialized, however many scores the user has
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    min_score = request.args.get('min_score', 0, type=float)
+    cursor = request.args.get('cursor')
+    
+    query = db.session.query(Application, Scholarship).join(
         Scholarship, Application.scholarship_id == Scholarship.id
-    ).filter(Application.user_id == user_id).all()
+    ).filter(
+        Application.user_id == user_id,
+        Application.match_percentage.isnot(None),
+        Application.match_percentage >= min_score
+    )
+    
+    if cursor:
+        try:
+            cursor_score, cursor_id = cursor.split(':')
+            cursor_score, cursor_id = float(cursor_score), int(cursor_id)
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        query = query.filter(or_(
+            Application.match_percentage < cursor_score,
+            and_(Application.match_percentage == cursor_score, Application.id < cursor_id)
+        ))
+    
+    applications = query.order_by(
+        Application.match_percentage.desc(), Application.id.desc()
+    ).limit(limit + 1).all()
+    
+    has_more = len(applications) > limit
+    applications = applications[:limit]
     
     suggested = []
     for app, scholarship in applications:
@@ -143,7 +287,7 @@ def get_suggested_scholarships():
             'deadline': scholarship.deadline,
             'level_of_study': scholarship.level_of_study,
             'field_of_study': scholarship.field_of_study,
-            'match_percentage': app.match_percentage or 0,
+            'match_percentage': app.match_percentage,
             'application_status': app.status,
             'applied_date': app.applied_date.isoformat() if app.applied_date else None,
             'description': scholarship.description,
@@ -160,10 +304,16 @@ def get_suggested_scholarships():
             'extracted_date': scholarship.extracted_date
         })
     
-    # Sort by match percentage
-    suggested.sort(key=lambda x: x['match_percentage'], reverse=True)
+    next_cursor = None
+    if has_more:
+        last_app = applications[-1][0]
+        next_cursor = f"{last_app.match_percentage}:{last_app.id}"
     
-    return jsonify({'suggested_scholarships': suggested}), 200
+    return jsonify({
+        'suggested_scholarships': suggested,
+        'next_cursor': next_cursor,
+        'has_more': has_more
+    }), 200
 
 @scholarships_bp.route('/scrape', methods=['POST'])
 def trigger_scrape():
@@ -0,0 +1,267 @@
+"""
+Throughput benchmark for the AIService hot paths.
+
+Runs two scenarios at each concurrency level, on one shared AIService the
+way the web app and the pipeline share theirs:
+
+    recommend   get_scholarship_recommendations for one profile over a
+                catalog (a clean and a match call per scholarship)
+    clean       clean_scholarship_data on one spider-style item, then the
+                facet and constraint derivation the pipeline does next
+
+With the local backend (AI_BACKEND=local, or --backend local) latency and
+error rate are set explicitly, so runs are repeatable offline and show how
+the code scales with concurrency rather than how the network behaved.
+"""
+import datetime
+import os
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List
+
+from src.services.circuit_breaker import circuit_from_env
+from src.services.eligibility import compile_constraints
+from src.services.facets import extract_facets
+from src.services.load_test import git_commit, percentile
+from src.services.prompt_budget import budget_record
+from src.services.seed import sample_profiles, sample_scholarships
+
+DEFAULT_CONCURRENCY = (1, 4, 16)
+
+# Characters of a cleaned field compared by prompt_budget_report
+AGREEMENT_PREFIX = 200
+
+# Columns a spider item carries; the rest of a seeded record is derived by the pipeline
+ITEM_COLUMNS = ('title', 'deadline', 'description', 'eligibility', 'cgpa_requirements', 'academic_requirements',
+                'field_of_study', 'country_info')
+
+# Page text the spider's eligibility regex runs on into (it stops at a blank line or the end of the article)
+PAGE_TAIL = [
+    'How to Apply: Applicants must complete the online application form and upload transcripts, two reference '
+    'letters and a personal statement of not more than 1000 words.',
+    'Selection is based on academic merit, leadership potential and the quality of the study plan.',
+    'Shortlisted candidates will be invited for an interview.\n\n\n',
+    'Share this:   Facebook   Twitter   WhatsApp   LinkedIn   Telegram   Email',
+    'Related Posts:  Fully Funded Masters Scholarships 2026  |  Top PhD Fellowships for Africans  |  '
+    'How to Write a Winning Scholarship Essay',
+    'Subscribe to our newsletter to get the latest opportunities delivered to your inbox every week.',
+    'Disclaimer: Opportunity Desk is not the provider of this opportunity. Always confirm details on the '
+    'official website before applying.',
+]
+LINK_NOISE = ['https://www.facebook.com/sharer/sharer.php?u=', 'https://twitter.com/intent/tweet?url=',
+              'https://api.whatsapp.com/send?text=', 'https://www.linkedin.com/shareArticle?url=']
+
+
+def spider_items(count: int, seed: int = 1) -> List[Dict[str, Any]]:
+    """
+    Raw items shaped like ScholarshipItem output, including what the spider's
+    extractors really produce on long pages: eligibility running on to the
+    end of the article, repeated regex matches and every share link.
+    """
+    rng = random.Random(seed)
+    items = []
+    for record in sample_scholarships(count, seed):
+        item = {column: record[column] for column in ITEM_COLUMNS}
+        url = record['source_url']
+        tail = [rng.choice(PAGE_TAIL) for _ in range(rng.randint(0, 24))]
+        item['eligibility'] = '\n\n   '.join([record['eligibility']] + tail)
+        item['academic_requirements'] = [record['academic_requirements'] or 'transcripts'] * rng.randint(1, 6)
+        item['cgpa_requirements'] = [record['cgpa_requirements']] * rng.randint(0, 4)
+        item['field_of_study'] = [record['field_of_study'].lower()] * rng.randint(1, 8)
+        item['keywords'] = record['title'].lower().split()[:rng.randint(2, 8)]
+        item['url'] = url
+        item['application_urls'] = [record['application_link']] + [
+            rng.choice(LINK_NOISE) + url + f'&ref={n}' for n in range(rng.randint(0, 16))
+        ]
+        item['content_length'] = len(item['eligibility']) + len(item['description'])
+        item['scraped_at'] = record['extracted_date']
+        items.append(item)
+    return items
+
+
+class CountingBackend:
+    """Wraps a backend to count model calls and failures"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.name = getattr(backend, 'name', type(backend).__name__)
+        self.calls = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def _count(self, failed: bool) -> None:
+        with self._lock:
+            self.calls += 1
+            self.errors += failed
+
+    def generate(self, prompt: str):
+        try:
+            response = self.backend.generate(prompt)
+        except Exception:
+            self._count(True)
+            raise
+        self._count(False)
+        return response
+
+    def stream(self, prompt: str):
+        try:
+            yield from self.backend.stream(prompt)
+        except Exception:
+            self._count(True)
+            raise
+        self._count(False)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls = self.errors = 0
+
+
+def _run_scenario(operations: Iterable[Callable[[], Any]], concurrency: int,
+                  backend: CountingBackend) -> Dict[str, Any]:
+    operations = list(operations)
+    latencies: List[float] = []
+    failures = 0
+    backend.reset()
+
+    def timed(operation):
+        started = time.perf_counter()
+        operation()
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(timed, operation) for operation in operations]
+        for future in futures:
+            try:
+                latencies.append(future.result())
+            except Exception:
+                failures += 1
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    return {
+        'concurrency': concurrency,
+        'operations': len(operations),
+        'failed_operations': failures,
+        'elapsed_s': round(elapsed, 3),
+        'ops_per_s': round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(ordered, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(ordered, 0.95) * 1000, 2),
+        'max_ms': round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        'model_calls': backend.calls,
+        'model_errors': backend.errors,
+        'model_calls_per_s': round(backend.calls / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+def run_ai_benchmark(backend, concurrency_levels: Iterable[int] = DEFAULT_CONCURRENCY, profiles: int = 16,
+                     catalog_size: int = 20, items: int = 64, top_n: int = 10, seed: int = 1,
+                     report: Callable[[str], None] = print) -> Dict[str, Any]:
+    """Benchmark both scenarios at every concurrency level against backend"""
+    from src.services.ai_service import AIService
+
+    counting = CountingBackend(backend)
+    # Its own circuit, so an earlier run's failures can't short-circuit this one
+    service = AIService(backend=counting, circuit=circuit_from_env('benchmark'))
+    users = sample_profiles(profiles, seed)
+    # Shaped like Scholarship.to_dict(), which has no deadline_date
+    catalog = [{column: value for column, value in record.items() if column != 'deadline_date'}
+               for record in sample_scholarships(catalog_size, seed + 1)]
+    raw_items = spider_items(items, seed + 2)
+
+    def recommend(user):
+        # Copies, since recommendation decodes keywords in place
+        return lambda: service.get_scholarship_recommendations(user, (dict(s) for s in catalog), top_n)
+
+    def clean(item):
+        def operation():
+            cleaned = service.clean_scholarship_data(dict(item))
+            extract_facets(cleaned)
+            compile_constraints(cleaned)
+        return operation
+
+    scenarios: Dict[str, List[Dict[str, Any]]] = {'recommend': [], 'clean': []}
+    for concurrency in concurrency_levels:
+        for name, operations in (('recommend', [recommend(user) for user in users]),
+                                 ('clean', [clean(item) for item in raw_items])):
+            result = _run_scenario(operations, concurrency, counting)
+            scenarios[name].append(result)
+            report(f"{name:>9} x{concurrency:<3} {result['ops_per_s']:>9} ops/s  p50 {result['p50_ms']}ms  "
+                   f"p95 {result['p95_ms']}ms  model errors {result['model_errors']}")
+
+    return {
+        'scenarios': scenarios,
+        'run': {
+            'backend': counting.name,
+            'latency_ms': getattr(backend, 'latency_ms', None),
+            'jitter_ms': getattr(backend, 'jitter_ms', None),
+            'error_rate': getattr(backend, 'error_rate', None),
+            'profiles': profiles,
+            'catalog_size': catalog_size,
+            'items': items,
+            'seed': seed,
+            'cpu_count': os.cpu_count(),
+            'commit': git_commit(),
+            'started_at': datetime.datetime.utcnow().isoformat(timespec='seconds')
+        }
+    }
+
+
+def _comparable(value: Any) -> str:
+    text = ' '.join(str(value if value is not None else '').lower().split())
+    return text[:AGREEMENT_PREFIX]
+
+
+def prompt_budget_report(backend, items: int = 100, seed: int = 1,
+                         report: Callable[[str], None] = print) -> Dict[str, Any]:
+    """
+    Clean the same fixture items with whole-item prompts and with budgeted
+    prompts: prompt size, model latency, and how often each extracted field
+    comes out the same both ways. Values compare case- and
+    whitespace-insensitively; long free text compares on its opening
+    AGREEMENT_PREFIX characters, the part a summary is drawn from.
+    """
+    from src.services.ai_service import AIService
+
+    raw_items = spider_items(items, seed)
+    runs = {}
+    for name, budget_prompts in (('full', False), ('budgeted', True)):
+        service = AIService(backend=backend, budget_prompts=budget_prompts)
+        latencies, outputs = [], []
+        for item in raw_items:
+            started = time.perf_counter()
+            outputs.append(service.clean_scholarship_data(dict(item)))
+            latencies.append(time.perf_counter() - started)
+        runs[name] = (sorted(latencies), outputs)
+
+    sizes = [budget_record(item)[1] for item in raw_items]
+    fields = sorted({field for output in runs['full'][1] for field in output})
+    agreement = {
+        field: round(sum(_comparable(full.get(field)) == _comparable(budgeted.get(field))
+                         for full, budgeted in zip(runs['full'][1], runs['budgeted'][1])) / len(raw_items), 3)
+        for field in fields
+    } if raw_items else {}
+
+    def tokens(key):
+        ordered = sorted(size[key] for size in sizes)
+        return {'median': statistics.median(ordered) if ordered else 0, 'p95': percentile(ordered, 0.95)}
+
+    result = {
+        'prompt_data_tokens': {'full': tokens('original_tokens'), 'budgeted': tokens('budgeted_tokens')},
+        'latency_ms': {
+            name: {'median': round(statistics.median(latencies) * 1000, 2) if latencies else 0.0,
+                   'p95': round(percentile(latencies, 0.95) * 1000, 2)}
+            for name, (latencies, _) in runs.items()
+        },
+        'field_agreement': agreement,
+        'run': {'backend': getattr(backend, 'name', type(backend).__name__), 'items': items, 'seed': seed,
+                'commit': git_commit()}
+    }
+    report(f"Prompt data tokens (median): {result['prompt_data_tokens']['full']['median']} full, "
+           f"{result['prompt_data_tokens']['budgeted']['median']} budgeted")
+    report(f"Clean latency (median): {result['latency_ms']['full']['median']}ms full, "
+           f"{result['latency_ms']['budgeted']['median']}ms budgeted")
+    return result
@@ -1,39 +1,96 @@
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator
 import json
 import re
+import heapq
+import time
 from dotenv import load_dotenv # type: ignore
-import google.generativeai as genai # type: ignore
-from google.generativeai.types import HarmCategory, HarmBlockThreshold
-from google.generativeai.client import ga_exceptions
+from src.services.metrics import record_llm_call
+from src.services.circuit_breaker import CircuitOpen, model_circuit
+from src.services.local_cleaner import clean_record
+from src.services.local_scorer import local_scorer
+from src.services.model_backends import ModelError, estimate_tokens, get_backend
+from src.services.model_recording import RecordingMiss
+from src.services.prompt_budget import budget_record, compact_prompt, serialize_record
 load_dotenv()
 
 
 class AIService:
-    def __init__(self):
-        # Configure Gemini API
-        api_key = os.getenv('GEMINI_API_KEY')
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY environment variable is required")
+    def __init__(self, backend=None, budget_prompts: bool = True, circuit=None):
+        # Gemini unless AI_BACKEND selects another backend (see model_backends)
+        self.backend = backend or get_backend()
+        self.circuit = circuit or model_circuit
+        # False sends whole items to the model, for comparing against the budgeted prompts
+        self.budget_prompts = budget_prompts
+
+    def _generate(self, prompt: str, operation: str):
+        """Call the model, recording latency, outcome and token usage per operation"""
+        if not self.circuit.allow():
+            raise CircuitOpen(f"Model circuit is open; {operation} call skipped")
+        prompt = compact_prompt(prompt)
+        started = time.perf_counter()
+        try:
+            response = self.backend.generate(prompt)
+        except Exception as e:
+            elapsed = time.perf_counter() - started
+            self.circuit.record(elapsed, failed=not isinstance(e, RecordingMiss))
+            record_llm_call(operation, elapsed, outcome='error')
+            raise
+        self.circuit.record(time.perf_counter() - started, failed=False)
         
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.5-flash',
-                                        safety_settings={
-                                            HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-                                            HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-                                            HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-                                            HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-                                        })
+        # Backends without usage metadata are counted with the estimate
+        usage = getattr(response, 'usage_metadata', None)
+        prompt_tokens = getattr(usage, 'prompt_token_count', None)
+        response_tokens = getattr(usage, 'candidates_token_count', None)
+        record_llm_call(
+            operation,
+            time.perf_counter() - started,
+            prompt_tokens=estimate_tokens(prompt) if prompt_tokens is None else prompt_tokens,
+            response_tokens=estimate_tokens(response.text) if response_tokens is None else response_tokens
+        )
+        return response
+
+    def _stream(self, prompt: str, operation: str) -> Iterator[str]:
+        """Stream the model's text chunks, recording the call once the stream ends"""
+        if not self.circuit.allow():
+            raise CircuitOpen(f"Model circuit is open; {operation} call skipped")
+        prompt = compact_prompt(prompt)
+        started = time.perf_counter()
+        chunks = []
+        failed = False
+        try:
+            for chunk in self.backend.stream(prompt):
+                chunks.append(chunk)
+                yield chunk
+        except RecordingMiss:
+            raise
+        except Exception:
+            failed = True
+            record_llm_call(operation, time.perf_counter() - started, outcome='error')
+            raise
+        finally:
+            # Also runs when the consumer stops reading early (GeneratorExit on a client
+            # disconnect); only an exception from the backend counts as a failure
+            self.circuit.record(time.perf_counter() - started, failed=failed)
+        record_llm_call(operation, time.perf_counter() - started,
+                        prompt_tokens=estimate_tokens(prompt), response_tokens=estimate_tokens(''.join(chunks)))
 
     def clean_scholarship_data(self, raw_scholarship_data: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Clean and standardize scholarship data using Gemini AI
+        Clean and standardize scholarship data using Gemini AI.
+
+        Only the fields the model extracts from are sent, trimmed to the
+        prompt token budget (see prompt_budget).
         """
+        if self.budget_prompts:
+            prompt_data = serialize_record(budget_record(raw_scholarship_data)[0])
+        else:
+            prompt_data = json.dumps(raw_scholarship_data, indent=2, default=str)
         prompt = f"""
         Clean and standardize the following scholarship data. Extract and format the information properly:
 
         Raw Data:
-        {json.dumps(raw_scholarship_data, indent=2)}
+        {prompt_data}
 
         Please return a JSON object with the following standardized fields:
         - title: Clean scholarship title
@@ -54,7 +111,7 @@ class AIService:
         """
 
         try:
-            response = self.model.generate_content(prompt)
+            response = self._generate(prompt, 'clean')
             cleaned_text = response.text.strip()
             
             # Extract JSON from response
@@ -64,9 +121,13 @@ class AIService:
                 return cleaned_data
             
             return raw_scholarship_data
-        except ga_exceptions.ResponseError as e:
-            print(f"Gemini API error cleaning scholarship data: {e}")
-            return raw_scholarship_data
+        except RecordingMiss:
+            raise  # Strict replay must fail the run, not degrade quietly
+        except CircuitOpen:
+            return clean_record(raw_scholarship_data)
+        except ModelError as e:
+            print(f"Model error cleaning scholarship data: {e}; using the local cleaner")
+            return clean_record(raw_scholarship_data)
         except Exception as e:
             print(f"Error cleaning scholarship data: {e}")
             return raw_scholarship_data
@@ -106,7 +167,7 @@ class AIService:
         """
 
         try:
-            response = self.model.generate_content(prompt)
+            response = self._generate(prompt, 'match')
             match_text = response.text.strip()
             
             # Extract number from response
@@ -114,20 +175,27 @@ class AIService:
             if match_number:
                 return min(100, max(0, int(match_number[0])))
             return 0
-        except ga_exceptions.ResponseError as e:
-            print(f"Gemini API error calculating match percentage: {e}")
-            return 0
+        except RecordingMiss:
+            raise
+        except CircuitOpen:
+            return local_scorer.calculate_match_percentage(user_profile, scholarship)
+        except ModelError as e:
+            print(f"Model error calculating match percentage: {e}; using the local scorer")
+            return local_scorer.calculate_match_percentage(user_profile, scholarship)
         except Exception as e:
             print(f"Error calculating match percentage: {e}")
             return 0
 
-    def get_scholarship_recommendations(self, user_profile: Dict[str, Any], scholarships: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def get_scholarship_recommendations(self, user_profile: Dict[str, Any], scholarships: Iterable[Dict[str, Any]], top_n: int = 10) -> List[Dict[str, Any]]:
         """
-        Get personalized scholarship recommendations for a user
+        Get personalized scholarship recommendations for a user.
+
+        scholarships may be any iterable (e.g. a streamed catalog); only the
+        best top_n matches are held in memory.
         """
-        recommendations = []
+        top = []  # min-heap of (match_percentage, -position, recommendation)
         
-        for scholarship in scholarships:
+        for position, scholarship in enumerate(scholarships):
             # Before sending to clean_scholarship_data, ensure keywords is a list if it's a JSON string
             if isinstance(scholarship.get('keywords'), str):
                 try:
@@ -144,17 +212,17 @@ class AIService:
                     **scholarship,
                     'match_percentage': match_percentage
                 }
-                recommendations.append(recommendation)
+                entry = (match_percentage, -position, recommendation)
+                if len(top) < top_n:
+                    heapq.heappush(top, entry)
+                elif entry[:2] > top[0][:2]:
+                    heapq.heapreplace(top, entry)
         
-        # Sort by match percentage (highest first)
-        recommendations.sort(key=lambda x: x['match_percentage'], reverse=True)
-        
-        return recommendations[:10]  # Return top 10 recommendations
+        # Sort by match percentage (highest first, earlier catalog rows win ties)
+        return [recommendation for _, _, recommendation in sorted(top, key=lambda e: e[:2], reverse=True)]
 
-    def generate_ai_response(self, user_message: str, user_profile: Dict[str, Any] = None) -> str:
-        """
-        Generate AI assistant response for scholarship-related queries using Gemini
-        """
+    def _chat_prompt(self, user_message: str, user_profile: Dict[str, Any] = None,
+                     history: List[Dict[str, str]] = None, summary: str = None) -> str:
         context = ""
         if user_profile:
             context = f"""
@@ -169,6 +237,8 @@ class AIService:
         You are a helpful scholarship assistant for Nigerian students. Provide helpful, accurate, and encouraging responses about scholarships, applications, and academic opportunities.
 
         {context}
+        {"Earlier in this conversation (summary): " + summary if summary else ""}
+        {self._format_history(history) if history else ""}
 
         User Question: {user_message}
 
@@ -180,17 +250,78 @@ class AIService:
         - Keep responses concise but informative
         - Use a friendly, professional tone
         """
+        return prompt
+
+    def _format_history(self, history: List[Dict[str, str]]) -> str:
+        lines = [f"{'Student' if message['role'] == 'user' else 'Assistant'}: {message['content']}" for message in history]
+        return "Recent messages:\n" + "\n".join(lines)
+
+    def generate_ai_response(self, user_message: str, user_profile: Dict[str, Any] = None,
+                             history: List[Dict[str, str]] = None, summary: str = None) -> str:
+        """
+        Generate AI assistant response for scholarship-related queries using Gemini.
+
+        history is the recent turns ({'role', 'content'}, oldest first) and
+        summary a digest of anything older (see conversation_memory).
+        """
+        prompt = self._chat_prompt(user_message, user_profile, history, summary)
 
         try:
-            response = self.model.generate_content(prompt)
+            response = self._generate(prompt, 'chat')
             return response.text.strip()
-        except ga_exceptions.ResponseError as e:
-            print(f"Gemini API error generating AI response: {e}")
+        except RecordingMiss:
+            raise
+        except ModelError as e:
+            print(f"Model error generating AI response: {e}")
             return "I'm sorry, I'm having trouble connecting to the AI. Please try again later."
         except Exception as e:
             print(f"Error generating AI response: {e}")
             return "I'm sorry, I'm having trouble processing your request right now. Please try again later or contact support for assistance."
 
+    def stream_ai_response(self, user_message: str, user_profile: Dict[str, Any] = None,
+                           history: List[Dict[str, str]] = None, summary: str = None) -> Iterator[str]:
+        """
+        Same as generate_ai_response, yielding the answer in chunks as the model produces them
+        """
+        try:
+            yield from self._stream(self._chat_prompt(user_message, user_profile, history, summary), 'chat_stream')
+        except RecordingMiss:
+            raise
+        except ModelError as e:
+            print(f"Model error streaming AI response: {e}")
+            yield "I'm sorry, I'm having trouble connecting to the AI. Please try again later."
+        except Exception as e:
+            print(f"Error streaming AI response: {e}")
+            yield "I'm sorry, I'm having trouble processing your request right now. Please try again later or contact support for assistance."
+
+    def summarize_conversation(self, previous_summary: str, messages: List[Dict[str, str]], max_words: int = 150) -> str:
+        """
+        Fold messages into previous_summary. Returns '' if the model is
+        unavailable, so the caller can fall back to a local digest.
+        """
+        prompt = f"""
+        Summarize this conversation between a student and a scholarship assistant for use as context in later replies.
+
+        {"Summary so far: " + previous_summary if previous_summary else ""}
+
+        {self._format_history(messages)}
+
+        Keep the student's goals, background, scholarships and deadlines mentioned, and any advice already given.
+        Write at most {max_words} words of plain text, no headings.
+        """
+
+        try:
+            response = self._generate(prompt, 'summarize')
+            return response.text.strip()
+        except RecordingMiss:
+            raise
+        except ModelError as e:
+            print(f"Model error summarizing conversation: {e}")
+            return ""
+        except Exception as e:
+            print(f"Error summarizing conversation: {e}")
+            return ""
+
     def generate_personal_statement_tips(self, user_profile: Dict[str, Any], scholarship_info: Dict[str, Any] = None) -> str:
         """
         Generate personalized tips for writing a personal statement using Gemini AI
@@ -210,10 +341,12 @@ class AIService:
         """
 
         try:
-            response = self.model.generate_content(prompt)
+            response = self._generate(prompt, 'tips')
             return response.text.strip()
-        except ga_exceptions.ResponseError as e:
-            print(f"Gemini API error generating personal statement tips: {e}")
+        except RecordingMiss:
+            raise
+        except ModelError as e:
+            print(f"Model error generating personal statement tips: {e}")
             return "I'm sorry, I'm having trouble connecting to the AI for tips. Please try again later."
         except Exception as e:
             print(f"Error generating personal statement tips: {e}")
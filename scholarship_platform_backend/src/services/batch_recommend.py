@@ -0,0 +1,194 @@
+"""
+Nightly recompute of every user's scholarship match scores.
+
+Users are sharded by id modulo the shard count and shards run in a process
+pool. Each worker opens its own engine, loads the catalog once with
+precomputed scorer features and compiled constraints, prefilters and
+scores its users against it in memory with the local scorer and
+bulk-writes match percentages in batches. After every batch the shard's
+checkpoint is saved in the same transaction, so a rerun of the same job
+skips work that already landed.
+"""
+import datetime
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from src.database import get_database_url, get_engine_options
+from src.models.application import Application
+from src.models.batch_checkpoint import BatchCheckpoint
+from src.models.user import User
+from src.services.catalog_stream import iter_catalog
+from src.services.local_scorer import local_scorer
+from src.services.upsert import upsert
+
+JOB_NAME = 'recompute-recommendations'
+
+# Scholarship columns the local scorer and constraint compiler read
+SCORED_COLUMNS = (
+    'id', 'title', 'level_of_study', 'field_of_study', 'country_info',
+    'eligibility', 'academic_requirements', 'cgpa_requirements'
+)
+
+PROFILE_COLUMNS = (
+    'id', 'level_of_study', 'course_of_study', 'institution', 'academic_performance',
+    'state_of_origin', 'gender', 'religion', 'skills_interests'
+)
+
+BATCH_SIZE = int(os.getenv('RECOMPUTE_BATCH_SIZE', '200'))
+
+# Fixed independently of the worker count so a resumed run lines up with
+# the checkpoints of the interrupted one, and a slow shard never holds a
+# whole worker's share back
+SHARDS = int(os.getenv('RECOMPUTE_SHARDS', '64'))
+
+
+def default_job_id() -> str:
+    """One job per UTC day, so a rerun the same night resumes instead of starting over"""
+    return f"{JOB_NAME}:{datetime.datetime.utcnow().date().isoformat()}"
+
+
+def _load_checkpoint(session, job: str, shard: int) -> Optional[Dict[str, Any]]:
+    table = BatchCheckpoint.__table__
+    row = session.execute(
+        select(table.c.last_id, table.c.processed, table.c.finished)
+        .where(table.c.job == job, table.c.shard == shard)
+    ).mappings().first()
+    return dict(row) if row else None
+
+
+def _save_checkpoint(connection, job: str, shard: int, last_id: int, processed: int, finished: bool) -> None:
+    upsert(
+        connection,
+        BatchCheckpoint.__table__,
+        [{'job': job, 'shard': shard, 'last_id': last_id, 'processed': processed, 'finished': finished}],
+        conflict_columns=['job', 'shard'],
+        update_columns=['last_id', 'processed', 'finished'],
+        extra_updates={'updated_at': datetime.datetime.utcnow()}
+    )
+
+
+def _write_batch(session, job: str, shard: int, rows: List[Dict[str, Any]], last_id: int, processed: int,
+                 finished: bool = False) -> None:
+    connection = session.connection()
+    upsert(
+        connection,
+        Application.__table__,
+        rows,
+        conflict_columns=['user_id', 'scholarship_id'],
+        update_columns=['match_percentage']
+    )
+    _save_checkpoint(connection, job, shard, last_id, processed, finished)
+    session.commit()
+
+
+def run_shard(shard: int, shards: int, job: str, batch_size: int = BATCH_SIZE, top_n: int = 10) -> Dict[str, Any]:
+    """Score every user in one shard; runs inside a pool worker"""
+    started = time.perf_counter()
+    database_url = get_database_url()
+    engine = create_engine(database_url, **get_engine_options(database_url))
+    users_table = User.__table__
+
+    try:
+        with Session(engine) as session:
+            checkpoint = _load_checkpoint(session, job, shard)
+            if checkpoint and checkpoint['finished']:
+                return {'shard': shard, 'users': 0, 'skipped': True, 'seconds': 0.0, 'catalog_seconds': 0.0}
+
+            catalog = [
+                {'id': record['id'], 'features': local_scorer.scholarship_features(record)}
+                for record in iter_catalog(SCORED_COLUMNS, session=session)
+            ]
+            catalog_seconds = time.perf_counter() - started
+
+            last_id = checkpoint['last_id'] if checkpoint else 0
+            processed = checkpoint['processed'] if checkpoint else 0
+            users_done = 0
+            now = datetime.datetime.utcnow()
+
+            while True:
+                users = session.execute(
+                    select(*[users_table.c[name] for name in PROFILE_COLUMNS])
+                    .where(users_table.c.id % shards == shard)
+                    .where(users_table.c.id > last_id)
+                    .where(users_table.c.is_admin.isnot(True))
+                    .order_by(users_table.c.id)
+                    .limit(batch_size)
+                ).mappings().all()
+                if not users:
+                    break
+
+                rows = []
+                for user in users:
+                    # Hard eligibility is checked against the preloaded constraints, not one query per user
+                    for rec in local_scorer.recommend(local_scorer.profile_features(dict(user)), catalog, top_n):
+                        rows.append({
+                            'user_id': user['id'],
+                            'scholarship_id': rec['id'],
+                            'match_percentage': rec['match_percentage'],
+                            'status': 'Draft',
+                            'created_at': now
+                        })
+                    last_id = user['id']
+
+                users_done += len(users)
+                processed += len(users)
+                _write_batch(session, job, shard, rows, last_id, processed)
+
+            _write_batch(session, job, shard, [], last_id, processed, finished=True)
+    finally:
+        engine.dispose()
+
+    return {
+        'shard': shard,
+        'users': users_done,
+        'skipped': False,
+        'seconds': round(time.perf_counter() - started, 3),
+        'catalog_seconds': round(catalog_seconds, 3)
+    }
+
+
+def recompute_all(workers: Optional[int] = None, shards: Optional[int] = None, job: Optional[str] = None,
+                  batch_size: int = BATCH_SIZE, top_n: int = 10, report=print) -> Dict[str, Any]:
+    """
+    Recompute match scores for all users across a process pool.
+
+    Returns per-shard timings and overall users/sec.
+    """
+    workers = workers or os.cpu_count() or 1
+    shards = shards or SHARDS
+    job = job or default_job_id()
+    started = time.perf_counter()
+
+    results = []
+    # Spawned workers start with no inherited connections or locks
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = [pool.submit(run_shard, shard, shards, job, batch_size, top_n) for shard in range(shards)]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if result['skipped']:
+                report(f"shard {result['shard']}: already finished")
+            else:
+                report(f"shard {result['shard']}: {result['users']} users in {result['seconds']}s "
+                       f"(catalog load {result['catalog_seconds']}s)")
+
+    elapsed = time.perf_counter() - started
+    users = sum(result['users'] for result in results)
+    summary = {
+        'job': job,
+        'workers': workers,
+        'shards': shards,
+        'users': users,
+        'seconds': round(elapsed, 3),
+        'users_per_second': round(users / elapsed, 2) if elapsed else 0.0,
+        'shard_results': sorted(results, key=lambda result: result['shard'])
+    }
+    report(f"{job}: {users} users in {summary['seconds']}s ({summary['users_per_second']} users/sec) "
+           f"on {workers} workers")
+    return summary
@@ -0,0 +1,46 @@
+import os
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+from sqlalchemy import select
+
+from src.database import db
+from src.models.scholarship import Scholarship
+
+CATALOG_CHUNK_SIZE = int(os.getenv('CATALOG_CHUNK_SIZE', '500'))
+
+
+def iter_catalog(columns: Optional[Sequence[str]] = None, where=None,
+                 chunk_size: int = CATALOG_CHUNK_SIZE, session=None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield scholarships as plain dicts for catalog-wide passes (matching,
+    re-cleaning, exports, index builds).
+
+    Only the requested columns are selected, and rows are read in keyset
+    chunks of chunk_size ordered by id, so peak memory is one chunk no
+    matter how large the catalog is. Each chunk is its own short query, so
+    slow per-row work (e.g. LLM calls) never holds a cursor open.
+    """
+    session = session or db.session
+    table = Scholarship.__table__
+    selected = [table.c[name] for name in columns] if columns else list(table.c)
+    if table.c.id not in selected:
+        selected.insert(0, table.c.id)
+
+    last_id = None
+    while True:
+        stmt = select(*selected).order_by(table.c.id).limit(chunk_size)
+        if where is not None:
+            stmt = stmt.where(where)
+        if last_id is not None:
+            stmt = stmt.where(table.c.id > last_id)
+
+        rows = session.execute(stmt).mappings().all()
+        if not rows:
+            return
+
+        for row in rows:
+            yield dict(row)
+
+        last_id = rows[-1]['id']
+        if len(rows) < chunk_size:
+            return
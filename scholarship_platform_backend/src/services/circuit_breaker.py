@@ -0,0 +1,127 @@
+"""
+Circuit breaker for model calls.
+
+    closed     calls go through; the last `window` outcomes are tracked and
+               the circuit opens once at least `min_calls` of them show an
+               error share >= error_rate or a slow-call share >= slow_rate
+    open       calls are rejected at once (CircuitOpen) for open_seconds
+    half_open  up to half_open_probes calls go through as probes; that many
+               fast successes close the circuit, any failure reopens it
+
+AIService answers rejected match and cleaning calls with the local scorer
+and cleaner, so a slow or failing upstream costs no worker time.
+"""
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict
+
+from src.services.metrics import registry
+from src.services.model_backends import ModelError
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+circuit_state = registry.gauge('scholarsync_circuit_state', 'Circuit state (0 closed, 1 half-open, 2 open)')
+circuit_transitions = registry.counter('scholarsync_circuit_transitions_total', 'Circuit state changes by new state')
+circuit_rejections = registry.counter('scholarsync_circuit_rejections_total', 'Calls rejected by an open circuit')
+
+
+class CircuitOpen(ModelError):
+    """The circuit is open; the call was not attempted"""
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, window: int = 20, min_calls: int = 10, error_rate: float = 0.5,
+                 slow_call_seconds: float = 10.0, slow_rate: float = 0.5, open_seconds: float = 30.0,
+                 half_open_probes: int = 2, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.clock = clock
+        self.state = CLOSED
+        self._outcomes = deque(maxlen=window)  # (failed, slow)
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+        circuit_state.set(STATE_VALUES[CLOSED], circuit=name)
+
+    def _transition(self, state: str) -> None:
+        self.state = state
+        self._outcomes.clear()
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        if state == OPEN:
+            self._opened_at = self.clock()
+        circuit_state.set(STATE_VALUES[state], circuit=self.name)
+        circuit_transitions.inc(circuit=self.name, state=state)
+        print(f"Circuit {self.name} is now {state}", file=sys.stderr)
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead; every allowed call must be followed by record()"""
+        with self._lock:
+            if self.state == OPEN and self.clock() - self._opened_at >= self.open_seconds:
+                self._transition(HALF_OPEN)
+            if self.state == OPEN or (self.state == HALF_OPEN and self._probes_in_flight >= self.half_open_probes):
+                circuit_rejections.inc(circuit=self.name)
+                return False
+            if self.state == HALF_OPEN:
+                self._probes_in_flight += 1
+            return True
+
+    def record(self, seconds: float, failed: bool) -> None:
+        slow = seconds >= self.slow_call_seconds
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if failed or slow:
+                    self._transition(OPEN)
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.half_open_probes:
+                        self._transition(CLOSED)
+                return
+            if self.state == OPEN:
+                return  # A call that started before the circuit opened
+
+            self._outcomes.append((failed, slow))
+            if len(self._outcomes) < self.min_calls:
+                return
+            failures = sum(1 for failed_call, _ in self._outcomes if failed_call)
+            slow_calls = sum(1 for _, slow_call in self._outcomes if slow_call)
+            if failures >= self.error_rate * len(self._outcomes) or slow_calls >= self.slow_rate * len(self._outcomes):
+                self._transition(OPEN)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'state': self.state,
+                'recent_calls': len(self._outcomes),
+                'recent_failures': sum(1 for failed, _ in self._outcomes if failed),
+                'recent_slow_calls': sum(1 for _, slow in self._outcomes if slow),
+                'open_for_seconds': round(self.clock() - self._opened_at, 1) if self.state == OPEN else None
+            }
+
+
+def circuit_from_env(name: str, prefix: str = 'MODEL_CIRCUIT') -> CircuitBreaker:
+    return CircuitBreaker(
+        name,
+        window=int(os.getenv(f'{prefix}_WINDOW', '20')),
+        min_calls=int(os.getenv(f'{prefix}_MIN_CALLS', '10')),
+        error_rate=float(os.getenv(f'{prefix}_ERROR_RATE', '0.5')),
+        slow_call_seconds=float(os.getenv(f'{prefix}_SLOW_CALL_SECONDS', '10')),
+        slow_rate=float(os.getenv(f'{prefix}_SLOW_RATE', '0.5')),
+        open_seconds=float(os.getenv(f'{prefix}_OPEN_SECONDS', '30')),
+        half_open_probes=int(os.getenv(f'{prefix}_HALF_OPEN_PROBES', '2')),
+    )
+
+
+# Shared by every AIService in the process, so the web app and the crawler each trip once
+model_circuit = circuit_from_env('model')
@@ -0,0 +1,116 @@
+"""
+Server-side memory for the assistant chat.
+
+Every message is stored, but a chat prompt only ever carries the rolling
+summary of older turns (at most CHAT_SUMMARY_MAX_TOKENS), the messages not
+yet summarized (newest first, within CHAT_WINDOW_TOKENS) and the new
+message. Prompt size is therefore bounded however long a conversation
+runs, and a follow-up sends only its own text.
+
+Once more than CHAT_WINDOW_MESSAGES + CHAT_ROLLUP_BATCH messages sit outside
+the summary, all but the newest CHAT_WINDOW_MESSAGES are folded into it with
+one summarize call, or a local digest when the model is unavailable.
+Batching means one summarize call every few exchanges, not every turn.
+"""
+import datetime
+import os
+from typing import Dict, List, Optional, Tuple
+
+from src.database import db
+from src.models.conversation import Conversation
+from src.models.conversation_message import ConversationMessage
+from src.services.model_backends import estimate_tokens
+from src.services.prompt_budget import compact_whitespace, head_tail
+
+CHAT_WINDOW_MESSAGES = int(os.getenv('CHAT_WINDOW_MESSAGES', '6'))
+CHAT_ROLLUP_BATCH = int(os.getenv('CHAT_ROLLUP_BATCH', '4'))
+CHAT_WINDOW_TOKENS = int(os.getenv('CHAT_WINDOW_TOKENS', '1200'))
+CHAT_SUMMARY_MAX_TOKENS = int(os.getenv('CHAT_SUMMARY_MAX_TOKENS', '300'))
+
+# Longest message a user may send; longer ones are rejected, not truncated
+MAX_MESSAGE_CHARS = 4000
+
+TITLE_CHARS = 80
+
+
+def get_conversation(user_id: int, conversation_id: int) -> Optional[Conversation]:
+    return Conversation.query.filter_by(id=conversation_id, user_id=user_id).first()
+
+
+def start_conversation(user_id: int, first_message: str) -> Conversation:
+    title = compact_whitespace(first_message)
+    if len(title) > TITLE_CHARS:
+        title = title[:TITLE_CHARS - 3].rstrip() + '...'
+    conversation = Conversation(user_id=user_id, title=title)
+    db.session.add(conversation)
+    db.session.flush()
+    return conversation
+
+
+def _unsummarized(conversation: Conversation) -> List[ConversationMessage]:
+    return ConversationMessage.query.filter(
+        ConversationMessage.conversation_id == conversation.id,
+        ConversationMessage.id > conversation.summarized_through
+    ).order_by(ConversationMessage.id).all()
+
+
+def _as_turns(messages: List[ConversationMessage]) -> List[Dict[str, str]]:
+    return [{'role': message.role, 'content': message.content} for message in messages]
+
+
+def prompt_context(conversation: Conversation) -> Tuple[Optional[str], List[Dict[str, str]]]:
+    """(summary, recent turns oldest first) to send with the next message"""
+    history: List[Dict[str, str]] = []
+    remaining = CHAT_WINDOW_TOKENS
+    for message in reversed(_unsummarized(conversation)):
+        if remaining <= 0:
+            break
+        content = message.content
+        if message.tokens > remaining:
+            content = head_tail(content, remaining * 4)
+        history.append({'role': message.role, 'content': content})
+        remaining -= min(message.tokens, remaining)
+    history.reverse()
+    return conversation.summary or None, history
+
+
+def record_exchange(conversation: Conversation, user_message: str, reply: str) -> None:
+    for role, content in (('user', user_message), ('assistant', reply)):
+        db.session.add(ConversationMessage(
+            conversation_id=conversation.id, role=role, content=content, tokens=estimate_tokens(content)
+        ))
+    conversation.message_count = (conversation.message_count or 0) + 2
+    conversation.updated_at = datetime.datetime.utcnow()
+    db.session.flush()
+
+
+def local_digest(previous_summary: Optional[str], messages: List[Dict[str, str]]) -> str:
+    """Extractive stand-in for a model summary: the opening words of each student message"""
+    asked = [' '.join(message['content'].split()[:15]) for message in messages if message['role'] == 'user']
+    parts = [previous_summary] if previous_summary else []
+    if asked:
+        parts.append('The student then asked: ' + '; '.join(asked) + '.')
+    return ' '.join(parts)
+
+
+def roll_up(conversation: Conversation, ai_service) -> bool:
+    """Fold the oldest unsummarized messages into the summary once enough have piled up"""
+    messages = _unsummarized(conversation)
+    if len(messages) <= CHAT_WINDOW_MESSAGES + CHAT_ROLLUP_BATCH:
+        return False
+
+    folded = messages[:len(messages) - CHAT_WINDOW_MESSAGES]
+    turns = _as_turns(folded)
+    summary = ai_service.summarize_conversation(conversation.summary, turns,
+                                                max_words=CHAT_SUMMARY_MAX_TOKENS * 3 // 4)
+    if not summary:
+        summary = local_digest(conversation.summary, turns)
+    # Newest context matters most, so an overlong summary keeps more of its end
+    conversation.summary = head_tail(compact_whitespace(summary), CHAT_SUMMARY_MAX_TOKENS * 4, head_share=0.3)
+    conversation.summarized_through = folded[-1].id
+    return True
+
+
+def delete_conversation(conversation: Conversation) -> None:
+    ConversationMessage.query.filter_by(conversation_id=conversation.id).delete()
+    db.session.delete(conversation)
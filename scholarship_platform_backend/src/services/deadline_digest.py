@@ -0,0 +1,74 @@
+import datetime
+import os
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, insert, literal, or_, select
+
+from src.models.application import Application
+from src.models.deadline_digest import DeadlineDigest
+from src.models.scholarship import Scholarship
+
+DIGEST_DAYS = int(os.getenv('DEADLINE_DIGEST_DAYS', '7'))
+
+# Applications still worth a reminder
+OPEN_STATUSES = ('Draft',)
+
+
+def build_deadline_digest(connection, days: int = DIGEST_DAYS, today: Optional[datetime.date] = None) -> int:
+    """
+    Rebuild the digest of unsubmitted applications closing within days.
+
+    One INSERT ... SELECT driven by the deadline_date index: only
+    scholarships in the window are visited, then their applications by
+    scholarship_id, so the cost follows what is due soon rather than the
+    number of users. Runs in the caller's transaction; readers keep seeing
+    the previous digest until it commits.
+    """
+    today = today or datetime.date.today()
+    until = today + datetime.timedelta(days=days)
+    applications = Application.__table__
+    scholarships = Scholarship.__table__
+    digest = DeadlineDigest.__table__
+
+    due = (
+        select(
+            applications.c.user_id,
+            applications.c.id,
+            scholarships.c.id,
+            scholarships.c.title,
+            scholarships.c.deadline_date,
+            applications.c.status,
+            literal(datetime.datetime.utcnow(), digest.c.generated_at.type)
+        )
+        .select_from(scholarships.join(applications, applications.c.scholarship_id == scholarships.c.id))
+        .where(scholarships.c.deadline_date >= today, scholarships.c.deadline_date <= until)
+        .where(or_(applications.c.status.in_(OPEN_STATUSES), applications.c.status.is_(None)))
+    )
+
+    connection.execute(delete(digest))
+    result = connection.execute(insert(digest).from_select(
+        ['user_id', 'application_id', 'scholarship_id', 'scholarship_title', 'deadline_date', 'status', 'generated_at'],
+        due
+    ))
+    return result.rowcount
+
+
+def upcoming_deadlines(session, user_id: int, today: Optional[datetime.date] = None) -> List[Dict[str, Any]]:
+    """A user's digest rows, soonest first; a primary-key range read"""
+    today = today or datetime.date.today()
+    digest = DeadlineDigest.__table__
+    rows = session.execute(
+        select(digest)
+        .where(digest.c.user_id == user_id, digest.c.deadline_date >= today)
+        .order_by(digest.c.deadline_date, digest.c.application_id)
+    ).mappings().all()
+
+    return [{
+        'application_id': row['application_id'],
+        'scholarship_id': row['scholarship_id'],
+        'scholarship_title': row['scholarship_title'],
+        'deadline_date': row['deadline_date'].isoformat(),
+        'days_left': (row['deadline_date'] - today).days,
+        'status': row['status'],
+        'generated_at': row['generated_at'].isoformat()
+    } for row in rows]
@@ -0,0 +1,94 @@
+import calendar
+import re
+from datetime import date
+from typing import Any, List, Optional, Tuple
+
+MONTHS = {
+    name: number
+    for number in range(1, 13)
+    for name in (calendar.month_name[number].lower(), calendar.month_abbr[number].lower())
+}
+MONTHS['sept'] = 9
+
+_MONTH = r'(' + '|'.join(sorted(MONTHS, key=len, reverse=True)) + r')\.?'
+_DAY = r'(\d{1,2})(?:st|nd|rd|th)?'
+_YEAR = r'(\d{4})'
+
+_ISO_RE = re.compile(r'\b' + _YEAR + r'-(\d{1,2})-(\d{1,2})\b')
+_DAY_MONTH_RE = re.compile(r'\b' + _DAY + r'\s+(?:of\s+)?' + _MONTH + r',?\s+' + _YEAR + r'\b', re.I)
+_MONTH_DAY_RE = re.compile(r'\b' + _MONTH + r'\s+' + _DAY + r',?\s+' + _YEAR + r'\b', re.I)
+_NUMERIC_RE = re.compile(r'\b(\d{1,2})[/.](\d{1,2})[/.]' + _YEAR + r'\b')
+_MONTH_YEAR_RE = re.compile(r'\b' + _MONTH + r',?\s+' + _YEAR + r'\b', re.I)
+
+
+def _make_date(year, month, day) -> Optional[date]:
+    try:
+        return date(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+
+_CLOSING_RE = re.compile(r'\b(deadline|clos(?:e|es|ing)|due|until|before|by|ends?)\b', re.I)
+_CLOSING_WINDOW = 40
+
+
+def _blank(text: str, match) -> str:
+    """Blank out a matched date while keeping the positions of everything else"""
+    return text[:match.start()] + ' ' * (match.end() - match.start()) + text[match.end():]
+
+
+def _dates_with_positions(text: str) -> List[Tuple[int, date]]:
+    found = []
+
+    for pattern, order in ((_ISO_RE, 'ymd'), (_DAY_MONTH_RE, 'dmy'), (_MONTH_DAY_RE, 'mdy')):
+        for match in list(pattern.finditer(text)):
+            parts = dict(zip(order, match.groups()))
+            month = parts['m'] if parts['m'].isdigit() else MONTHS.get(parts['m'].lower())
+            found.append((match.start(), _make_date(parts['y'], month, parts['d'])))
+            text = _blank(text, match)
+
+    # Numeric dates are read day-first, as written in Nigeria and the UK,
+    # unless that is impossible
+    for match in list(_NUMERIC_RE.finditer(text)):
+        first, second, year = match.groups()
+        day, month = (first, second) if int(second) <= 12 else (second, first)
+        found.append((match.start(), _make_date(year, month, day)))
+        text = _blank(text, match)
+
+    # "March 2026" closes at the end of the month
+    for match in _MONTH_YEAR_RE.finditer(text):
+        month, year = MONTHS[match.group(1).lower()], int(match.group(2))
+        found.append((match.start(), _make_date(year, month, calendar.monthrange(year, month)[1])))
+
+    return [(position, d) for position, d in found if d is not None]
+
+
+def parse_deadline_dates(text: Any) -> List[date]:
+    """Every calendar date mentioned in free-text deadline wording, in no particular order"""
+    if not text:
+        return []
+    return [d for _, d in _dates_with_positions(str(text))]
+
+
+def parse_deadline(text: Any) -> Optional[date]:
+    """
+    Normalized deadline date for a scholarship's deadline text, or None for
+    "rolling", "varies" and other undated wording.
+
+    Dates right after closing wording ("closes", "deadline", "by") win over
+    others such as opening dates; among the rest the earliest is kept
+    (several rounds), so reminders never come too late.
+    """
+    if not text:
+        return None
+    text = str(text)
+    dates = _dates_with_positions(text)
+    if not dates:
+        return None
+
+    closing_ends = [match.end() for match in _CLOSING_RE.finditer(text)]
+    closing = [
+        d for position, d in dates
+        if any(0 <= position - end <= _CLOSING_WINDOW for end in closing_ends)
+    ]
+    return min(closing or [d for _, d in dates])
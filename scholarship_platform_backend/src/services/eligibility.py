@@ -0,0 +1,268 @@
+import re
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, delete, exists, insert, not_, or_
+
+from src.models.scholarship import Scholarship
+from src.models.scholarship_constraint import ScholarshipConstraint
+from src.services.facets import canonical_terms
+from src.services.taxonomy import ALIASES, COUNTRIES, LEVELS, find_aliases
+
+# Bit positions follow the taxonomy order, so masks stay stable as long as
+# new terms are only ever appended there
+LEVEL_BITS = {term: 1 << position for position, term in enumerate(LEVELS)}
+COUNTRY_BITS = {term: 1 << position for position, term in enumerate(COUNTRIES)}
+
+_NUMBER = r'(\d+(?:\.\d+)?)'
+_RATIO_RE = re.compile(_NUMBER + r'\s*(?:/|out of|on a scale of)\s*' + _NUMBER, re.IGNORECASE)
+_NUMBER_RE = re.compile(_NUMBER)
+_BARE_GRADE_RE = re.compile(r'^\s*' + _NUMBER + r'\s*$')
+# Wording that marks a nearby bare number as a grade
+_GRADE_WORD_RE = re.compile(r'\b(c?gpa|grade|grades|grade point|cumulative|average|class)\b', re.IGNORECASE)
+# Characters searched for that wording before a number ("CGPA of 3.5") and after it ("3.5 GPA")
+GRADE_WORDS_BEFORE, GRADE_WORDS_AFTER = 30, 12
+# Language and admission test scores ("IELTS 6.5", "TOEFL iBT 90/120") are not grades
+_TEST_SCORE_RE = re.compile(
+    r'\b(ielts|toefl(?:\s+ibt)?|pte|gre|gmat|sat|act|duolingo|waec|jamb|utme)\b[^0-9.;,]{0,20}'
+    + _NUMBER + r'(?:\s*/\s*\d+)?',
+    re.IGNORECASE
+)
+_NIGERIAN_LEVEL_RE = re.compile(r'\b[1-6]00\s*l(?:evel|vl)?\b', re.IGNORECASE)
+
+# Nigerian degree classes as a fraction of the 5.0 scale
+_DEGREE_CLASSES = (
+    (re.compile(r'first\s*class', re.I), 4.5 / 5),
+    (re.compile(r'(second\s*class\s*upper|2\s*[:.]\s*1|upper\s*second)', re.I), 3.5 / 5),
+    (re.compile(r'(second\s*class\s*lower|2\s*[:.]\s*2|lower\s*second)', re.I), 2.4 / 5),
+    (re.compile(r'third\s*class', re.I), 1.5 / 5),
+)
+
+_MALE_RE = re.compile(r'\b(men|man|male|males|boys?)\b', re.I)
+_MALE_ONLY_RE = re.compile(r'\b(male (?:students|applicants|candidates) only|only (?:male|men))\b', re.I)
+# Only restrictive wording sets a gender; "women are encouraged to apply" does not
+_FEMALE_ONLY_RE = re.compile(
+    r'\b((?:women|female|girls|ladies)(?: students| applicants| candidates)? only'
+    r'|only (?:for )?(?:women|female|girls|ladies)'
+    r'|open (?:only )?to (?:women|females?|girls|ladies|female (?:students|applicants|candidates))'
+    r'|must be (?:a )?(?:female|woman|women)'
+    r'|for (?:women|girls|ladies|female (?:students|applicants|candidates)))\b',
+    re.I
+)
+# Preference wording turns a gender mention into a soft signal, not a rule
+_PREFERENCE_RE = re.compile(r'\b(encouraged?|priority|prioriti[sz]ed?|preference|preferred|especially|particularly)\b', re.I)
+
+# Clause wording that turns a country list into an exclusion ("citizens of X are
+# not eligible", "open to all nationals except ..."); such clauses are skipped
+_NEGATION_RE = re.compile(
+    r"\b(not|ineligible|except|excluding|exclude[sd]?|other than|barred|cannot|can't|unless)\b", re.IGNORECASE
+)
+_CLAUSE_BREAK_RE = re.compile(r'[.;:\n]')
+
+# A country list that only gives examples, or names a group the taxonomy has no
+# terms for, is not the full list; such text leaves the country rule unknown
+_EXAMPLE_RE = re.compile(r'\b(for example|for instance|such as|e\.\s?g\.?|including|includes|like)\b', re.IGNORECASE)
+_COUNTRY_GROUP_RE = re.compile(
+    r'\b(countries|nations|territories|(?<!united )states|developing|low[- ]income|middle[- ]income|lmics?|commonwealth'
+    r'|(?<!south )africa|(?<!south )african|sub-saharan|europe|european|eu|eea|asia|asian|caribbean|pacific'
+    r'|latin america|middle east|arab|ecowas|member)\b',
+    re.IGNORECASE
+)
+
+# A country list introduced by nationality wording restricts eligibility
+_NATIONALITY_RE = re.compile(
+    r'(citizens?|nationals?|residents?|passport holders?)\s+(?:of|from)\s+([^.;:]{1,200})'
+    r'|open (?:only )?to\s+([^.;:]{1,200}?)\s+(citizens|nationals|residents|students|applicants)',
+    re.IGNORECASE
+)
+
+
+# Scales tried, in order, for a bare grade. A requirement is read on the
+# widest plausible scale and a student's grade on the narrowest, so an
+# ambiguous "3.5" never excludes anyone.
+REQUIREMENT_SCALES = (5.0, 10.0, 100.0)
+STUDENT_SCALES = (4.0, 5.0, 10.0, 100.0)
+
+# Small tolerance for rounding between scales (3.5/5 vs 2.8/4)
+CGPA_TOLERANCE = 0.01
+
+
+def _scale_ratio(value: float, scale: Optional[float] = None, scales=REQUIREMENT_SCALES) -> Optional[float]:
+    """Express a grade as a fraction of its scale, guessing from scales when none is given"""
+    if scale is None:
+        for scale in scales:
+            if value <= scale:
+                break
+        else:
+            return None
+    if scale <= 0 or value > scale:
+        return None
+    return value / scale
+
+
+def parse_grade_ratio(text: Any, scales=REQUIREMENT_SCALES, pick=min,
+                      require_grade_words: bool = True) -> Optional[float]:
+    """
+    Grade mentioned in text as a fraction of its scale (None when none is
+    found). With several grades, pick chooses one; the lowest requirement
+    or the highest student grade keeps the rules lenient.
+
+    Ratios with an explicit scale and degree classes always count. A bare
+    number counts when it is the whole text or, with require_grade_words,
+    sits just after or before CGPA/GPA/grade wording, so
+    "IELTS 6.5" or "2 reference letters" never become a grade.
+    """
+    if not text:
+        return None
+    text = _TEST_SCORE_RE.sub(' ', str(text))
+    if _BARE_GRADE_RE.match(text):
+        require_grade_words = False
+
+    ratios = []
+    for value, scale in _RATIO_RE.findall(text):
+        ratio = _scale_ratio(float(value), float(scale))
+        if ratio is not None:
+            ratios.append(ratio)
+    remainder = _RATIO_RE.sub(' ', text)
+    for pattern, ratio in _DEGREE_CLASSES:
+        if pattern.search(remainder):
+            ratios.append(ratio)
+            remainder = pattern.sub(' ', remainder)
+    for match in _NUMBER_RE.finditer(remainder):
+        if require_grade_words and not _GRADE_WORD_RE.search(
+                remainder[max(0, match.start() - GRADE_WORDS_BEFORE):match.end() + GRADE_WORDS_AFTER]):
+            continue
+        value = match.group(1)
+        ratio = _scale_ratio(float(value), scales=scales)
+        # Bare numbers under 1 are version numbers or noise, not grades
+        if ratio is not None and float(value) >= 1:
+            ratios.append(ratio)
+
+    return pick(ratios) if ratios else None
+
+
+def _level_mask(raw: Any) -> int:
+    mask = 0
+    for term in canonical_terms('level', raw):
+        mask |= LEVEL_BITS.get(term, 0)
+    return mask
+
+
+def _clause(text: str, start: int, end: int) -> str:
+    """The clause around text[start:end], between the nearest . ; : or line breaks"""
+    before = [m.end() for m in _CLAUSE_BREAK_RE.finditer(text, 0, start)]
+    after = _CLAUSE_BREAK_RE.search(text, end)
+    return text[before[-1] if before else 0:after.start() if after else len(text)]
+
+
+def _country_mask(text: str) -> int:
+    """Bit per allowed nationality, or 0 when the text does not give the full list"""
+    mask = 0
+    for match in _NATIONALITY_RE.finditer(text):
+        clause = _clause(text, match.start(), match.end())
+        # An excluded country list must not turn into an allow-list
+        if _NEGATION_RE.search(clause):
+            continue
+        # Filtering on a partial list would exclude eligible students
+        if _EXAMPLE_RE.search(clause) or _COUNTRY_GROUP_RE.search(clause):
+            return 0
+        window = (match.group(2) or match.group(3) or '').lower()
+        for alias in find_aliases('country', window):
+            for term in ALIASES['country'][alias]:
+                mask |= COUNTRY_BITS.get(term, 0)
+    return mask
+
+
+def _gender(text: str) -> Optional[str]:
+    for pattern, gender in ((_MALE_ONLY_RE, 'male'), (_FEMALE_ONLY_RE, 'female')):
+        for match in pattern.finditer(text):
+            clause = _clause(text, match.start(), match.end())
+            if _PREFERENCE_RE.search(clause):
+                continue
+            # "open to women and men" names both
+            if gender == 'female' and _MALE_RE.search(clause) and not _NEGATION_RE.search(clause):
+                continue
+            return gender
+    return None
+
+
+def compile_constraints(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Structured hard constraints from a scholarship record's level, CGPA, country and eligibility text"""
+    text = ' '.join(str(record.get(column) or '') for column in ('title', 'eligibility', 'academic_requirements'))
+    return {
+        'level_mask': _level_mask(record.get('level_of_study')),
+        'min_cgpa_ratio': parse_grade_ratio(record.get('cgpa_requirements')),
+        'gender': _gender(text),
+        'country_mask': _country_mask(text),
+    }
+
+
+def sync_scholarship_constraints(connection, scholarship_id: int, record: Dict[str, Any]) -> None:
+    """Replace a scholarship's compiled constraints; runs inside the caller's transaction"""
+    table = ScholarshipConstraint.__table__
+    connection.execute(delete(table).where(table.c.scholarship_id == scholarship_id))
+    connection.execute(insert(table), [{'scholarship_id': scholarship_id, **compile_constraints(record)}])
+
+
+def profile_constraints(user_profile: Dict[str, Any]) -> Dict[str, Any]:
+    """The user-side values the constraints are checked against; None means unknown"""
+    level = user_profile.get('level_of_study') or ''
+    level_mask = LEVEL_BITS['undergraduate'] if _NIGERIAN_LEVEL_RE.search(level) else _level_mask(level)
+
+    gender = (user_profile.get('gender') or '').strip().lower()
+    gender = {'f': 'female', 'woman': 'female', 'm': 'male', 'man': 'male'}.get(gender, gender)
+
+    # Profiles have no country field yet, so the country check is usually skipped
+    country = (user_profile.get('country') or '').strip().lower()
+    country_terms = canonical_terms('country', country) if country else []
+    return {
+        'level_mask': level_mask or None,
+        # The profile field only holds grades, so any number in it counts
+        'cgpa_ratio': parse_grade_ratio(user_profile.get('academic_performance'), scales=STUDENT_SCALES, pick=max,
+                                        require_grade_words=False),
+        'gender': gender if gender in ('female', 'male') else None,
+        'country_mask': COUNTRY_BITS.get(country_terms[0]) if country_terms else None,
+    }
+
+
+def eligible_clause(user_profile: Dict[str, Any]):
+    """
+    SQL filter on Scholarship keeping only rows the user can apply to.
+
+    Evaluated set-wise by the database over the compiled constraint table;
+    a scholarship is excluded only when a known constraint is definitely
+    violated, so anything uncertain still reaches scoring.
+    """
+    user = profile_constraints(user_profile)
+    c = ScholarshipConstraint.__table__
+    passes: List[Any] = []
+
+    if user['level_mask']:
+        passes.append(or_(c.c.level_mask == 0, c.c.level_mask.op('&')(user['level_mask']) != 0))
+    if user['cgpa_ratio'] is not None:
+        passes.append(or_(c.c.min_cgpa_ratio.is_(None), c.c.min_cgpa_ratio <= user['cgpa_ratio'] + CGPA_TOLERANCE))
+    if user['gender']:
+        passes.append(or_(c.c.gender.is_(None), c.c.gender == user['gender']))
+    if user['country_mask']:
+        passes.append(or_(c.c.country_mask == 0, c.c.country_mask.op('&')(user['country_mask']) != 0))
+
+    if not passes:
+        return None
+    return not_(exists().where(and_(c.c.scholarship_id == Scholarship.__table__.c.id, not_(and_(*passes)))))
+
+
+def violates_constraints(user: Dict[str, Any], constraints: Dict[str, Any]) -> bool:
+    """
+    In-memory twin of eligible_clause, for callers that already hold compiled
+    constraints: user is profile_constraints(), constraints is
+    compile_constraints(). True only when a known constraint is definitely violated.
+    """
+    if user['level_mask'] and constraints['level_mask'] and not constraints['level_mask'] & user['level_mask']:
+        return True
+    if (user['cgpa_ratio'] is not None and constraints['min_cgpa_ratio'] is not None
+            and constraints['min_cgpa_ratio'] > user['cgpa_ratio'] + CGPA_TOLERANCE):
+        return True
+    if user['gender'] and constraints['gender'] and constraints['gender'] != user['gender']:
+        return True
+    if user['country_mask'] and constraints['country_mask'] and not constraints['country_mask'] & user['country_mask']:
+        return True
+    return False
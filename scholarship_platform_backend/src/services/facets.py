@@ -0,0 +1,167 @@
+import ast
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, delete, func, insert, select
+
+from src.models.scholarship import Scholarship
+from src.models.scholarship_facet import ScholarshipFacet
+from src.services.taxonomy import ALIASES, resolve_terms
+
+# Facet name -> (scholarship column, get_scholarships filter param)
+FACETS = {
+    'country': ('country_info', 'country_info'),
+    'level': ('level_of_study', 'level'),
+    'field': ('field_of_study', 'field'),
+}
+
+ALIAS_LOOKUP = set().union(*ALIASES.values())
+
+_SPLIT_RE = re.compile(r'\s*(?:,|;|/|\||\band\b|&)\s*', re.IGNORECASE)
+
+
+def normalize_facet_value(value: Any) -> str:
+    """Lowercase and collapse whitespace so spellings of the same value share a row"""
+    return re.sub(r'\s+', ' ', str(value)).strip(' .\'"').lower()
+
+
+def parse_facet_values(raw: Any) -> List[str]:
+    """
+    Split a stored country/level/field value into normalized raw values.
+
+    Handles real lists, the stringified Python lists the pipeline writes
+    (e.g. "['Nigeria', 'UK']"), JSON arrays and comma/slash/"and" separated text.
+    """
+    if raw is None:
+        return []
+
+    if isinstance(raw, str):
+        text = raw.strip()
+        # Don't split names that contain a separator ("Trinidad and Tobago")
+        if text and not text.startswith('['):
+            whole = normalize_facet_value(text)
+            if whole in ALIAS_LOOKUP:
+                return [whole]
+        if text.startswith('[') and text.endswith(']'):
+            for parse in (json.loads, ast.literal_eval):
+                try:
+                    raw = parse(text)
+                    break
+                except (ValueError, SyntaxError):
+                    continue
+            else:
+                raw = text.strip('[]')
+
+    items = raw if isinstance(raw, (list, tuple, set)) else _SPLIT_RE.split(str(raw))
+
+    values = []
+    for item in items:
+        value = normalize_facet_value(item)
+        if value and value not in values and len(value) <= 100:
+            values.append(value)
+    return values
+
+
+def canonical_terms(facet: str, raw: Any) -> List[str]:
+    """Canonical vocabulary terms for a raw column value or filter param"""
+    terms = []
+    for value in parse_facet_values(raw):
+        for term in resolve_terms(facet, value):
+            if term not in terms:
+                terms.append(term)
+    return terms
+
+
+def extract_facets(record: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Canonical facet terms for a scholarship record (dict of scholarship columns)"""
+    return {facet: canonical_terms(facet, record.get(column)) for facet, (column, _) in FACETS.items()}
+
+
+def sync_scholarship_facets(connection, scholarship_id: int, record: Dict[str, Any]) -> None:
+    """Replace a scholarship's facet rows; runs inside the caller's transaction"""
+    table = ScholarshipFacet.__table__
+    connection.execute(delete(table).where(table.c.scholarship_id == scholarship_id))
+
+    rows = [
+        {'scholarship_id': scholarship_id, 'facet': facet, 'value': value}
+        for facet, values in extract_facets(record).items()
+        for value in values
+    ]
+    if rows:
+        connection.execute(insert(table), rows)
+
+
+def facet_filters_from_args(args) -> Dict[str, List[str]]:
+    """
+    Map get_scholarships-style query params onto canonical facet terms.
+
+    Aliases resolve to their terms ("USA" -> united states); a param naming
+    several terms ("postgraduate") matches any of them.
+    """
+    filters = {}
+    for facet, (_, param) in FACETS.items():
+        value = args.get(param)
+        if value and value.strip():
+            terms = canonical_terms(facet, value)
+            if terms:
+                filters[facet] = terms
+    return filters
+
+
+def facet_filter_key(filters: Dict[str, List[str]]) -> tuple:
+    """Hashable cache key for resolved facet filters"""
+    return tuple(sorted((facet, tuple(sorted(terms))) for facet, terms in filters.items()))
+
+
+def apply_facet_filters(query, id_column, filters: Dict[str, List[str]]):
+    """Restrict a query to scholarships having every filtered facet, via indexed equality joins"""
+    table = ScholarshipFacet.__table__
+    for facet, terms in filters.items():
+        if len(terms) == 1:
+            match = table.alias(f'filter_{facet}')
+            query = query.join(match, and_(
+                match.c.scholarship_id == id_column,
+                match.c.facet == facet,
+                match.c.value == terms[0]
+            ))
+        else:
+            # Semi-join so a scholarship listing several of the terms appears once
+            query = query.filter(id_column.in_(
+                select(table.c.scholarship_id).where(table.c.facet == facet, table.c.value.in_(terms))
+            ))
+    return query
+
+
+def count_facets(session, filters: Dict[str, List[str]], limit: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Count scholarships per facet value under the current filter set.
+
+    Each facet is counted with every other active filter applied but not its
+    own, so the sidebar shows how many results picking a sibling value would
+    give. Filters are indexed equality joins on scholarship_facet, never
+    text scans.
+    """
+    table = ScholarshipFacet.__table__
+    counts = {}
+
+    for facet in FACETS:
+        counted = table.alias('counted')
+        stmt = select(counted.c.value, func.count().label('count')).where(counted.c.facet == facet)
+
+        other_filters = {name: terms for name, terms in filters.items() if name != facet}
+        if other_filters:
+            stmt = stmt.where(counted.c.scholarship_id.in_(
+                apply_facet_filters(select(Scholarship.__table__.c.id), Scholarship.__table__.c.id, other_filters)
+            ))
+
+        stmt = stmt.group_by(counted.c.value).order_by(func.count().desc(), counted.c.value)
+        if limit:
+            stmt = stmt.limit(limit)
+
+        counts[facet] = [
+            {'value': row.value, 'count': row.count, 'selected': row.value in filters.get(facet, [])}
+            for row in session.execute(stmt)
+        ]
+
+    return counts
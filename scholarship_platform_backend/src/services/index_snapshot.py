@@ -0,0 +1,325 @@
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select, text
+
+from src.models.scholarship_facet import ScholarshipFacet
+from src.services.query_cache import SELECT_CATALOG_VERSION_SQL
+
+DEFAULT_SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'snapshots')
+SNAPSHOT_POLL_SECONDS = float(os.getenv('SNAPSHOT_POLL_SECONDS', '5'))
+SNAPSHOTS_KEPT = int(os.getenv('SNAPSHOTS_KEPT', '3'))
+SNAPSHOT_FORMAT = 1
+
+
+def get_snapshot_dir():
+    """Directory holding versioned index snapshots, overridable with INDEX_SNAPSHOT_DIR"""
+    return os.getenv('INDEX_SNAPSHOT_DIR', DEFAULT_SNAPSHOT_DIR)
+
+
+class IndexSnapshot:
+    """
+    A read-only, memory-mapped snapshot of the matching indexes.
+
+    Layout of a snapshot directory (v000042/):
+      manifest.json  format, version, catalog_version, embedder, dim, row counts
+      ids.i64        scholarship ids, sorted ascending
+      vectors.f32    embedding rows aligned with ids.i64
+      postings.i64   sorted scholarship ids per facet value, concatenated
+      postings.json  "facet:value" -> [offset, length] into postings.i64
+
+    Snapshots are immutable once CURRENT points at them, so every worker can
+    map the same files and share their pages through the OS page cache.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, 'manifest.json')) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get('format') != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported snapshot format in {path}")
+
+        rows, dim = self.manifest['rows'], self.manifest['dim']
+        self.ids = self._map('ids.i64', np.int64, (rows,))
+        self.vectors = self._map('vectors.f32', np.float32, (rows, dim))
+        self.postings = self._map('postings.i64', np.int64, (self.manifest['postings'],))
+        with open(os.path.join(path, 'postings.json')) as f:
+            self.posting_offsets = json.load(f)
+
+    def _map(self, name, dtype, shape):
+        if shape[0] == 0:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(os.path.join(self.path, name), dtype=dtype, mode='r', shape=shape)
+
+    @property
+    def version(self) -> int:
+        return self.manifest['version']
+
+    @property
+    def catalog_version(self) -> int:
+        return self.manifest['catalog_version']
+
+    def vector_for(self, scholarship_id: int) -> Optional[np.ndarray]:
+        row = np.searchsorted(self.ids, scholarship_id)
+        if row < len(self.ids) and self.ids[row] == scholarship_id:
+            return np.array(self.vectors[row])
+        return None
+
+    def search_vector(self, query: np.ndarray, limit: int = 10, exclude: Iterable[int] = (),
+                      min_score: float = 0.0) -> List[Tuple[int, float]]:
+        """Top matches scoring above min_score as (scholarship_id, cosine score), best first"""
+        if len(self.ids) == 0:
+            return []
+
+        scores = self.vectors @ query.astype(np.float32)
+        exclude = set(int(i) for i in exclude)
+        wanted = min(len(scores), limit + len(exclude))
+        top = np.argpartition(-scores, wanted - 1)[:wanted]
+        top = top[np.argsort(-scores[top])]
+
+        results = []
+        for row in top:
+            if scores[row] <= min_score:
+                break
+            scholarship_id = int(self.ids[row])
+            if scholarship_id in exclude:
+                continue
+            results.append((scholarship_id, float(scores[row])))
+            if len(results) == limit:
+                break
+        return results
+
+    def posting(self, facet: str, value: str) -> np.ndarray:
+        offset, length = self.posting_offsets.get(f'{facet}:{value}', (0, 0))
+        return self.postings[offset:offset + length]
+
+    def matching_ids(self, facet: str, terms: List[str]) -> np.ndarray:
+        """Sorted ids having any of the terms for a facet"""
+        if len(terms) == 1:
+            return np.asarray(self.posting(facet, terms[0]))
+        return np.unique(np.concatenate([self.posting(facet, term) for term in terms]))
+
+    def facet_counts(self, facets: Iterable[str], filters: Dict[str, List[str]],
+                     limit: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Same result as facets.count_facets, computed from postings instead of SQL"""
+        counts = {}
+        for facet in facets:
+            base = None
+            for other_facet, terms in filters.items():
+                if other_facet == facet:
+                    continue
+                ids = self.matching_ids(other_facet, terms)
+                base = ids if base is None else np.intersect1d(base, ids, assume_unique=True)
+
+            prefix = f'{facet}:'
+            values = []
+            for key, (offset, length) in self.posting_offsets.items():
+                if not key.startswith(prefix):
+                    continue
+                if base is None:
+                    count = length
+                else:
+                    count = np.intersect1d(self.postings[offset:offset + length], base, assume_unique=True).size
+                if count:
+                    values.append((key[len(prefix):], int(count)))
+
+            values.sort(key=lambda item: (-item[1], item[0]))
+            if limit:
+                values = values[:limit]
+            counts[facet] = [
+                {'value': value, 'count': count, 'selected': value in filters.get(facet, [])}
+                for value, count in values
+            ]
+        return counts
+
+
+class MergedIndex:
+    """
+    A snapshot plus the rows appended to the live index after it was
+    published, so new scholarships are searchable before the next snapshot.
+    Rows re-embedded in place show their new vector only from the next one.
+    """
+
+    def __init__(self, snapshot: IndexSnapshot, ids: np.ndarray, vectors: np.ndarray):
+        self.snapshot = snapshot
+        self.ids = ids
+        self.vectors = vectors
+
+    def vector_for(self, scholarship_id: int) -> Optional[np.ndarray]:
+        vector = self.snapshot.vector_for(scholarship_id)
+        if vector is None:
+            rows = np.flatnonzero(self.ids == scholarship_id)
+            if len(rows):
+                vector = np.array(self.vectors[rows[-1]])
+        return vector
+
+    def search_vector(self, query: np.ndarray, limit: int = 10, exclude: Iterable[int] = (),
+                      min_score: float = 0.0) -> List[Tuple[int, float]]:
+        exclude = set(int(i) for i in exclude)
+        results = self.snapshot.search_vector(query, limit=limit, exclude=exclude, min_score=min_score)
+        scores = self.vectors @ query.astype(np.float32)
+        for row in np.flatnonzero(scores > min_score):
+            scholarship_id = int(self.ids[row])
+            if scholarship_id not in exclude:
+                results.append((scholarship_id, float(scores[row])))
+        results.sort(key=lambda match: -match[1])
+        return results[:limit]
+
+
+def _next_version(root: str) -> int:
+    versions = [int(name[1:]) for name in os.listdir(root) if name.startswith('v') and name[1:].isdigit()]
+    return max(versions, default=0) + 1
+
+
+def publish_snapshot(session, semantic_index=None, chunk_rows: int = 4096) -> str:
+    """
+    Write a new snapshot from the live semantic index and the facet table,
+    then atomically point CURRENT at it. Runs after each crawl and from
+    `flask publish-index-snapshot`; workers pick it up within
+    SNAPSHOT_POLL_SECONDS, and search sees rows added in between through
+    MergedIndex.
+    """
+    from src.services.semantic_index import semantic_index as live_index
+
+    live_index = semantic_index or live_index
+    root = get_snapshot_dir()
+    os.makedirs(root, exist_ok=True)
+
+    catalog_version = session.execute(text(SELECT_CATALOG_VERSION_SQL)).scalar() or 0
+    tmp_path = os.path.join(root, f'.tmp-{os.getpid()}-{threading.get_ident()}')
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    # Vectors, re-ordered by scholarship id so lookups are a binary search
+    ids, vectors, live_generation = live_index.arrays()
+    order = np.argsort(ids, kind='stable')
+    with open(os.path.join(tmp_path, 'ids.i64'), 'wb') as f:
+        f.write(np.asarray(ids)[order].astype(np.int64).tobytes())
+    with open(os.path.join(tmp_path, 'vectors.f32'), 'wb') as f:
+        for start in range(0, len(order), chunk_rows):
+            f.write(np.asarray(vectors[order[start:start + chunk_rows]], dtype=np.float32).tobytes())
+
+    # Facet postings, streamed from the facet index in (facet, value, id) order
+    table = ScholarshipFacet.__table__
+    offsets: Dict[str, List[int]] = {}
+    total = 0
+    buffer: List[int] = []
+    with open(os.path.join(tmp_path, 'postings.i64'), 'wb') as f:
+        stmt = select(table.c.facet, table.c.value, table.c.scholarship_id).order_by(
+            table.c.facet, table.c.value, table.c.scholarship_id
+        )
+        for facet, value, scholarship_id in session.execute(stmt):
+            key = f'{facet}:{value}'
+            if key not in offsets:
+                offsets[key] = [total, 0]
+            offsets[key][1] += 1
+            buffer.append(scholarship_id)
+            total += 1
+            if len(buffer) >= chunk_rows:
+                f.write(np.array(buffer, dtype=np.int64).tobytes())
+                buffer = []
+        if buffer:
+            f.write(np.array(buffer, dtype=np.int64).tobytes())
+    with open(os.path.join(tmp_path, 'postings.json'), 'w') as f:
+        json.dump(offsets, f)
+
+    with open(os.path.join(tmp_path, 'manifest.json'), 'w') as f:
+        json.dump({
+            'format': SNAPSHOT_FORMAT,
+            'version': None,  # filled in below once the version is claimed
+            'catalog_version': catalog_version,
+            'embedder': live_index.embedder.name,
+            'dim': live_index.embedder.dim,
+            'rows': int(len(order)),
+            # Live rows past these are merged into searches until the next snapshot
+            'live_generation': live_generation,
+            'live_rows': int(len(order)),
+            'postings': total,
+            'created_at': datetime.now(timezone.utc).isoformat()
+        }, f)
+
+    # Claim the next version number; a concurrent publisher that took it first
+    # makes the rename fail, so retry with the following one
+    while True:
+        version = _next_version(root)
+        name = f'v{version:06d}'
+        _set_manifest_version(tmp_path, version)
+        try:
+            os.rename(tmp_path, os.path.join(root, name))
+            break
+        except OSError:
+            if not os.path.isdir(os.path.join(root, name)):
+                raise
+
+    current_tmp = os.path.join(root, f'CURRENT.{os.getpid()}.tmp')
+    with open(current_tmp, 'w') as f:
+        f.write(name)
+    os.replace(current_tmp, os.path.join(root, 'CURRENT'))
+
+    _prune(root, keep=SNAPSHOTS_KEPT)
+    return name
+
+
+def _set_manifest_version(path: str, version: int) -> None:
+    manifest_path = os.path.join(path, 'manifest.json')
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    manifest['version'] = version
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f)
+
+
+def _prune(root: str, keep: int) -> None:
+    names = sorted(name for name in os.listdir(root) if name.startswith('v') and name[1:].isdigit())
+    for name in names[:-keep]:
+        # Workers still mapping an old snapshot keep their pages until they swap
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+class SnapshotStore:
+    """Per-process handle on the current snapshot, hot-swapped when CURRENT changes"""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or get_snapshot_dir()
+        self._lock = threading.Lock()
+        self._snapshot: Optional[IndexSnapshot] = None
+        self._name: Optional[str] = None
+        self._checked_at = 0.0
+
+    def current(self) -> Optional[IndexSnapshot]:
+        now = time.monotonic()
+        if now - self._checked_at < SNAPSHOT_POLL_SECONDS:
+            return self._snapshot
+
+        with self._lock:
+            self._checked_at = now
+            try:
+                with open(os.path.join(self.root, 'CURRENT')) as f:
+                    name = f.read().strip()
+            except OSError:
+                return self._snapshot
+
+            if name != self._name:
+                try:
+                    self._snapshot = IndexSnapshot(os.path.join(self.root, name))
+                    self._name = name
+                    # stderr, so the JSON output of CLI commands stays clean
+                    print(f"Loaded index snapshot {name}", file=sys.stderr)
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"Error loading index snapshot {name}: {e}", file=sys.stderr)
+            return self._snapshot
+
+    def reload(self) -> Optional[IndexSnapshot]:
+        """Check CURRENT now instead of waiting for the poll interval"""
+        self._checked_at = 0.0
+        return self.current()
+
+
+snapshot_store = SnapshotStore()
@@ -0,0 +1,203 @@
+"""
+HTTP load test for a locally running API seeded with `flask seed-data`.
+
+Each virtual user logs in as one seeded account and loops over a weighted
+mix of listing, filtering, detail, suggested, applications and profile
+update requests until the run ends. Results are per endpoint (count,
+errors, p50/p95/p99 latency, throughput) as JSON with stable keys, so two
+runs can be diffed across commits.
+"""
+import datetime
+import json
+import math
+import random
+import subprocess
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from src.services.seed import SEED_PASSWORD, seed_email
+
+FIELDS = ['engineering', 'computer science', 'medicine', 'law', 'business', 'agriculture', 'education']
+COUNTRIES = ['uk', 'usa', 'germany', 'canada', 'nigeria', 'australia']
+LEVELS = ['undergraduate', 'masters', 'phd']
+SKILLS = ['python', 'research', 'leadership', 'data analysis', 'writing', 'robotics', 'debate']
+
+
+class VirtualUser:
+    """One logged-in client; actions return (endpoint name, method, path, json body)"""
+
+    def __init__(self, base_url: str, email: str, password: str, rng: random.Random, timeout: float):
+        self.base_url = base_url.rstrip('/')
+        self.email = email
+        self.password = password
+        self.rng = rng
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.scholarship_ids: List[int] = []
+
+    def login(self) -> bool:
+        response = self.session.post(f'{self.base_url}/api/auth/login',
+                                     json={'email': self.email, 'password': self.password}, timeout=self.timeout)
+        return response.status_code == 200
+
+    def list_scholarships(self):
+        return 'list', 'GET', f'/api/scholarships/?page={self.rng.randint(1, 20)}&per_page=10', None
+
+    def filter_scholarships(self):
+        params = [f'field={self.rng.choice(FIELDS)}']
+        if self.rng.random() < 0.6:
+            params.append(f'country_info={self.rng.choice(COUNTRIES)}')
+        if self.rng.random() < 0.4:
+            params.append(f'level={self.rng.choice(LEVELS)}')
+        return 'filter', 'GET', '/api/scholarships/?' + '&'.join(params), None
+
+    def scholarship_detail(self):
+        if not self.scholarship_ids:
+            return self.list_scholarships()
+        return 'detail', 'GET', f'/api/scholarships/{self.rng.choice(self.scholarship_ids)}', None
+
+    def suggested(self):
+        return 'suggested', 'GET', '/api/scholarships/suggested?limit=10', None
+
+    def applications(self):
+        return 'applications', 'GET', '/api/applications/', None
+
+    def update_profile(self):
+        skills = ', '.join(self.rng.sample(SKILLS, self.rng.randint(1, 3)))
+        return 'profile_update', 'PUT', '/api/profile/', {'skills_interests': skills}
+
+    def remember_ids(self, response) -> None:
+        """Collect scholarship ids from listings for later detail requests"""
+        try:
+            for scholarship in response.json().get('scholarships', [])[:10]:
+                self.scholarship_ids.append(scholarship['id'])
+        except ValueError:
+            return
+        del self.scholarship_ids[:-200]
+
+
+# Action -> weight in the traffic mix
+MIX: List[Tuple[Callable[[VirtualUser], tuple], int]] = [
+    (VirtualUser.list_scholarships, 30),
+    (VirtualUser.filter_scholarships, 20),
+    (VirtualUser.scholarship_detail, 20),
+    (VirtualUser.suggested, 10),
+    (VirtualUser.applications, 12),
+    (VirtualUser.update_profile, 8),
+]
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples: Dict[str, List[float]], errors: Dict[str, int], elapsed: float) -> Dict[str, Any]:
+    def stats(latencies: List[float], error_count: int) -> Dict[str, Any]:
+        ordered = sorted(latencies)
+        return {
+            'requests': len(ordered),
+            'errors': error_count,
+            'throughput_rps': round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+            'mean_ms': round(sum(ordered) / len(ordered) * 1000, 2) if ordered else 0.0,
+            'p50_ms': round(percentile(ordered, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(ordered, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(ordered, 0.99) * 1000, 2),
+            'max_ms': round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        }
+
+    endpoints = {name: stats(samples[name], errors.get(name, 0)) for name in sorted(samples)}
+    everything = [latency for latencies in samples.values() for latency in latencies]
+    return {'endpoints': endpoints, 'overall': stats(everything, sum(errors.values()))}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_load_test(base_url: str, users: int = 20, duration: float = 30.0, warmup: float = 5.0,
+                  first_user: int = 1, seed: int = 1, timeout: float = 30.0,
+                  report: Callable[[str], None] = print) -> Dict[str, Any]:
+    """Drive the traffic mix with users concurrent clients; latencies during warmup are discarded"""
+    actions = [action for action, _ in MIX]
+    weights = [weight for _, weight in MIX]
+
+    lock = threading.Lock()
+    samples: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    login_failures = []
+
+    started = time.perf_counter()
+    measure_from = started + warmup
+    stop_at = measure_from + duration
+
+    def worker(number: int):
+        rng = random.Random(seed * 100_003 + number)
+        user = VirtualUser(base_url, seed_email(first_user + number), SEED_PASSWORD, rng, timeout)
+        try:
+            if not user.login():
+                login_failures.append(user.email)
+                return
+        except requests.RequestException:
+            login_failures.append(user.email)
+            return
+
+        while time.perf_counter() < stop_at:
+            name, method, path, body = rng.choices(actions, weights)[0](user)
+            request_started = time.perf_counter()
+            try:
+                response = user.session.request(method, user.base_url + path, json=body, timeout=timeout)
+                failed = response.status_code >= 400
+            except requests.RequestException:
+                response, failed = None, True
+            finished = time.perf_counter()
+
+            if response is not None and name == 'list' and not failed:
+                user.remember_ids(response)
+            if request_started < measure_from:
+                continue
+            with lock:
+                samples.setdefault(name, []).append(finished - request_started)
+                if failed:
+                    errors[name] = errors.get(name, 0) + 1
+
+    threads = [threading.Thread(target=worker, args=(number,), daemon=True) for number in range(users)]
+    for thread in threads:
+        thread.start()
+    report(f"Load test: {users} users against {base_url} for {duration}s after {warmup}s warm-up")
+    for thread in threads:
+        thread.join()
+
+    if login_failures:
+        report(f"{len(login_failures)} users could not log in (first: {login_failures[0]}); seed the database first")
+
+    result = summarize(samples, errors, duration)
+    result['run'] = {
+        'base_url': base_url,
+        'users': users,
+        'duration_s': duration,
+        'warmup_s': warmup,
+        'seed': seed,
+        'login_failures': len(login_failures),
+        'commit': git_commit(),
+        'started_at': datetime.datetime.utcnow().isoformat(timespec='seconds')
+    }
+    return result
+
+
+def write_results(result: Dict[str, Any], path: Optional[str]) -> str:
+    text = json.dumps(result, indent=2, sort_keys=True)
+    if path:
+        with open(path, 'w') as f:
+            f.write(text + '\n')
+    return text
@@ -0,0 +1,90 @@
+import json
+import re
+from collections import Counter
+from typing import Any, Dict, List
+
+from src.services.deadlines import parse_deadline
+from src.services.facets import canonical_terms
+
+# The fields clean_scholarship_data asks the model for
+CLEANED_FIELDS = (
+    'title', 'provider_organization', 'deadline', 'country_info', 'level_of_study', 'field_of_study',
+    'eligibility', 'academic_requirements', 'cgpa_requirements', 'amount_benefits', 'application_link',
+    'keywords', 'contact_email'
+)
+
+_SPACE_RE = re.compile(r'\s+')
+_EMAIL_RE = re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+')
+_URL_RE = re.compile(r'https?://\S+')
+_WORD_RE = re.compile(r'[a-z][a-z-]{3,}')
+_TITLE_NOISE_RE = re.compile(r'\s*[|\-–—]\s*(opportunity desk|scholarships? ?(portal|hub)?|apply now!?)\s*$', re.I)
+_STOPWORDS = frozenset((
+    'with', 'from', 'that', 'this', 'will', 'must', 'have', 'their', 'your', 'students', 'student', 'applicants',
+    'applications', 'application', 'scholarship', 'scholarships', 'program', 'programme', 'university', 'open',
+    'eligible', 'apply', 'study', 'studies', 'candidates', 'including', 'other', 'more', 'also', 'which'
+))
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, (list, tuple)):
+        value = ', '.join(dict.fromkeys(str(v) for v in value if v))
+    return _SPACE_RE.sub(' ', str(value)).strip()
+
+
+def _terms(facet: str, value: Any) -> str:
+    terms = [term for term in canonical_terms(facet, value) if term]
+    return ', '.join(terms) if terms else _text(value)
+
+
+def _keywords(record: Dict[str, Any], limit: int = 8) -> List[str]:
+    text = ' '.join(_text(record.get(column)) for column in ('title', 'description', 'eligibility', 'field_of_study'))
+    text = _EMAIL_RE.sub(' ', _URL_RE.sub(' ', text))
+    counts = Counter(word for word in _WORD_RE.findall(text.lower()) if word not in _STOPWORDS)
+    return [word for word, _ in counts.most_common(limit)]
+
+
+def clean_record(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Deterministic, rule-based version of AIService.clean_scholarship_data:
+    same output fields, normalized with the facet taxonomy and deadline
+    parser instead of a model. Used where a model call is unavailable or
+    unaffordable; it never infers what the text doesn't say.
+    """
+    everything = ' '.join(_text(value) for value in raw.values() if not isinstance(value, dict))
+    deadline_text = _text(raw.get('deadline'))
+    deadline = parse_deadline(deadline_text)
+
+    link = _text(raw.get('application_link') or raw.get('url'))
+    if not link:
+        urls = _URL_RE.findall(everything)
+        link = urls[0] if urls else ''
+    email = _text(raw.get('contact_email'))
+    if not email:
+        emails = _EMAIL_RE.findall(everything)
+        email = emails[0] if emails else ''
+
+    title = _TITLE_NOISE_RE.sub('', _text(raw.get('title')))
+    keywords = raw.get('keywords')
+    if isinstance(keywords, str):
+        try:
+            keywords = json.loads(keywords)
+        except ValueError:
+            keywords = [k.strip() for k in keywords.split(',') if k.strip()]
+
+    return {
+        'title': title,
+        'provider_organization': _text(raw.get('provider_organization') or raw.get('provider')),
+        'deadline': deadline.isoformat() if deadline else deadline_text,
+        'country_info': _terms('country', raw.get('country_info')),
+        'level_of_study': _terms('level', raw.get('level_of_study')),
+        'field_of_study': _terms('field', raw.get('field_of_study')),
+        'eligibility': _text(raw.get('eligibility')),
+        'academic_requirements': _text(raw.get('academic_requirements')),
+        'cgpa_requirements': _text(raw.get('cgpa_requirements')),
+        'amount_benefits': _text(raw.get('amount_benefits')),
+        'application_link': link,
+        'keywords': list(keywords) if keywords else _keywords({**raw, 'title': title}),
+        'contact_email': email,
+    }
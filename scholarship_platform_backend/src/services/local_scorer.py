@@ -0,0 +1,157 @@
+import heapq
+import re
+from typing import Any, Dict, FrozenSet, Iterable, List
+
+from src.services.eligibility import COUNTRY_BITS, compile_constraints, profile_constraints, violates_constraints
+from src.services.facets import canonical_terms
+
+# Same factors and weights the Gemini match prompt asks the model to use
+WEIGHTS = {
+    'level': 30,
+    'field': 25,
+    'eligibility': 20,
+    'geography': 15,
+    'skills': 10,
+}
+
+# Same cut-off as AIService.get_scholarship_recommendations
+MIN_MATCH_PERCENTAGE = 30
+
+# Credit given for a factor the scholarship doesn't restrict
+OPEN_CREDIT = 0.6
+
+_TOKEN_RE = re.compile(r'[a-z][a-z0-9+#]{2,}')
+_STOPWORDS = frozenset((
+    'and', 'the', 'for', 'with', 'from', 'that', 'this', 'are', 'who', 'all', 'any', 'have', 'has',
+    'must', 'will', 'can', 'not', 'their', 'your', 'you', 'our', 'students', 'student', 'applicants',
+    'scholarship', 'scholarships', 'program', 'programme', 'study', 'studies', 'university', 'open',
+))
+
+
+def tokenize(text: Any) -> FrozenSet[str]:
+    if not text:
+        return frozenset()
+    return frozenset(token for token in _TOKEN_RE.findall(str(text).lower()) if token not in _STOPWORDS)
+
+
+def _overlap(wanted: FrozenSet[str], offered: FrozenSet[str]) -> float:
+    """Share of the user's tokens the scholarship mentions"""
+    if not wanted:
+        return 0.0
+    return len(wanted & offered) / len(wanted)
+
+
+class LocalMatchScorer:
+    """
+    Deterministic, in-process stand-in for the Gemini match score.
+
+    Scores the same five factors with the same weights as the prompt, using
+    the canonical taxonomy and compiled eligibility constraints instead of a
+    model call. Features are derived once per user and once per scholarship,
+    so scoring a user against a preloaded catalog is pure set arithmetic.
+    """
+
+    def profile_features(self, user_profile: Dict[str, Any]) -> Dict[str, Any]:
+        constraints = profile_constraints(user_profile)
+        return {
+            'constraints': constraints,
+            'level_mask': constraints['level_mask'] or 0,
+            'country_mask': constraints['country_mask'] or 0,
+            'fields': frozenset(canonical_terms('field', user_profile.get('course_of_study'))),
+            'course_tokens': tokenize(user_profile.get('course_of_study')),
+            'profile_tokens': tokenize(' '.join(str(user_profile.get(key) or '') for key in (
+                'course_of_study', 'level_of_study', 'state_of_origin', 'gender', 'religion', 'institution'
+            ))),
+            'skill_tokens': tokenize(user_profile.get('skills_interests')),
+        }
+
+    def scholarship_features(self, scholarship: Dict[str, Any]) -> Dict[str, Any]:
+        constraints = compile_constraints(scholarship)
+        level_mask = constraints['level_mask']
+        return {
+            'constraints': constraints,
+            'level_mask': level_mask,
+            'country_mask': constraints['country_mask'],
+            'host_mask': sum(COUNTRY_BITS.get(term, 0) for term in set(canonical_terms('country', scholarship.get('country_info')))),
+            'fields': frozenset(canonical_terms('field', scholarship.get('field_of_study'))),
+            'field_tokens': tokenize(scholarship.get('field_of_study')),
+            'eligibility_tokens': tokenize(scholarship.get('eligibility')),
+            'text_tokens': tokenize(' '.join(str(scholarship.get(key) or '') for key in (
+                'title', 'field_of_study', 'eligibility', 'academic_requirements'
+            ))),
+        }
+
+    def score_features(self, user: Dict[str, Any], scholarship: Dict[str, Any]) -> int:
+        # Level of study
+        if not scholarship['level_mask'] or not user['level_mask']:
+            level = OPEN_CREDIT
+        else:
+            level = 1.0 if scholarship['level_mask'] & user['level_mask'] else 0.0
+
+        # Field of study: taxonomy terms first, raw wording as a fallback
+        if not scholarship['fields'] and not scholarship['field_tokens']:
+            field = OPEN_CREDIT
+        elif user['fields'] and user['fields'] & scholarship['fields']:
+            field = 1.0
+        else:
+            field = _overlap(user['course_tokens'], scholarship['field_tokens'] | scholarship['text_tokens'])
+
+        # Eligibility wording that mentions the student's background
+        if not scholarship['eligibility_tokens']:
+            eligibility = OPEN_CREDIT
+        else:
+            eligibility = min(1.0, OPEN_CREDIT * 0.5 + _overlap(user['profile_tokens'], scholarship['eligibility_tokens']))
+
+        # Geography: nationality restrictions decide; hosting in the student's country is a bonus.
+        # An unknown student country gets the open credit.
+        if scholarship['country_mask'] and user['country_mask']:
+            geography = 1.0 if scholarship['country_mask'] & user['country_mask'] else 0.0
+        elif scholarship['host_mask'] & user['country_mask']:
+            geography = 1.0
+        else:
+            geography = OPEN_CREDIT
+
+        skills = _overlap(user['skill_tokens'], scholarship['text_tokens'])
+
+        total = (
+            WEIGHTS['level'] * level
+            + WEIGHTS['field'] * field
+            + WEIGHTS['eligibility'] * eligibility
+            + WEIGHTS['geography'] * geography
+            + WEIGHTS['skills'] * skills
+        )
+        return min(100, max(0, int(round(total))))
+
+    def calculate_match_percentage(self, user_profile: Dict[str, Any], scholarship: Dict[str, Any]) -> int:
+        """Same contract as AIService.calculate_match_percentage"""
+        return self.score_features(self.profile_features(user_profile), self.scholarship_features(scholarship))
+
+    def recommend(self, user_features: Dict[str, Any], catalog: Iterable[Dict[str, Any]],
+                  top_n: int = 10) -> List[Dict[str, Any]]:
+        """
+        Best top_n matches above the cut-off for one user.
+
+        catalog yields dicts with an 'id' and precomputed 'features';
+        scholarships whose compiled constraints the user definitely violates
+        are skipped unscored, the same rows eligible_clause filters out in SQL.
+        """
+        top = []  # min-heap of (match_percentage, -position, id)
+        for position, scholarship in enumerate(catalog):
+            if violates_constraints(user_features['constraints'], scholarship['features']['constraints']):
+                continue
+            match_percentage = self.score_features(user_features, scholarship['features'])
+            if match_percentage <= MIN_MATCH_PERCENTAGE:
+                continue
+            entry = (match_percentage, -position, scholarship['id'])
+            if len(top) < top_n:
+                heapq.heappush(top, entry)
+            elif entry[:2] > top[0][:2]:
+                heapq.heapreplace(top, entry)
+
+        return [
+            {'id': scholarship_id, 'match_percentage': match_percentage}
+            for match_percentage, _, scholarship_id in sorted(top, reverse=True)
+        ]
+
+
+local_scorer = LocalMatchScorer()
@@ -0,0 +1,219 @@
+"""
+In-process request, SQL and LLM metrics rendered in Prometheus text format.
+
+Counters live in this worker process; with several gunicorn workers each
+scrape sees one worker, so dashboards should sum across instances.
+"""
+import bisect
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(**labels) -> Labels:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _labels(**labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            yield f'{self.name}{_format_labels(labels)} {_format_number(value)}'
+
+
+class Gauge:
+    kind = 'gauge'
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, **labels) -> None:
+        key = _labels(**labels)
+        with self._lock:
+            self._values[key] = value
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            yield f'{self.name}{_format_labels(labels)} {_format_number(value)}'
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Labels, List] = {}  # labels -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = _labels(**labels)
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            if position < len(self.buckets):
+                series[0][position] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            series = sorted((labels, (list(counts), total, count)) for labels, (counts, total, count) in self._series.items())
+        for labels, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield f'{self.name}_bucket{_format_labels(labels, ("le", _format_number(float(bound))))} {cumulative}'
+            yield f'{self.name}_bucket{_format_labels(labels, ("le", "+Inf"))} {count}'
+            yield f'{self.name}_sum{_format_labels(labels)} {_format_number(total)}'
+            yield f'{self.name}_count{_format_labels(labels)} {count}'
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._register(Counter(name, help_text))
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        return self._register(Gauge(name, help_text))
+
+    def histogram(self, name: str, help_text: str, buckets: Iterable[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, buckets))
+
+    def render(self) -> str:
+        """All metrics in Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.help_text}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter('scholarsync_http_requests_total', 'HTTP requests by route, method and status')
+http_latency = registry.histogram('scholarsync_http_request_duration_seconds', 'HTTP request latency by route')
+http_sql_queries = registry.histogram(
+    'scholarsync_http_request_sql_queries', 'SQL statements issued per request by route', COUNT_BUCKETS
+)
+http_sql_time = registry.histogram('scholarsync_http_request_sql_seconds', 'Time spent in SQL per request by route')
+sql_queries = registry.counter('scholarsync_sql_queries_total', 'SQL statements executed, in and out of requests')
+sql_time = registry.counter('scholarsync_sql_seconds_total', 'Time spent executing SQL statements')
+llm_calls = registry.counter('scholarsync_llm_calls_total', 'Model calls by AIService operation and outcome')
+llm_latency = registry.histogram('scholarsync_llm_call_duration_seconds', 'Model call latency by AIService operation')
+llm_tokens = registry.counter('scholarsync_llm_tokens_total', 'Model tokens by AIService operation and kind')
+llm_prompt_tokens = registry.histogram(
+    'scholarsync_llm_prompt_tokens', 'Prompt tokens per model call by AIService operation', TOKEN_BUCKETS
+)
+
+
+def route_label() -> str:
+    """The matched URL rule ("/api/scholarships/<int:scholarship_id>"), so ids don't explode cardinality"""
+    if request.url_rule is not None:
+        return request.url_rule.rule
+    return 'unmatched'
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started_at', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('query_started_at')
+    elapsed = time.perf_counter() - started.pop() if started else 0.0
+    sql_queries.inc()
+    sql_time.inc(elapsed)
+    if has_request_context() and 'sql_queries' in g:
+        g.sql_queries += 1
+        g.sql_seconds += elapsed
+
+
+def record_llm_call(operation: str, seconds: float, outcome: str = 'ok',
+                    prompt_tokens: Optional[int] = None, response_tokens: Optional[int] = None) -> None:
+    """Record one model call made by AIService"""
+    llm_calls.inc(operation=operation, outcome=outcome)
+    llm_latency.observe(seconds, operation=operation)
+    if prompt_tokens is not None:
+        llm_tokens.inc(prompt_tokens, operation=operation, kind='prompt')
+        llm_prompt_tokens.observe(prompt_tokens, operation=operation)
+    if response_tokens is not None:
+        llm_tokens.inc(response_tokens, operation=operation, kind='response')
+
+
+def init_metrics(app) -> None:
+    """Time every request and count the SQL it issues"""
+
+    @app.before_request
+    def _start_request_metrics():
+        g.request_started_at = time.perf_counter()
+        g.sql_queries = 0
+        g.sql_seconds = 0.0
+
+    @app.after_request
+    def _record_request_metrics(response):
+        started = g.get('request_started_at')
+        if started is not None:
+            route = route_label()
+            http_requests.inc(route=route, method=request.method, status=response.status_code)
+            http_latency.observe(time.perf_counter() - started, route=route, method=request.method)
+            http_sql_queries.observe(g.sql_queries, route=route, method=request.method)
+            http_sql_time.observe(g.sql_seconds, route=route, method=request.method)
+        return response
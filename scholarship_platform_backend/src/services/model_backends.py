@@ -0,0 +1,249 @@
+"""
+Model backends behind AIService.
+
+A backend takes a prompt and returns a response with `.text` and
+`.usage_metadata` (prompt_token_count, candidates_token_count), the shape
+of a Gemini response. AI_BACKEND selects one:
+
+    gemini  the Gemini API (default; needs GEMINI_API_KEY)
+    local   a deterministic in-process stand-in with configurable latency,
+            jitter, error rate and streaming, for offline benchmarks and
+            regression runs
+
+AI_RECORD_MODE additionally wraps either one in a record/replay layer
+(model_recording).
+
+The local backend answers each AIService prompt in the shape the prompt asks
+for: cleaning prompts get the rule-based cleaner's JSON, match prompts the
+local scorer's percentage, chat and tips prompts stable canned text.
+"""
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+
+GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-2.5-flash')
+
+# Upper bound on one Gemini request, so a stalled upstream fails instead of holding a worker
+GEMINI_TIMEOUT_SECONDS = float(os.getenv('GEMINI_TIMEOUT_SECONDS', '30'))
+
+
+class ModelError(Exception):
+    """The model call failed (API error, injected fault, blocked response)"""
+
+
+class Usage:
+    def __init__(self, prompt_token_count: int, candidates_token_count: int):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+
+
+class ModelResponse:
+    def __init__(self, text: str, usage_metadata: Optional[Usage] = None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English prose and JSON)"""
+    return max(1, (len(text) + 3) // 4) if text else 0
+
+
+class GeminiBackend:
+    name = 'gemini'
+
+    def __init__(self, model_name: str = GEMINI_MODEL, timeout: float = GEMINI_TIMEOUT_SECONDS):
+        import google.generativeai as genai  # type: ignore
+        from google.api_core import exceptions as api_exceptions
+        from google.generativeai.client import ga_exceptions
+        from google.generativeai.types import HarmBlockThreshold, HarmCategory
+
+        api_key = os.getenv('GEMINI_API_KEY')
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY environment variable is required")
+
+        genai.configure(api_key=api_key)
+        self._api_errors = (ga_exceptions.ResponseError, api_exceptions.GoogleAPIError)
+        self._request_options = {'timeout': timeout}
+        self.model = genai.GenerativeModel(model_name,
+                                           safety_settings={
+                                               HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
+                                               HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
+                                               HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
+                                               HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
+                                           })
+
+    def generate(self, prompt: str) -> ModelResponse:
+        try:
+            return self.model.generate_content(prompt, request_options=self._request_options)
+        except self._api_errors as e:
+            raise ModelError(str(e)) from e
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        try:
+            for chunk in self.model.generate_content(prompt, stream=True, request_options=self._request_options):
+                yield chunk.text
+        except self._api_errors as e:
+            raise ModelError(str(e)) from e
+
+
+_RAW_DATA_RE = re.compile(r'Raw Data:\s*(\{.*\})\s*Please return', re.DOTALL)
+_SECTION_RE = re.compile(r'^\s*(User Profile|Scholarship):\s*$', re.MULTILINE)
+_FIELD_RE = re.compile(r'^\s*-\s*([^:\n]+):\s*(.*)$', re.MULTILINE)
+_EARLIER_TOPICS_RE = re.compile(r'^Summary so far: The student asked about: (.*)\.$', re.MULTILINE)
+
+# Match-prompt labels -> the dict keys calculate_match_percentage read them from
+_PROFILE_LABELS = {
+    'Level of Study': 'level_of_study', 'Field of Study': 'course_of_study', 'Institution': 'institution',
+    'Academic Performance': 'academic_performance', 'State of Origin': 'state_of_origin', 'Gender': 'gender',
+    'Religion': 'religion', 'Skills & Interests': 'skills_interests',
+}
+_SCHOLARSHIP_LABELS = {
+    'Title': 'title', 'Level Required': 'academic_requirements', 'Field': 'field_of_study',
+    'Country': 'country_info', 'Eligibility': 'eligibility',
+}
+
+_CHAT_REPLIES = (
+    "Start by shortlisting scholarships whose level and field match yours exactly, then check each deadline "
+    "and required documents. Prepare a strong personal statement and ask for references early.",
+    "Focus on the eligibility criteria first: nationality, level of study and minimum grades. Keep a simple "
+    "tracker of deadlines and submit a few days early to avoid portal problems.",
+    "Tailor every application to the provider's goals. Show concrete achievements, explain how the award "
+    "helps your plans, and have someone proofread before you submit.",
+)
+_TIPS_REPLY = (
+    "1) Open with a specific moment that shaped your interest in your field. "
+    "2) Show your achievements with concrete results rather than adjectives. "
+    "3) Connect your goals to what the scholarship funds. "
+    "4) Explain challenges you overcame and what you learned. "
+    "5) Mention skills and activities that set you apart. "
+    "6) Close with the impact you plan to have. "
+    "7) Keep it within the word limit and proofread carefully."
+)
+
+
+def _labelled_sections(prompt: str) -> Dict[str, Dict[str, str]]:
+    """'- Label: value' lines of a prompt, grouped under their 'Section:' heading"""
+    sections: Dict[str, Dict[str, str]] = {}
+    headings = list(_SECTION_RE.finditer(prompt))
+    for position, heading in enumerate(headings):
+        end = headings[position + 1].start() if position + 1 < len(headings) else len(prompt)
+        sections[heading.group(1)] = {
+            label.strip(): ('' if value.strip() == 'N/A' else value.strip())
+            for label, value in _FIELD_RE.findall(prompt[heading.end():end])
+        }
+    return sections
+
+
+class LocalBackend:
+    """
+    Deterministic stand-in for Gemini. Latency is latency_ms plus
+    ms_per_1k_tokens for every thousand prompt tokens plus up to jitter_ms
+    (seeded), and error_rate of calls raise ModelError, so the hot paths
+    can be benchmarked and regression-tested with realistic timing and
+    failures but no network. stream_chunk_ms spaces streamed chunks apart.
+    """
+    name = 'local'
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 seed: int = 0, stream_chunk_ms: float = 0.0, ms_per_1k_tokens: float = 0.0):
+        self.latency_ms = latency_ms
+        self.ms_per_1k_tokens = ms_per_1k_tokens
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.stream_chunk_ms = stream_chunk_ms
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _delay_and_fault(self, prompt: str) -> None:
+        with self._lock:
+            jitter = self._rng.random() * self.jitter_ms
+            fail = self._rng.random() < self.error_rate
+        delay = (self.latency_ms + self.ms_per_1k_tokens * estimate_tokens(prompt) / 1000 + jitter) / 1000
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            raise ModelError('Injected local backend error')
+
+    def answer(self, prompt: str) -> str:
+        """The response text for a prompt, with no latency or faults"""
+        # Recognized by the prompt's opening words, since chat history may quote anything
+        opening = prompt.lstrip()[:60]
+        if opening.startswith('Summarize this conversation'):
+            # The opening words of each student message, appended to the earlier topics, newest kept
+            earlier = _EARLIER_TOPICS_RE.search(prompt)
+            topics = earlier.group(1).split('; ') if earlier else []
+            topics += [' '.join(line.split()[1:13]) for line in prompt.splitlines() if line.startswith('Student:')]
+            return 'The student asked about: ' + '; '.join(topics[-8:]) + '.'
+
+        if opening.startswith('Clean and standardize'):
+            from src.services.local_cleaner import clean_record
+            raw = _RAW_DATA_RE.search(prompt)
+            try:
+                record = json.loads(raw.group(1)) if raw else {}
+            except ValueError:
+                record = {}
+            return json.dumps(clean_record(record))
+
+        if opening.startswith('Calculate a match percentage'):
+            from src.services.local_scorer import local_scorer
+            sections = _labelled_sections(prompt)
+            profile = {key: sections.get('User Profile', {}).get(label, '') for label, key in _PROFILE_LABELS.items()}
+            scholarship = {key: sections.get('Scholarship', {}).get(label, '') for label, key in _SCHOLARSHIP_LABELS.items()}
+            return str(local_scorer.calculate_match_percentage(profile, scholarship))
+
+        if opening.startswith('Generate personalized tips'):
+            return _TIPS_REPLY
+
+        digest = int(hashlib.sha1(prompt.encode('utf-8')).hexdigest(), 16)
+        return _CHAT_REPLIES[digest % len(_CHAT_REPLIES)]
+
+    def generate(self, prompt: str) -> ModelResponse:
+        self._delay_and_fault(prompt)
+        text = self.answer(prompt)
+        return ModelResponse(text, Usage(estimate_tokens(prompt), estimate_tokens(text)))
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        self._delay_and_fault(prompt)
+        words = self.answer(prompt).split(' ')
+        for start in range(0, len(words), 8):
+            if start and self.stream_chunk_ms:
+                time.sleep(self.stream_chunk_ms / 1000)
+            yield ' '.join(words[start:start + 8]) + (' ' if start + 8 < len(words) else '')
+
+
+def local_backend_from_env() -> LocalBackend:
+    return LocalBackend(
+        latency_ms=float(os.getenv('LOCAL_MODEL_LATENCY_MS', '0')),
+        jitter_ms=float(os.getenv('LOCAL_MODEL_JITTER_MS', '0')),
+        error_rate=float(os.getenv('LOCAL_MODEL_ERROR_RATE', '0')),
+        seed=int(os.getenv('LOCAL_MODEL_SEED', '0')),
+        stream_chunk_ms=float(os.getenv('LOCAL_MODEL_STREAM_CHUNK_MS', '0')),
+        ms_per_1k_tokens=float(os.getenv('LOCAL_MODEL_MS_PER_1K_TOKENS', '0')),
+    )
+
+
+def _build_backend(name: str) -> Any:
+    if name == 'local':
+        return local_backend_from_env()
+    if name == 'gemini':
+        return GeminiBackend()
+    raise ValueError(f"Unknown AI_BACKEND {name!r} (expected 'gemini' or 'local')")
+
+
+def get_backend(name: Optional[str] = None, record_mode: Optional[str] = None) -> Any:
+    """The backend named by name or AI_BACKEND, wrapped for AI_RECORD_MODE (see model_recording)"""
+    from src.services.model_recording import RecordingBackend, get_record_mode
+
+    name = (name or os.getenv('AI_BACKEND', 'gemini')).lower()
+    record_mode = record_mode or get_record_mode()
+    if record_mode == 'off':
+        return _build_backend(name)
+    if name not in ('gemini', 'local'):
+        raise ValueError(f"Unknown AI_BACKEND {name!r} (expected 'gemini' or 'local')")
+    model_id = f'gemini/{GEMINI_MODEL}' if name == 'gemini' else 'local'
+    return RecordingBackend(lambda: _build_backend(name), model_id, record_mode)
@@ -0,0 +1,157 @@
+"""
+Record/replay of model calls for development and CI.
+
+AI_RECORD_MODE wraps the configured backend:
+
+    off     no recording (default)
+    record  serve stored responses, call the model on a miss and store it
+    replay  serve stored responses; a miss is answered by the local stand-in,
+            so nothing ever reaches the network
+    strict  serve stored responses; a miss raises RecordingMiss
+
+Responses are stored one JSON file per prompt under AI_RECORDING_DIR, keyed
+by the SHA-256 of the model id and prompt, so a changed prompt is a miss
+rather than a stale answer. Record once against Gemini, then point CI at
+the same directory with AI_RECORD_MODE=strict.
+"""
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, Optional
+
+from src.services.metrics import registry
+from src.services.model_backends import ModelResponse, Usage, estimate_tokens
+
+RECORD_MODES = ('off', 'record', 'replay', 'strict')
+DEFAULT_RECORDING_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'ai_recordings')
+
+llm_recordings = registry.counter('scholarsync_llm_recordings_total', 'Recorded model calls by mode and result')
+
+
+def get_record_mode() -> str:
+    mode = os.getenv('AI_RECORD_MODE', 'off').lower()
+    if mode not in RECORD_MODES:
+        raise ValueError(f"Unknown AI_RECORD_MODE {mode!r} (expected one of {', '.join(RECORD_MODES)})")
+    return mode
+
+
+def get_recording_dir() -> str:
+    """Directory holding recorded responses, overridable with AI_RECORDING_DIR"""
+    return os.getenv('AI_RECORDING_DIR', DEFAULT_RECORDING_DIR)
+
+
+class RecordingMiss(Exception):
+    """Strict replay found no recording for a prompt"""
+
+
+def prompt_key(model_id: str, prompt: str) -> str:
+    return hashlib.sha256(f'{model_id}\n{prompt}'.encode('utf-8')).hexdigest()
+
+
+class RecordingStore:
+    """Prompt-hash -> response JSON files, sharded by the first two hex digits"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._cache: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, key[:2], f'{key}.json')
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            if key in self._cache:
+                return self._cache[key]
+        try:
+            with open(self._file(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            self._cache[key] = entry
+        return entry
+
+    def put(self, key: str, entry: dict) -> None:
+        path = self._file(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temporary, 'w') as f:
+            json.dump(entry, f, indent=2, sort_keys=True)
+        os.replace(temporary, path)  # Readers never see a half-written file
+        with self._lock:
+            self._cache[key] = entry
+
+
+class RecordingBackend:
+    """
+    Serves model calls from a RecordingStore according to mode. The
+    upstream backend is built on first use, so replay and strict runs need
+    neither an API key nor the SDK.
+    """
+
+    def __init__(self, upstream_factory: Callable[[], object], model_id: str, mode: str,
+                 store: Optional[RecordingStore] = None):
+        self.upstream_factory = upstream_factory
+        self.model_id = model_id
+        self.mode = mode
+        self.store = store or RecordingStore(get_recording_dir())
+        self.name = f'{mode}:{model_id}'
+        self._upstream = None
+        self._lock = threading.Lock()
+
+    @property
+    def upstream(self):
+        with self._lock:
+            if self._upstream is None:
+                self._upstream = self.upstream_factory()
+            return self._upstream
+
+    def _lookup(self, prompt: str):
+        key = prompt_key(self.model_id, prompt)
+        entry = self.store.get(key)
+        llm_recordings.inc(mode=self.mode, result='hit' if entry else 'miss')
+        if entry is None and self.mode == 'strict':
+            raise RecordingMiss(f"No recording for prompt {key[:12]} ({self.model_id}) in {self.store.path}")
+        return key, entry
+
+    def _miss_backend(self):
+        if self.mode == 'replay':
+            from src.services.model_backends import LocalBackend
+            return LocalBackend()
+        return self.upstream
+
+    def _save(self, key: str, prompt: str, text: str, usage=None) -> None:
+        if self.mode != 'record':
+            return
+        self.store.put(key, {
+            'model': self.model_id,
+            'prompt': prompt,
+            'text': text,
+            'prompt_tokens': getattr(usage, 'prompt_token_count', None) or estimate_tokens(prompt),
+            'response_tokens': getattr(usage, 'candidates_token_count', None) or estimate_tokens(text),
+            'recorded_at': datetime.now(timezone.utc).isoformat(timespec='seconds')
+        })
+
+    def generate(self, prompt: str) -> ModelResponse:
+        key, entry = self._lookup(prompt)
+        if entry is not None:
+            return ModelResponse(entry['text'], Usage(entry['prompt_tokens'], entry['response_tokens']))
+
+        response = self._miss_backend().generate(prompt)
+        self._save(key, prompt, response.text, getattr(response, 'usage_metadata', None))
+        return response
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        key, entry = self._lookup(prompt)
+        if entry is not None:
+            yield entry['text']
+            return
+
+        chunks = []
+        for chunk in self._miss_backend().stream(prompt):
+            chunks.append(chunk)
+            yield chunk
+        self._save(key, prompt, ''.join(chunks))
@@ -0,0 +1,160 @@
+"""
+Token budgets for model prompts.
+
+Scraped items carry whole page sections (eligibility blobs that run to the
+end of the article, repeated regex matches, every link on the page), so a
+prompt built from the raw item grows with page length. budget_record
+trims an item to what the cleaning prompt needs before it is serialized:
+
+  - only fields the model reads are kept (CLEAN_INPUT_FIELDS), empty ones dropped
+  - whitespace is collapsed and list values deduplicated and capped
+  - long text keeps a head and a tail window, where the eligibility
+    summary and the closing date / how-to-apply lines usually are
+  - if the estimate is still over PROMPT_TOKEN_BUDGET, the longest text
+    fields are shrunk further, largest first
+
+compact_prompt strips the template indentation every prompt carries.
+"""
+import json
+import os
+import re
+from typing import Any, Dict, List, Tuple
+
+from src.services.metrics import registry
+from src.services.model_backends import estimate_tokens
+
+# Estimated tokens for the item data in a cleaning prompt
+PROMPT_TOKEN_BUDGET = int(os.getenv('PROMPT_TOKEN_BUDGET', '1200'))
+
+# Field -> character cap; the fields the cleaning prompt extracts from
+CLEAN_INPUT_FIELDS = {
+    'title': 300,
+    'provider_organization': 200,
+    'deadline': 300,
+    'description': 2000,
+    'eligibility': 1600,
+    'academic_requirements': 600,
+    'cgpa_requirements': 300,
+    'amount_benefits': 400,
+    'level_of_study': 200,
+    'field_of_study': 300,
+    'country_info': 300,
+    'keywords': 300,
+    'url': 300,
+    'application_link': 300,
+    'application_urls': 600,
+    'contact_email': 200,
+}
+
+# Items kept from list values (application_urls, keywords, regex matches)
+MAX_LIST_ITEMS = 8
+
+# Share of a truncated text kept from its start; the rest comes from its end
+HEAD_SHARE = 0.7
+
+TRUNCATION_MARKER = ' [...] '
+
+# Never shrink a field below this many characters while fitting the budget
+MIN_FIELD_CHARS = 200
+
+_SPACE_RE = re.compile(r'\s+')
+_INDENT_RE = re.compile(r'^[ \t]+|[ \t]+$', re.MULTILINE)
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+
+prompt_truncations = registry.counter(
+    'scholarsync_prompt_truncations_total', 'Prompt fields shortened to fit the token budget, by field'
+)
+prompt_chars_saved = registry.counter(
+    'scholarsync_prompt_chars_saved_total', 'Characters removed from prompt data by the token budget'
+)
+
+
+def compact_whitespace(text: str) -> str:
+    return _SPACE_RE.sub(' ', text).strip()
+
+
+def compact_prompt(prompt: str) -> str:
+    """The prompt without template indentation, trailing spaces or runs of blank lines"""
+    return _BLANK_LINES_RE.sub('\n\n', _INDENT_RE.sub('', prompt)).strip()
+
+
+def head_tail(text: str, max_chars: int, head_share: float = HEAD_SHARE) -> str:
+    """text cut to about max_chars, keeping its start and end around a marker"""
+    if len(text) <= max_chars:
+        return text
+    room = max(0, max_chars - len(TRUNCATION_MARKER))
+    head = int(room * head_share)
+    tail = room - head
+    return text[:head].rstrip() + TRUNCATION_MARKER + (text[-tail:].lstrip() if tail else '')
+
+
+def _compact_value(value: Any) -> Any:
+    if isinstance(value, (list, tuple, set)):
+        items: List[str] = []
+        for item in value:
+            item = compact_whitespace(str(item)) if item is not None else ''
+            if item and item not in items:
+                items.append(item)
+        return items[:MAX_LIST_ITEMS]
+    if isinstance(value, str):
+        return compact_whitespace(value)
+    return value
+
+
+def _value_size(value: Any) -> int:
+    return len(json.dumps(value, ensure_ascii=False, default=str))
+
+
+def _shrink(value: Any, max_chars: int) -> Any:
+    if isinstance(value, list):
+        kept, size = [], 2
+        for item in value:
+            size += len(item) + 3
+            if size > max_chars and kept:
+                break
+            kept.append(head_tail(item, max_chars))
+        return kept
+    if isinstance(value, str):
+        return head_tail(value, max_chars)
+    return value
+
+
+def serialize_record(record: Dict[str, Any]) -> str:
+    """Compact JSON, the form records are sent in"""
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=str)
+
+
+def budget_record(record: Dict[str, Any], max_tokens: int = PROMPT_TOKEN_BUDGET) -> Tuple[Dict[str, Any], Dict[str, int]]:
+    """
+    The fields of record worth sending, trimmed to fit max_tokens, and
+    stats (original and budgeted character and token estimates).
+    """
+    original = json.dumps(record, ensure_ascii=False, indent=2, default=str)
+    budgeted: Dict[str, Any] = {}
+    for field, max_chars in CLEAN_INPUT_FIELDS.items():
+        value = _compact_value(record.get(field))
+        if value in (None, '', []):
+            continue
+        if _value_size(value) > max_chars:
+            value = _shrink(value, max_chars)
+            prompt_truncations.inc(field=field)
+        budgeted[field] = value
+
+    # Still over budget: halve the longest text field until it fits or nothing is long enough to cut
+    while estimate_tokens(serialize_record(budgeted)) > max_tokens:
+        field = max(budgeted, key=lambda name: _value_size(budgeted[name]))
+        size = _value_size(budgeted[field])
+        shrunk = _shrink(budgeted[field], max(MIN_FIELD_CHARS, size // 2))
+        if size <= MIN_FIELD_CHARS or _value_size(shrunk) >= size:
+            break
+        budgeted[field] = shrunk
+        prompt_truncations.inc(field=field)
+
+    serialized = serialize_record(budgeted)
+    prompt_chars_saved.inc(max(0, len(original) - len(serialized)))
+    return budgeted, {
+        'original_chars': len(original),
+        'budgeted_chars': len(serialized),
+        'original_tokens': estimate_tokens(original),
+        'budgeted_tokens': estimate_tokens(serialized),
+    }
@@ -0,0 +1,182 @@
+"""
+SQL query budgets and N+1 detection for requests.
+
+    with query_budget(max_queries=4) as recorder:
+        client.get('/api/applications/')
+
+fails with QueryBudgetExceeded when the block issues more statements than
+budgeted, or when one statement shape (same SQL, different parameters)
+repeats more than max_repeats times, the signature of an N+1 loop.
+ENDPOINT_BUDGETS declares the budgets of the hot endpoints, checked
+against a live database by `flask check-query-budgets`.
+"""
+import math
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Statements a request may repeat before it is reported as N+1
+DEFAULT_MAX_REPEATS = 3
+
+# Endpoint -> (max statements, max repeats of one shape) for an authenticated
+# request; keys are GET paths unless prefixed with another method
+ENDPOINT_BUDGETS: Dict[str, Tuple[int, int]] = {
+    '/api/scholarships/?page=1&per_page=10': (4, 1),
+    '/api/scholarships/?field=engineering&level=masters': (4, 1),
+    '/api/scholarships/suggested?limit=10': (3, 1),
+    '/api/applications/': (2, 1),
+    '/api/applications/upcoming-deadlines': (2, 1),
+    '/api/notifications/?limit=20': (3, 1),
+    '/api/saved-searches/': (2, 1),
+    '/api/profile/': (2, 1),
+    '/api/ai/conversations': (2, 1),
+    # Uncached path, scored by the local model backend: user, catalog version,
+    # catalog chunk(s), one bulk upsert of match percentages
+    'POST /api/ai/match-scholarships': (4, 1),
+}
+
+# Endpoints that stream the catalog in keyset chunks (iter_catalog) are allowed
+# one more statement, and one more repeat of the chunk query, per
+# CATALOG_CHUNK_SIZE scholarships, since that is the chunking working as designed
+CATALOG_STREAMING_ENDPOINTS = {'POST /api/ai/match-scholarships'}
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PARAM_LIST_RE = re.compile(r'\(\s*(?:\?|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+))*\s*\)')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def statement_shape(statement: str) -> str:
+    """SQL with literals and parameter lists collapsed, so repeats of one query compare equal"""
+    shape = _STRING_RE.sub('?', statement)
+    shape = _NUMBER_RE.sub('?', shape)
+    shape = _PARAM_LIST_RE.sub('(?...)', shape)
+    return _SPACE_RE.sub(' ', shape).strip().lower()
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryRecorder:
+    """Collects the SQL statements the current thread executes on any engine"""
+
+    def __init__(self):
+        self.statements: List[str] = []
+        self._thread_id = threading.get_ident()
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() == self._thread_id:
+            self.statements.append(statement)
+
+    def start(self) -> 'QueryRecorder':
+        event.listen(Engine, 'before_cursor_execute', self._record)
+        return self
+
+    def stop(self) -> None:
+        event.remove(Engine, 'before_cursor_execute', self._record)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def repeated(self, threshold: int = DEFAULT_MAX_REPEATS) -> List[Tuple[str, int]]:
+        """Statement shapes executed more than threshold times, most repeated first"""
+        shapes = Counter(statement_shape(statement) for statement in self.statements)
+        return [(shape, count) for shape, count in shapes.most_common() if count > threshold]
+
+    def report(self) -> str:
+        lines = [f'{self.count} statements']
+        for shape, count in Counter(statement_shape(s) for s in self.statements).most_common():
+            lines.append(f'  {count:>4} x {shape[:200]}')
+        return '\n'.join(lines)
+
+
+def check_budget(recorder: QueryRecorder, max_queries: Optional[int] = None,
+                 max_repeats: Optional[int] = DEFAULT_MAX_REPEATS, label: str = 'block') -> None:
+    problems = []
+    if max_queries is not None and recorder.count > max_queries:
+        problems.append(f'{recorder.count} statements, budget is {max_queries}')
+    if max_repeats is not None:
+        for shape, count in recorder.repeated(max_repeats):
+            problems.append(f'possible N+1: {count} x {shape[:200]}')
+    if problems:
+        raise QueryBudgetExceeded(f'{label}: ' + '; '.join(problems) + '\n' + recorder.report())
+
+
+@contextmanager
+def query_budget(max_queries: Optional[int] = None, max_repeats: Optional[int] = DEFAULT_MAX_REPEATS,
+                 label: str = 'block') -> Iterator[QueryRecorder]:
+    """Fail the block if it exceeds max_queries statements or repeats a shape more than max_repeats times"""
+    recorder = QueryRecorder().start()
+    try:
+        yield recorder
+    finally:
+        recorder.stop()
+    check_budget(recorder, max_queries, max_repeats, label)
+
+
+@contextmanager
+def _local_model():
+    """Answer model calls made by the assistant routes with the local backend, so checks need no API"""
+    from src.routes import ai_assistant
+    from src.services.model_backends import LocalBackend
+
+    backend = ai_assistant.ai_service.backend
+    ai_assistant.ai_service.backend = LocalBackend()
+    try:
+        yield
+    finally:
+        ai_assistant.ai_service.backend = backend
+
+
+def _catalog_chunks() -> int:
+    from src.models.scholarship import Scholarship
+    from src.services.catalog_stream import CATALOG_CHUNK_SIZE
+
+    return math.ceil(Scholarship.query.count() / CATALOG_CHUNK_SIZE)
+
+
+def check_endpoint_budgets(client, budgets: Dict[str, Tuple[int, int]] = ENDPOINT_BUDGETS) -> List[Dict]:
+    """
+    Request every budgeted endpoint once with an already logged-in test
+    client. Query and recommendation caches are cleared first so the
+    uncached path is measured. POST /api/ai/match-scholarships saves match
+    scores for the account, as it would for the user.
+    """
+    from src.services.query_cache import scholarship_query_cache
+    from src.services.recommendation_cache import recommendation_cache
+
+    extra_chunks = max(0, _catalog_chunks() - 1) if CATALOG_STREAMING_ENDPOINTS & set(budgets) else 0
+    results = []
+    for endpoint, (max_queries, max_repeats) in budgets.items():
+        method, _, path = endpoint.rpartition(' ')
+        method = method or 'GET'
+        if endpoint in CATALOG_STREAMING_ENDPOINTS:
+            max_queries, max_repeats = max_queries + extra_chunks, max_repeats + extra_chunks
+        scholarship_query_cache.clear()
+        recommendation_cache.clear()
+        with _local_model():
+            recorder = QueryRecorder().start()
+            try:
+                response = client.open(path, method=method)
+            finally:
+                recorder.stop()
+        try:
+            check_budget(recorder, max_queries, max_repeats, label=endpoint)
+            error = None
+        except QueryBudgetExceeded as e:
+            error = str(e)
+        results.append({
+            'path': endpoint,
+            'status': response.status_code,
+            'queries': recorder.count,
+            'budget': max_queries,
+            'error': error
+        })
+    return results
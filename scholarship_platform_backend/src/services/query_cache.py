@@ -0,0 +1,140 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from sqlalchemy import text
+
+# Single-row table holding the catalog version. Any writer (API, crawler
+# pipeline, archival jobs) bumps it, which makes every cached catalog query
+# stale without having to know which keys it affects.
+CATALOG_STATE_ID = 1
+BUMP_CATALOG_VERSION_SQL = "UPDATE catalog_state SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE id = 1"
+SEED_CATALOG_VERSION_SQL = "INSERT INTO catalog_state (id, version) SELECT 1, 0 WHERE NOT EXISTS (SELECT 1 FROM catalog_state WHERE id = 1)"
+SELECT_CATALOG_VERSION_SQL = "SELECT version FROM catalog_state WHERE id = 1"
+
+# How long a worker trusts its last read of the catalog version before going
+# back to the database. Writes made by this process are seen immediately.
+CATALOG_VERSION_POLL_SECONDS = float(os.getenv('CATALOG_VERSION_POLL_SECONDS', '2'))
+
+
+class QueryCache:
+    """Bounded in-process cache with per-entry TTL and LRU eviction"""
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 60):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """The live value for key without counting a lookup or refreshing its LRU position"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                return None
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+_version_lock = threading.Lock()
+_cached_version = None
+_version_checked_at = 0.0
+
+
+def get_catalog_version(session) -> int:
+    """Return the current catalog version, re-reading it at most every poll interval"""
+    global _cached_version, _version_checked_at
+
+    now = time.monotonic()
+    with _version_lock:
+        if _cached_version is not None and now - _version_checked_at < CATALOG_VERSION_POLL_SECONDS:
+            return _cached_version
+
+    version = session.execute(text(SELECT_CATALOG_VERSION_SQL)).scalar()
+    with _version_lock:
+        _cached_version = version or 0
+        _version_checked_at = now
+        return _cached_version
+
+
+def bump_catalog_version(session) -> None:
+    """Invalidate all catalog-derived caches; the caller commits the session"""
+    global _cached_version
+
+    session.execute(text(SEED_CATALOG_VERSION_SQL))
+    session.execute(text(BUMP_CATALOG_VERSION_SQL))
+    with _version_lock:
+        _cached_version = None
+
+
+def normalize_filter_key(args: Dict[str, Any], *names: str) -> tuple:
+    """Build a cache key from filter params, ignoring case, padding and empty values"""
+    key = []
+    for name in sorted(names):
+        value = args.get(name)
+        if isinstance(value, str):
+            value = value.strip().lower()
+        if value in (None, ''):
+            continue
+        key.append((name, value))
+    return tuple(key)
+
+
+scholarship_query_cache = QueryCache(
+    max_entries=int(os.getenv('QUERY_CACHE_MAX_ENTRIES', '512')),
+    ttl_seconds=float(os.getenv('QUERY_CACHE_TTL_SECONDS', '60'))
+)
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.services.query_cache import QueryCache
+
+# The profile fields PUT /api/profile can change; any change re-fingerprints the user
+PROFILE_FIELDS = (
+    'full_name', 'state_of_origin', 'gender', 'religion', 'level_of_study',
+    'institution', 'course_of_study', 'academic_performance', 'skills_interests'
+)
+
+# Background recomputes run on this many threads, with at most
+# REVALIDATE_MAX_PENDING queued or running; more stale hits are served stale
+REVALIDATE_WORKERS = int(os.getenv('RECOMMENDATION_REVALIDATE_WORKERS', '2'))
+REVALIDATE_MAX_PENDING = int(os.getenv('RECOMMENDATION_REVALIDATE_MAX_PENDING', '32'))
+
+# A stale result younger than this is served without recomputing. The crawler
+# bumps the catalog version per item, so without it every visit during a crawl
+# would trigger a full recompute.
+REVALIDATE_INTERVAL_SECONDS = float(os.getenv('RECOMMENDATION_REVALIDATE_INTERVAL_SECONDS', '600'))
+
+
+def profile_fingerprint(user) -> str:
+    """Stable hash of the profile fields that feed matching"""
+    payload = json.dumps({field: getattr(user, field, None) for field in PROFILE_FIELDS}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class RecommendationCache:
+    """
+    Per-user recommendations keyed by profile fingerprint and catalog version.
+
+    - Same fingerprint and catalog version: served from cache.
+    - Same fingerprint, catalog moved on: the old result is served
+      immediately (stale-while-revalidate). Once it is older than
+      revalidate_interval, one background recompute is queued on a small
+      shared pool.
+    - Different fingerprint or invalidate(): recomputed before answering.
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl_seconds: float = 24 * 3600,
+                 revalidate_workers: int = REVALIDATE_WORKERS, max_pending: int = REVALIDATE_MAX_PENDING,
+                 revalidate_interval: float = REVALIDATE_INTERVAL_SECONDS):
+        self._entries = QueryCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._executor = None
+        self.revalidate_workers = revalidate_workers
+        self.max_pending = max_pending
+        self.revalidate_interval = revalidate_interval
+        self.stale_served = 0
+        self.revalidations = 0
+        self.revalidations_deferred = 0
+        self.invalidations = 0
+
+    def get(self, user_id: int, fingerprint: str, catalog_version: int) -> Tuple[Optional[List[Dict[str, Any]]], str]:
+        """(recommendations, status) where status is 'hit', 'stale' or 'miss'"""
+        entry = self._entries.get(user_id)
+        if entry is None or entry['fingerprint'] != fingerprint:
+            return None, 'miss'
+        if entry['catalog_version'] != catalog_version:
+            with self._lock:
+                self.stale_served += 1
+            return entry['recommendations'], 'stale'
+        return entry['recommendations'], 'hit'
+
+    def set(self, user_id: int, fingerprint: str, catalog_version: int, recommendations: List[Dict[str, Any]]) -> None:
+        self._entries.set(user_id, {
+            'fingerprint': fingerprint,
+            'catalog_version': catalog_version,
+            'recommendations': recommendations,
+            'computed_at': time.time()
+        })
+
+    def invalidate(self, user_id: int) -> None:
+        self._entries.delete(user_id)
+        with self._lock:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def revalidate_async(self, user_id: int, recompute: Callable[[], None]) -> bool:
+        """
+        Queue recompute on the shared pool, unless one is already queued for
+        this user, the cached result is younger than revalidate_interval, or
+        max_pending recomputes are already waiting
+        """
+        entry = self._entries.peek(user_id)
+        with self._lock:
+            if user_id in self._refreshing:
+                return False
+            recent = entry is not None and time.time() - entry['computed_at'] < self.revalidate_interval
+            if recent or len(self._refreshing) >= self.max_pending:
+                self.revalidations_deferred += 1
+                return False
+            self._refreshing.add(user_id)
+            self.revalidations += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.revalidate_workers,
+                                                    thread_name_prefix='revalidate-recommendations')
+            executor = self._executor
+
+        def run():
+            try:
+                recompute()
+            except Exception as e:
+                print(f"Error revalidating recommendations for user {user_id}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(user_id)
+
+        executor.submit(run)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            extra = {
+                'stale_served': self.stale_served,
+                'revalidations': self.revalidations,
+                'revalidations_deferred': self.revalidations_deferred,
+                'invalidations': self.invalidations,
+                'refreshing': len(self._refreshing)
+            }
+        return {**self._entries.stats(), **extra}
+
+
+recommendation_cache = RecommendationCache(
+    max_entries=int(os.getenv('RECOMMENDATION_CACHE_MAX_ENTRIES', '2048')),
+    ttl_seconds=float(os.getenv('RECOMMENDATION_CACHE_TTL_SECONDS', str(24 * 3600)))
+)
@@ -0,0 +1,282 @@
+"""
+Saved searches evaluated against new scholarships (percolation).
+
+Instead of re-running every saved query when scholarships arrive, each
+search's facet predicates are stored in an inverted index
+(saved_search_term). A new scholarship's facet values look up only the
+searches that mention them, and a search matches when every facet it
+constrains was hit. Free-text queries are embedded once, when the search
+is saved, into a small vector index of their own (saved_query_index). A
+batch embeds only its new scholarships: query-only searches are found by
+scoring those vectors against the saved-query matrix, and faceted searches
+with a query reuse their stored vector. Only the searches that matched are
+loaded from the database, and no saved query is re-embedded per batch.
+"""
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import and_, delete, insert, or_, select
+
+from src.models.notification import Notification
+from src.models.saved_search import SavedSearch
+from src.models.saved_search_term import SavedSearchTerm
+from src.services.facets import extract_facets
+from src.services.semantic_index import DEFAULT_INDEX_DIR, SemanticIndex, scholarship_text, semantic_index
+
+# Cosine cut-off for a saved query when the search doesn't set its own
+SAVED_SEARCH_MIN_SCORE = float(os.getenv('SAVED_SEARCH_MIN_SCORE', '0.3'))
+
+# Lowest cut-off a saved search may set; the saved-query index is searched down to it
+SAVED_SEARCH_SCORE_FLOOR = float(os.getenv('SAVED_SEARCH_SCORE_FLOOR', '0.1'))
+
+# Query-only searches considered per new scholarship, best scoring first
+SAVED_QUERY_MATCH_LIMIT = int(os.getenv('SAVED_QUERY_MATCH_LIMIT', '1000'))
+
+# New scholarships the crawler buffers before percolating them together
+PERCOLATE_BATCH_SIZE = int(os.getenv('PERCOLATE_BATCH_SIZE', '50'))
+
+DEFAULT_SAVED_QUERY_INDEX_DIR = os.path.join(os.path.dirname(DEFAULT_INDEX_DIR), 'saved_query_embeddings')
+
+_saved_query_index: Optional[SemanticIndex] = None
+_saved_query_index_lock = threading.Lock()
+
+
+def _saved_query_text(record: Dict[str, Any]) -> str:
+    return record.get('query_text') or ''
+
+
+def get_saved_query_index() -> SemanticIndex:
+    """Vectors of saved-search queries keyed by saved search id, sharing the scholarship embedder"""
+    global _saved_query_index
+    with _saved_query_index_lock:
+        if _saved_query_index is None:
+            _saved_query_index = SemanticIndex(
+                index_dir=os.getenv('SAVED_QUERY_INDEX_DIR', DEFAULT_SAVED_QUERY_INDEX_DIR),
+                embedder=semantic_index.embedder,
+                text_of=_saved_query_text
+            )
+        return _saved_query_index
+
+
+def index_saved_query(saved_search_id: int, query_text: Optional[str]) -> None:
+    """Embed a saved search's query once; a search without one (or deleted) gets a zero row that never matches"""
+    index = get_saved_query_index()
+    if query_text:
+        index.upsert(saved_search_id, {'query_text': query_text})
+    elif index.vector_for(saved_search_id) is not None:
+        index.upsert_vector(saved_search_id, np.zeros(index.embedder.dim, dtype=np.float32))
+
+
+def ensure_saved_query_index(connection) -> SemanticIndex:
+    """The saved-query index, built from the saved_search table if missing or made by another embedder"""
+    index = get_saved_query_index()
+    if index.is_built():
+        return index
+    with index.write_lock():
+        if not index.is_built():
+            searches = SavedSearch.__table__
+            rows = connection.execute(
+                select(searches.c.id, searches.c.query_text)
+                .where(searches.c.is_active.is_(True))
+                .where(searches.c.query_text.isnot(None))
+                .order_by(searches.c.id)
+            ).mappings().all()
+            index.build({'id': row['id'], 'query_text': row['query_text']} for row in rows)
+    return index
+
+
+def sync_saved_search_terms(connection, saved_search_id: int, filters: Dict[str, List[str]]) -> None:
+    """Replace a saved search's indexed predicates; runs inside the caller's transaction"""
+    table = SavedSearchTerm.__table__
+    connection.execute(delete(table).where(table.c.saved_search_id == saved_search_id))
+    rows = [
+        {'saved_search_id': saved_search_id, 'facet': facet, 'value': value}
+        for facet, values in filters.items()
+        for value in sorted(set(values))
+    ]
+    if rows:
+        connection.execute(insert(table), rows)
+
+
+def _facet_candidates(connection, facets_by_id: Dict[int, Dict[str, List[str]]]) -> Dict[int, List[Dict[str, Any]]]:
+    """Searches whose every facet predicate is met, per scholarship id"""
+    wanted: Dict[str, set] = {}
+    for facets in facets_by_id.values():
+        for facet, values in facets.items():
+            wanted.setdefault(facet, set()).update(values)
+    if not wanted:
+        return {}
+
+    terms = SavedSearchTerm.__table__
+    searches = SavedSearch.__table__
+    rows = connection.execute(
+        select(
+            terms.c.saved_search_id, terms.c.facet, terms.c.value,
+            searches.c.user_id, searches.c.name, searches.c.facet_count,
+            searches.c.query_text, searches.c.min_score
+        )
+        .join(searches, searches.c.id == terms.c.saved_search_id)
+        .where(searches.c.is_active.is_(True))
+        .where(or_(*[
+            and_(terms.c.facet == facet, terms.c.value.in_(sorted(values)))
+            for facet, values in wanted.items()
+        ]))
+    ).mappings().all()
+
+    # (facet, value) -> searches wanting it
+    postings: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for row in rows:
+        postings.setdefault((row['facet'], row['value']), []).append(row)
+
+    candidates = {}
+    for scholarship_id, facets in facets_by_id.items():
+        hit_facets: Dict[int, set] = {}
+        searches_hit: Dict[int, Dict[str, Any]] = {}
+        for facet, values in facets.items():
+            for value in values:
+                for row in postings.get((facet, value), ()):
+                    hit_facets.setdefault(row['saved_search_id'], set()).add(facet)
+                    searches_hit[row['saved_search_id']] = row
+        candidates[scholarship_id] = [
+            searches_hit[search_id] for search_id, hit in hit_facets.items()
+            if len(hit) == searches_hit[search_id]['facet_count']
+        ]
+    return candidates
+
+
+def _query_only_searches(connection, saved_search_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """The active query-only searches among saved_search_ids"""
+    saved_search_ids = sorted(set(saved_search_ids))
+    if not saved_search_ids:
+        return {}
+    searches = SavedSearch.__table__
+    rows = connection.execute(
+        select(
+            searches.c.id.label('saved_search_id'), searches.c.user_id, searches.c.name,
+            searches.c.facet_count, searches.c.query_text, searches.c.min_score
+        )
+        .where(searches.c.id.in_(saved_search_ids))
+        .where(searches.c.is_active.is_(True))
+        .where(searches.c.facet_count == 0)
+        .where(searches.c.query_text.isnot(None))
+    ).mappings().all()
+    return {row['saved_search_id']: dict(row) for row in rows}
+
+
+def percolate(connection, scholarships: Iterable[Tuple[int, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Match new scholarships against all saved searches.
+
+    scholarships holds (id, record) pairs as written by the crawler or the
+    API. Returns one dict per (saved search, scholarship) match.
+    """
+    records = dict(scholarships)
+    if not records:
+        return []
+
+    candidates = _facet_candidates(connection, {
+        scholarship_id: extract_facets(record) for scholarship_id, record in records.items()
+    })
+
+    # The new rows are the only thing embedded per batch
+    ids = list(records)
+    embedded = semantic_index.embedder.embed([scholarship_text(records[scholarship_id]) for scholarship_id in ids])
+    vectors = {scholarship_id: np.asarray(embedded[row]) for row, scholarship_id in enumerate(ids)}
+    query_index = ensure_saved_query_index(connection)
+
+    # (scholarship id, saved search id) -> cosine score
+    scores: Dict[Tuple[int, int], float] = {}
+
+    # Query-only searches: nearest saved queries to each new row, then load just those searches
+    hits = {
+        scholarship_id: query_index.search_vector(vector, limit=SAVED_QUERY_MATCH_LIMIT,
+                                                  min_score=SAVED_SEARCH_SCORE_FLOOR)
+        for scholarship_id, vector in vectors.items()
+    }
+    query_only = _query_only_searches(connection, (search_id for matched in hits.values() for search_id, _ in matched))
+    for scholarship_id, matched in hits.items():
+        for search_id, score in matched:
+            if search_id in query_only:
+                candidates.setdefault(scholarship_id, []).append(query_only[search_id])
+                scores[(scholarship_id, search_id)] = score
+
+    # Faceted searches with a query: score against their stored vectors
+    query_vectors: Dict[int, Optional[np.ndarray]] = {}
+    for scholarship_id, matched in candidates.items():
+        for search in matched:
+            search_id = search['saved_search_id']
+            if not search['query_text'] or (scholarship_id, search_id) in scores:
+                continue
+            if search_id not in query_vectors:
+                query_vectors[search_id] = query_index.vector_for(search_id)
+                if query_vectors[search_id] is None:
+                    # Saved before its query was indexed; index it now so this happens once
+                    index_saved_query(search_id, search['query_text'])
+                    query_vectors[search_id] = query_index.vector_for(search_id)
+            if query_vectors[search_id] is not None:
+                scores[(scholarship_id, search_id)] = float(vectors[scholarship_id] @ query_vectors[search_id])
+
+    matches = []
+    for scholarship_id, matched in candidates.items():
+        for search in matched:
+            if search['query_text']:
+                threshold = search['min_score'] if search['min_score'] is not None else SAVED_SEARCH_MIN_SCORE
+                if scores.get((scholarship_id, search['saved_search_id']), 0.0) < threshold:
+                    continue
+            matches.append({
+                'saved_search_id': search['saved_search_id'],
+                'user_id': search['user_id'],
+                'search_name': search['name'],
+                'scholarship_id': scholarship_id,
+                'title': records[scholarship_id].get('title')
+            })
+    return matches
+
+
+def notify(connection, matches: List[Dict[str, Any]]) -> int:
+    """Insert one notification per new match in a single batch; returns how many were created"""
+    if not matches:
+        return 0
+
+    table = Notification.__table__
+    existing = set(connection.execute(
+        select(table.c.saved_search_id, table.c.scholarship_id)
+        .where(table.c.scholarship_id.in_({match['scholarship_id'] for match in matches}))
+        .where(table.c.saved_search_id.in_({match['saved_search_id'] for match in matches}))
+    ).tuples())
+
+    rows = []
+    for match in matches:
+        key = (match['saved_search_id'], match['scholarship_id'])
+        if key in existing:
+            continue
+        existing.add(key)
+        rows.append({
+            'user_id': match['user_id'],
+            'saved_search_id': match['saved_search_id'],
+            'scholarship_id': match['scholarship_id'],
+            'message': f"New scholarship for \"{match['search_name']}\": {match['title'] or 'Untitled'}"[:500],
+            'is_read': False
+        })
+    if rows:
+        connection.execute(insert(table), rows)
+    return len(rows)
+
+
+def percolate_and_notify(connection, scholarships: Iterable[Tuple[int, Dict[str, Any]]]) -> int:
+    return notify(connection, percolate(connection, scholarships))
+
+
+def saved_search_to_dict(search: SavedSearch) -> Dict[str, Any]:
+    return {
+        'id': search.id,
+        'name': search.name,
+        'filters': json.loads(search.filters) if search.filters else {},
+        'query': search.query_text,
+        'min_score': search.min_score,
+        'is_active': search.is_active,
+        'created_at': search.created_at.isoformat() if search.created_at else None
+    }
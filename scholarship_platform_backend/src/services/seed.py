@@ -0,0 +1,280 @@
+"""
+Synthetic users, scholarships and applications for scale testing.
+
+Text is varied the way spider output is (mixed deadline formats, country
+aliases, combined level and field lists), and every derived table the
+writers maintain (facets, constraints, deadline_date) is filled too, so
+filters, matching and the digest behave as they would in production.
+Rows are written with multi-row INSERTs in chunks, and the password hash
+is computed once and shared, so a million rows take seconds to minutes.
+"""
+import datetime
+import os
+import random
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import func, insert, select, text
+from werkzeug.security import generate_password_hash
+
+from src.models.application import Application
+from src.models.scholarship import Scholarship
+from src.models.scholarship_constraint import ScholarshipConstraint
+from src.models.scholarship_facet import ScholarshipFacet
+from src.models.user import User
+from src.services.deadlines import parse_deadline
+from src.services.eligibility import compile_constraints
+from src.services.facets import extract_facets
+from src.services.query_cache import bump_catalog_version
+
+# Every seeded account shares this password; emails are seed-user-<n>@<domain>
+SEED_PASSWORD = os.getenv('SEED_PASSWORD', 'password123')
+SEED_EMAIL_DOMAIN = os.getenv('SEED_EMAIL_DOMAIN', 'seed.scholarsync.test')
+SEED_SOURCE_WEBSITE = 'seed'
+
+# Preset scales: users, scholarships, applications per user
+SCALES = {
+    '1k': (1_000, 200, 5),
+    '10k': (10_000, 2_000, 5),
+    '100k': (100_000, 20_000, 5),
+    '1m': (1_000_000, 100_000, 5),
+}
+
+CHUNK_SIZE = int(os.getenv('SEED_CHUNK_SIZE', '5000'))
+
+FIRST_NAMES = ['Adaeze', 'Chinedu', 'Fatima', 'Ibrahim', 'Ngozi', 'Oluwaseun', 'Tunde', 'Aisha', 'Emeka', 'Zainab',
+               'Kelechi', 'Funmilayo', 'Musa', 'Chiamaka', 'Yusuf', 'Blessing', 'Segun', 'Halima', 'Obinna', 'Temitope']
+LAST_NAMES = ['Okafor', 'Adeyemi', 'Bello', 'Eze', 'Ibrahim', 'Okonkwo', 'Abubakar', 'Balogun', 'Nwosu', 'Danjuma',
+              'Ogunleye', 'Umar', 'Chukwu', 'Afolabi', 'Garba', 'Nnamdi', 'Ajayi', 'Lawal', 'Obi', 'Yakubu']
+STATES = ['Lagos', 'Kano', 'Rivers', 'Oyo', 'Enugu', 'Kaduna', 'Anambra', 'Abuja FCT', 'Delta', 'Ogun', 'Borno', 'Imo']
+INSTITUTIONS = ['University of Lagos', 'University of Ibadan', 'Ahmadu Bello University', 'University of Nigeria, Nsukka',
+                'Obafemi Awolowo University', 'Covenant University', 'Federal University of Technology, Akure',
+                'University of Benin', 'Lagos State University', 'Bayero University Kano']
+COURSES = ['Computer Science', 'Medicine and Surgery', 'Law', 'Mechanical Engineering', 'Economics', 'Accounting',
+           'Microbiology', 'Mass Communication', 'Agricultural Science', 'Architecture', 'Electrical Engineering',
+           'Pharmacy', 'Political Science', 'Mathematics', 'Civil Engineering', 'Nursing']
+STUDENT_LEVELS = ['100 Level', '200 Level', '300 Level', '400 Level', '500 Level', 'Graduate', 'Masters', 'PhD']
+GRADES = ['4.50/5.0', '3.8', '3.2 CGPA', 'First Class', 'Second Class Upper', '2:1', '3.5/4', '4.1', '2.9', '']
+SKILLS = ['python', 'data analysis', 'research', 'leadership', 'public speaking', 'machine learning', 'volunteering',
+          'writing', 'entrepreneurship', 'robotics', 'community health', 'renewable energy', 'design', 'debate']
+
+PROVIDERS = ['Chevening', 'DAAD', 'Commonwealth Scholarship Commission', 'Mastercard Foundation', 'Fulbright',
+             'Erasmus Mundus', 'Gates Cambridge', 'MTN Foundation', 'NNPC/Total', 'Shell Nigeria', 'Rhodes Trust',
+             'Swedish Institute', 'Japanese Government (MEXT)', 'Australia Awards', 'African Union']
+COUNTRY_TEXT = ['UK', 'United Kingdom', 'USA', 'United States of America', 'Germany', 'Canada', 'Australia',
+                'Netherlands', 'Sweden', 'Japan', 'Nigeria', 'South Africa', 'UK, USA', 'Germany / France',
+                'Multiple countries', 'Worldwide', 'Kenya', 'Ghana', 'China', 'Switzerland']
+LEVEL_TEXT = ['Undergraduate', 'Masters', 'PhD', 'Postgraduate', "Bachelor's, Master's", 'MSc/PhD',
+              'Undergraduate and Masters', 'All levels', 'Postdoctoral', 'Masters, PhD', 'HND', 'BSc']
+FIELD_TEXT = ['Engineering', 'Computer Science', 'All fields', 'Medicine', 'Law', 'Business, Economics',
+              'STEM', 'Agriculture', 'Public Health', 'Computing / Information Technology', 'Social Sciences',
+              'Environmental Science', 'Education', 'Mathematics and Statistics', 'Journalism & Media']
+ELIGIBILITY_TEXT = [
+    'Open to citizens of Nigeria, Ghana and Kenya.',
+    'Applicants must be nationals of a Commonwealth country.',
+    'Open to women pursuing STEM degrees.',
+    'International students from developing countries are eligible.',
+    'Open to Nigerian students with a minimum CGPA of 3.5/5.',
+    'Applicants must hold a Second Class Upper degree or equivalent.',
+    'Open to all nationalities.',
+    'Candidates must be under 35 years of age and demonstrate leadership potential.',
+    'Citizens of African Union member states are eligible to apply.',
+    'Female applicants from sub-Saharan Africa are strongly encouraged.',
+]
+CGPA_TEXT = ['3.5/5.0', 'Minimum 2:1', 'First Class or Second Class Upper', '3.0 on a 4.0 scale', '70%', '', 'Not specified']
+AMOUNTS = ['Full tuition and monthly stipend', '$10,000 per year', '£18,000 stipend', '€1,200 per month',
+           'Fully funded', 'N500,000 one-off grant', 'Partial tuition waiver', 'Up to $50,000']
+DEADLINE_FORMATS = ['%Y-%m-%d', '%d %B %Y', '%B %d, %Y', '%d/%m/%Y', 'Deadline: %d %b %Y',
+                    'Applications close %d %B %Y', '%B %Y']
+UNDATED_DEADLINES = ['Rolling', 'Varies', 'Open all year', 'TBA']
+APPLICATION_STATUSES = ['Draft'] * 6 + ['Submitted'] * 2 + ['Under Review', 'Awaiting Result']
+
+
+def seed_email(number: int) -> str:
+    return f'seed-user-{number}@{SEED_EMAIL_DOMAIN}'
+
+
+def _deadline_text(rng: random.Random, today: datetime.date) -> str:
+    if rng.random() < 0.1:
+        return rng.choice(UNDATED_DEADLINES)
+    day = today + datetime.timedelta(days=rng.randint(-30, 365))
+    return day.strftime(rng.choice(DEADLINE_FORMATS))
+
+
+def _chunks(rows: Iterator[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _next_id(connection, table) -> int:
+    return (connection.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+
+
+def _sync_sequence(connection, table) -> None:
+    """Explicit ids don't advance PostgreSQL's serial sequence; move it past them"""
+    if connection.dialect.name == 'postgresql':
+        name = connection.dialect.identifier_preparer.format_table(table)
+        connection.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), (SELECT MAX(id) FROM {name}))"
+        ))
+
+
+def _user_rows(rng: random.Random, first_id: int, first_number: int, count: int,
+               password_hash: str) -> Iterator[Dict[str, Any]]:
+    now = datetime.datetime.utcnow()
+    for offset in range(count):
+        number = first_number + offset
+        yield {
+            'id': first_id + offset,
+            'full_name': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+            'email': seed_email(number),
+            'password_hash': password_hash,
+            'state_of_origin': rng.choice(STATES),
+            'gender': rng.choice(['Male', 'Female']),
+            'religion': rng.choice(['Christianity', 'Islam', None]),
+            'level_of_study': rng.choice(STUDENT_LEVELS),
+            'institution': rng.choice(INSTITUTIONS),
+            'course_of_study': rng.choice(COURSES),
+            'academic_performance': rng.choice(GRADES),
+            'skills_interests': ', '.join(rng.sample(SKILLS, rng.randint(1, 4))),
+            'is_admin': False,
+            'created_at': now
+        }
+
+
+def _scholarship_rows(rng: random.Random, first_id: int, count: int, run_tag: str) -> Iterator[Dict[str, Any]]:
+    today = datetime.date.today()
+    for scholarship_id in range(first_id, first_id + count):
+        provider = rng.choice(PROVIDERS)
+        field = rng.choice(FIELD_TEXT)
+        level = rng.choice(LEVEL_TEXT)
+        deadline = _deadline_text(rng, today)
+        yield {
+            'id': scholarship_id,
+            'title': f'{provider} {level} Scholarship in {field} {today.year + rng.randint(0, 1)}',
+            'description': f'The {provider} programme funds outstanding students in {field}. '
+                           + rng.choice(ELIGIBILITY_TEXT) + ' ' + rng.choice(AMOUNTS) + '.',
+            'provider_organization': provider,
+            'deadline': deadline,
+            'deadline_date': parse_deadline(deadline),
+            'country_info': rng.choice(COUNTRY_TEXT),
+            'level_of_study': level,
+            'field_of_study': field,
+            'eligibility': ' '.join(rng.sample(ELIGIBILITY_TEXT, rng.randint(1, 2))),
+            'academic_requirements': rng.choice(['Strong academic record', 'Good first degree', 'WAEC/NECO credits', '']),
+            'cgpa_requirements': rng.choice(CGPA_TEXT),
+            'amount_benefits': rng.choice(AMOUNTS),
+            'application_link': f'https://apply.example.org/{run_tag}/{scholarship_id}',
+            'contact_email': f'scholarships@{provider.split()[0].lower()}.example.org',
+            'keywords': '',
+            'source_url': f'https://seed.example.org/{run_tag}/{scholarship_id}',
+            'source_website': SEED_SOURCE_WEBSITE,
+            'extracted_date': datetime.datetime.utcnow().isoformat()
+        }
+
+
+def _derived_rows(records: List[Dict[str, Any]]):
+    facets, constraints = [], []
+    for record in records:
+        for facet, values in extract_facets(record).items():
+            facets.extend({'scholarship_id': record['id'], 'facet': facet, 'value': value} for value in values)
+        constraints.append({'scholarship_id': record['id'], **compile_constraints(record)})
+    return facets, constraints
+
+
+def sample_profiles(count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Seed-style user profiles without touching the database (for benchmarks)"""
+    return list(_user_rows(random.Random(seed), 1, 1, count, password_hash=''))
+
+
+def sample_scholarships(count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Seed-style scholarship records without touching the database (for benchmarks)"""
+    return list(_scholarship_rows(random.Random(seed), 1, count, run_tag=str(seed)))
+
+
+def seed_database(engine, users: int, scholarships: int, applications_per_user: int = 5,
+                  seed: int = 42, chunk_size: int = CHUNK_SIZE,
+                  report: Optional[Callable[[str], None]] = print) -> Dict[str, Any]:
+    """
+    Append synthetic rows to the database behind engine; safe to run on a
+    database that already has data. Returns row counts and timings.
+    """
+    rng = random.Random(seed)
+    report = report or (lambda message: None)
+    timings = {}
+    run_tag = f'{seed}-{int(time.time())}'
+    password_hash = generate_password_hash(SEED_PASSWORD)
+
+    started = time.perf_counter()
+    scholarship_table = Scholarship.__table__
+    with engine.begin() as connection:
+        first_id = _next_id(connection, scholarship_table)
+    for chunk in _chunks(_scholarship_rows(rng, first_id, scholarships, run_tag), chunk_size):
+        facets, constraints = _derived_rows(chunk)
+        with engine.begin() as connection:
+            connection.execute(insert(scholarship_table), chunk)
+            if facets:
+                connection.execute(insert(ScholarshipFacet.__table__), facets)
+            connection.execute(insert(ScholarshipConstraint.__table__), constraints)
+    with engine.begin() as connection:
+        _sync_sequence(connection, scholarship_table)
+        bump_catalog_version(connection)
+    timings['scholarships'] = round(time.perf_counter() - started, 3)
+    report(f"Seeded {scholarships} scholarships in {timings['scholarships']}s")
+
+    started = time.perf_counter()
+    user_table = User.__table__
+    with engine.begin() as connection:
+        first_user_id = _next_id(connection, user_table)
+        # Continue the email numbering of earlier seed runs
+        first_number = connection.execute(
+            select(func.count()).select_from(user_table).where(user_table.c.email.like(f'seed-user-%@{SEED_EMAIL_DOMAIN}'))
+        ).scalar() + 1
+    for chunk in _chunks(_user_rows(rng, first_user_id, first_number, users, password_hash), chunk_size):
+        with engine.begin() as connection:
+            connection.execute(insert(user_table), chunk)
+    with engine.begin() as connection:
+        _sync_sequence(connection, user_table)
+    timings['users'] = round(time.perf_counter() - started, 3)
+    report(f"Seeded {users} users in {timings['users']}s (password: {SEED_PASSWORD})")
+
+    started = time.perf_counter()
+    scholarship_ids = range(first_id, first_id + scholarships)
+    per_user = min(applications_per_user, scholarships)
+    now = datetime.datetime.utcnow()
+
+    def application_rows():
+        for user_id in range(first_user_id, first_user_id + users):
+            for scholarship_id in rng.sample(scholarship_ids, per_user):
+                status = rng.choice(APPLICATION_STATUSES)
+                yield {
+                    'user_id': user_id,
+                    'scholarship_id': scholarship_id,
+                    'status': status,
+                    'applied_date': now - datetime.timedelta(days=rng.randint(0, 60)) if status != 'Draft' else None,
+                    'match_percentage': float(rng.randint(31, 98)),
+                    'created_at': now
+                }
+
+    applications = 0
+    for chunk in _chunks(application_rows(), chunk_size):
+        with engine.begin() as connection:
+            connection.execute(insert(Application.__table__), chunk)
+        applications += len(chunk)
+    timings['applications'] = round(time.perf_counter() - started, 3)
+    report(f"Seeded {applications} applications in {timings['applications']}s")
+
+    return {
+        'users': users,
+        'scholarships': scholarships,
+        'applications': applications,
+        'first_user_email': seed_email(first_number),
+        'password': SEED_PASSWORD,
+        'seconds': timings
+    }
@@ -0,0 +1,391 @@
+import json
+import os
+import re
+import sys
+import threading
+import uuid
+import zlib
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Not on Windows; writers there must not run concurrently
+    fcntl = None
+
+try:
+    from sentence_transformers import SentenceTransformer  # type: ignore
+except ImportError:
+    SentenceTransformer = None
+
+DEFAULT_INDEX_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'embeddings')
+HASHED_DIM = int(os.getenv('EMBEDDING_DIM', '512'))
+
+# Scholarship columns that make up the embedded text
+EMBEDDED_COLUMNS = ('title', 'description', 'eligibility')
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    'a an and are as at be by for from in is it of on or that the this to with who will your you'.split()
+)
+
+
+def get_index_dir():
+    """Directory holding the embedding matrix, overridable with EMBEDDING_INDEX_DIR"""
+    return os.getenv('EMBEDDING_INDEX_DIR', DEFAULT_INDEX_DIR)
+
+
+def scholarship_text(record: Dict[str, Any]) -> str:
+    """Text embedded for a scholarship: title, description and eligibility"""
+    return ' '.join(str(record.get(column) or '') for column in EMBEDDED_COLUMNS)
+
+
+class HashedEmbedder:
+    """
+    Dependency-free fallback: signed feature hashing of unigrams and bigrams
+    with sublinear term frequency, L2-normalized. Deterministic across
+    processes, so vectors written by the crawler match the API's queries.
+    """
+    name = 'hashed'
+
+    def __init__(self, dim: int = HASHED_DIM):
+        self.dim = dim
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+            features = tokens + [f'{a}_{b}' for a, b in zip(tokens, tokens[1:])]
+            counts: Dict[str, int] = {}
+            for feature in features:
+                counts[feature] = counts.get(feature, 0) + 1
+            for feature, count in counts.items():
+                digest = zlib.crc32(feature.encode('utf-8'))
+                sign = 1.0 if digest & 0x80000000 else -1.0
+                vectors[row, digest % self.dim] += sign * (1.0 + np.log(count))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+class SentenceTransformerEmbedder:
+    """Local CPU sentence-transformers model, used when EMBEDDING_MODEL is set and installed"""
+
+    def __init__(self, model_name: str):
+        self.name = f'st:{model_name}'
+        self.model = SentenceTransformer(model_name, device='cpu')
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(texts, normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+
+
+def get_embedder():
+    model_name = os.getenv('EMBEDDING_MODEL')
+    if model_name and SentenceTransformer is not None:
+        return SentenceTransformerEmbedder(model_name)
+    return HashedEmbedder()
+
+
+class SemanticIndex:
+    """
+    Brute-force cosine search over a float32 matrix stored on disk.
+
+    vectors.f32 holds one row per scholarship and ids.i64 the matching
+    scholarship ids; both are append-only raw arrays that readers
+    memory-map, so appends from the crawler show up in API workers without
+    a rebuild. Re-embedded rows are overwritten in place.
+
+    The crawler, API workers and CLI all write the same files, so every
+    write (append, overwrite, rebuild) holds an exclusive flock on .lock in
+    the index directory. Readers take no lock.
+    """
+
+    def __init__(self, index_dir: Optional[str] = None, embedder=None,
+                 text_of: Callable[[Dict[str, Any]], str] = scholarship_text):
+        self.index_dir = index_dir or get_index_dir()
+        self._embedder = embedder
+        # Text embedded for a record; saved-query vectors use the same class with their own
+        self.text_of = text_of
+        self._lock = threading.RLock()
+        self._write_lock = threading.RLock()
+        self._write_depth = 0
+        self._lock_file = None
+        self._vectors = None
+        self._ids = None
+        self._positions: Optional[Dict[int, int]] = None
+        self._loaded_rows = -1
+        self._generation = None
+
+    @property
+    def embedder(self):
+        if self._embedder is None:
+            self._embedder = get_embedder()
+        return self._embedder
+
+    @property
+    def vectors_path(self):
+        return os.path.join(self.index_dir, 'vectors.f32')
+
+    @property
+    def ids_path(self):
+        return os.path.join(self.index_dir, 'ids.i64')
+
+    @property
+    def meta_path(self):
+        return os.path.join(self.index_dir, 'meta.json')
+
+    @property
+    def lock_path(self):
+        return os.path.join(self.index_dir, '.lock')
+
+    def _tmp_path(self, path: str) -> str:
+        # Unique per process, so concurrent writers never share a temp file
+        return f'{path}.{os.getpid()}.tmp'
+
+    @contextmanager
+    def write_lock(self):
+        """Exclusive across threads and processes; re-entrant within a thread"""
+        with self._write_lock:
+            if self._write_depth == 0:
+                os.makedirs(self.index_dir, exist_ok=True)
+                self._lock_file = open(self.lock_path, 'a')
+                if fcntl is not None:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            self._write_depth += 1
+            try:
+                yield
+            finally:
+                self._write_depth -= 1
+                if self._write_depth == 0:
+                    if fcntl is not None:
+                        fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+                    self._lock_file.close()
+                    self._lock_file = None
+
+    def _read_meta(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _stored_rows(self, dim: int) -> int:
+        try:
+            vector_rows = os.path.getsize(self.vectors_path) // (4 * dim)
+            id_rows = os.path.getsize(self.ids_path) // 8
+        except OSError:
+            return 0
+        # A concurrent append may have written the vector but not yet the id
+        return min(vector_rows, id_rows)
+
+    def _refresh(self) -> bool:
+        """Re-map the files if another process appended rows; False if there is no usable index"""
+        meta = self._read_meta()
+        if not meta or meta.get('embedder') != self.embedder.name or meta.get('dim') != self.embedder.dim:
+            self._vectors, self._ids, self._positions, self._loaded_rows = None, None, None, -1
+            return False
+
+        if meta.get('generation') != self._generation:
+            self._generation = meta.get('generation')
+            self._loaded_rows = -1
+
+        rows = self._stored_rows(meta['dim'])
+        if rows != self._loaded_rows:
+            if rows == 0:
+                self._vectors = np.zeros((0, meta['dim']), dtype=np.float32)
+                self._ids = np.zeros(0, dtype=np.int64)
+            else:
+                self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(rows, meta['dim']))
+                self._ids = np.memmap(self.ids_path, dtype=np.int64, mode='r', shape=(rows,))
+            self._positions = None
+            self._loaded_rows = rows
+        return True
+
+    @property
+    def positions(self) -> Dict[int, int]:
+        """scholarship id -> row, built on first use (only writers and lookups need it)"""
+        if self._positions is None:
+            self._positions = {int(scholarship_id): row for row, scholarship_id in enumerate(self._ids)}
+        return self._positions
+
+    def is_built(self) -> bool:
+        with self._lock:
+            return self._refresh()
+
+    def build(self, records: Iterable[Dict[str, Any]], batch_size: int = 256) -> int:
+        """
+        Rebuild the index from scratch, e.g. from iter_catalog(EMBEDDED_COLUMNS).
+        Holds the write lock throughout, so no upsert lands in the files being replaced.
+        """
+        with self.write_lock():
+            tmp_vectors, tmp_ids = self._tmp_path(self.vectors_path), self._tmp_path(self.ids_path)
+            count = 0
+            try:
+                with open(tmp_vectors, 'wb') as vectors_file, open(tmp_ids, 'wb') as ids_file:
+                    batch = []
+                    for record in records:
+                        batch.append(record)
+                        if len(batch) >= batch_size:
+                            count += self._write_batch(batch, vectors_file, ids_file)
+                            batch = []
+                    if batch:
+                        count += self._write_batch(batch, vectors_file, ids_file)
+            except BaseException:
+                for path in (tmp_vectors, tmp_ids):
+                    if os.path.exists(path):
+                        os.remove(path)
+                raise
+
+            with self._lock:
+                os.replace(tmp_vectors, self.vectors_path)
+                os.replace(tmp_ids, self.ids_path)
+                self._write_meta()
+                self._loaded_rows = -1
+        return count
+
+    def _write_batch(self, batch, vectors_file, ids_file) -> int:
+        vectors = self.embedder.embed([self.text_of(record) for record in batch])
+        vectors_file.write(vectors.astype(np.float32).tobytes())
+        ids_file.write(np.array([record['id'] for record in batch], dtype=np.int64).tobytes())
+        return len(batch)
+
+    def _write_meta(self):
+        tmp_meta = self._tmp_path(self.meta_path)
+        with open(tmp_meta, 'w') as f:
+            # A new generation each time the files are started over, so snapshots can tell
+            # whether the rows they were built from are still a prefix of this index
+            json.dump({'embedder': self.embedder.name, 'dim': self.embedder.dim, 'generation': uuid.uuid4().hex}, f)
+        os.replace(tmp_meta, self.meta_path)
+
+    def upsert(self, scholarship_id: int, record: Dict[str, Any]) -> None:
+        """Embed one scholarship and append it, or overwrite its existing row"""
+        self.upsert_vector(scholarship_id, self.embedder.embed([self.text_of(record)])[0])
+
+    def upsert_vector(self, scholarship_id: int, vector: np.ndarray) -> None:
+        """Append an already embedded row, or overwrite the existing one for the id"""
+        vector = np.asarray(vector, dtype=np.float32)
+
+        with self.write_lock(), self._lock:
+            if not self._refresh():
+                # No index yet (or embedder changed): start a fresh one
+                open(self.vectors_path, 'wb').close()
+                open(self.ids_path, 'wb').close()
+                self._write_meta()
+                self._refresh()
+
+            row = self.positions.get(int(scholarship_id))
+            if row is not None:
+                with open(self.vectors_path, 'r+b') as f:
+                    f.seek(row * vector.nbytes)
+                    f.write(vector.tobytes())
+            else:
+                # Vector first, then id: readers only count rows that have both
+                with open(self.vectors_path, 'ab') as f:
+                    f.write(vector.tobytes())
+                with open(self.ids_path, 'ab') as f:
+                    f.write(np.int64(scholarship_id).tobytes())
+            self._refresh()
+
+    def vector_for(self, scholarship_id: int) -> Optional[np.ndarray]:
+        with self._lock:
+            if not self._refresh():
+                return None
+            row = self.positions.get(int(scholarship_id))
+            return None if row is None else np.array(self._vectors[row])
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray, Optional[str]]:
+        """(ids, vectors, generation) as currently stored, for snapshotting"""
+        with self._lock:
+            if not self._refresh() or self._loaded_rows <= 0:
+                return (np.zeros(0, dtype=np.int64), np.zeros((0, self.embedder.dim), dtype=np.float32),
+                        self._generation)
+            return self._ids, self._vectors, self._generation
+
+    def rows_after(self, generation: Optional[str], rows: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        (ids, vectors) appended after the first rows of generation, or None
+        when the index has been rebuilt since (or is not there)
+        """
+        with self._lock:
+            if not self._refresh() or generation is None or generation != self._generation:
+                return None
+            if self._loaded_rows <= rows:
+                return np.zeros(0, dtype=np.int64), np.zeros((0, self.embedder.dim), dtype=np.float32)
+            return self._ids[rows:], self._vectors[rows:]
+
+    def search_vector(self, query: np.ndarray, limit: int = 10, exclude: Iterable[int] = (),
+                      min_score: float = 0.0) -> List[Tuple[int, float]]:
+        """Top matches scoring above min_score as (scholarship_id, cosine score), best first"""
+        with self._lock:
+            if not self._refresh() or self._loaded_rows == 0:
+                return []
+            vectors, ids = self._vectors, self._ids
+
+        scores = vectors @ query.astype(np.float32)
+        exclude = set(int(i) for i in exclude)
+        wanted = min(len(scores), limit + len(exclude))
+        top = np.argpartition(-scores, wanted - 1)[:wanted]
+        top = top[np.argsort(-scores[top])]
+
+        results = []
+        for row in top:
+            if scores[row] <= min_score:
+                break
+            scholarship_id = int(ids[row])
+            if scholarship_id in exclude:
+                continue
+            results.append((scholarship_id, float(scores[row])))
+            if len(results) == limit:
+                break
+        return results
+
+    def search(self, text: str, limit: int = 10) -> List[Tuple[int, float]]:
+        return self.search_vector(self.embedder.embed([text])[0], limit=limit)
+
+
+semantic_index = SemanticIndex()
+
+
+def get_search_index():
+    """
+    Index that answers queries: the current memory-mapped snapshot plus any
+    rows the crawler or admins appended to the live index since it was
+    published, or the live index alone until a snapshot exists or when it
+    was rebuilt after the snapshot
+    """
+    from src.services.index_snapshot import MergedIndex, snapshot_store
+
+    snapshot = snapshot_store.current()
+    if snapshot is None or snapshot.manifest['embedder'] != semantic_index.embedder.name:
+        return semantic_index
+    if not semantic_index.is_built():
+        return snapshot
+
+    newer = semantic_index.rows_after(snapshot.manifest.get('live_generation'), snapshot.manifest.get('live_rows', 0))
+    if newer is None:
+        return semantic_index
+    if len(newer[0]) == 0:
+        return snapshot
+    return MergedIndex(snapshot, *newer)
+
+
+def ensure_semantic_index(session=None) -> None:
+    """Build the index and its first snapshot from the catalog if they don't exist yet"""
+    from src.database import db
+    from src.services.catalog_stream import iter_catalog
+    from src.services.index_snapshot import publish_snapshot, snapshot_store
+
+    session = session or db.session
+    if semantic_index.is_built() and snapshot_store.current() is not None:
+        return
+    # Workers booting together queue here; only the first one builds
+    with semantic_index.write_lock():
+        if not semantic_index.is_built():
+            count = semantic_index.build(iter_catalog(EMBEDDED_COLUMNS, session=session))
+            print(f"Built semantic index for {count} scholarships.", file=sys.stderr)
+            publish_snapshot(session)
+        elif snapshot_store.current() is None:
+            publish_snapshot(session)
@@ -0,0 +1,144 @@
+import re
+from typing import Dict, List
+
+# Canonical vocabulary for scholarship facets. Keys are the stored canonical
+# terms; values are the aliases (already lowercased) that resolve to them.
+# Countries include demonyms since eligibility text names nationalities.
+# An alias may resolve to several terms, e.g. "postgraduate".
+COUNTRIES = {
+    'united states': ['usa', 'u.s.a', 'u.s.a.', 'us', 'u.s', 'u.s.', 'united states', 'united states of america', 'america', 'american'],
+    'united kingdom': ['uk', 'u.k', 'u.k.', 'united kingdom', 'britain', 'great britain', 'england', 'scotland', 'wales', 'british'],
+    'canada': ['canada', 'canadian'],
+    'australia': ['australia', 'australian'],
+    'germany': ['germany', 'deutschland', 'german'],
+    'france': ['france', 'french'],
+    'netherlands': ['netherlands', 'the netherlands', 'holland', 'dutch'],
+    'sweden': ['sweden', 'swedish'],
+    'norway': ['norway', 'norwegian'],
+    'denmark': ['denmark', 'danish'],
+    'switzerland': ['switzerland', 'swiss'],
+    'japan': ['japan', 'japanese'],
+    'south korea': ['south korea', 'korea', 'republic of korea', 'korean'],
+    'singapore': ['singapore', 'singaporean'],
+    'china': ['china', "people's republic of china", 'prc', 'chinese'],
+    'india': ['india', 'indian'],
+    'south africa': ['south africa', 'rsa', 'south african'],
+    'kenya': ['kenya', 'kenyan'],
+    'nigeria': ['nigeria', 'naija', 'nigerian'],
+    'ghana': ['ghana', 'ghanaian'],
+    'rwanda': ['rwanda', 'rwandan'],
+    'uganda': ['uganda', 'ugandan'],
+    'tanzania': ['tanzania', 'tanzanian'],
+    'ethiopia': ['ethiopia', 'ethiopian'],
+}
+
+LEVELS = {
+    'undergraduate': ['undergraduate', 'undergrad', 'bachelor', 'bachelors', "bachelor's", 'bsc', 'b.sc', 'b.sc.', 'ba', 'b.a', 'first degree', 'hnd', 'ond'],
+    'masters': ['masters', 'master', "master's", 'msc', 'm.sc', 'm.sc.', 'ma', 'mba', 'mphil', 'postgraduate', 'graduate', 'postgraduate diploma'],
+    'phd': ['phd', 'ph.d', 'ph.d.', 'doctorate', 'doctoral', 'dphil', 'postgraduate', 'graduate'],
+    'postdoctoral': ['postdoc', 'postdoctoral', 'post-doctoral'],
+}
+
+FIELDS = {
+    'engineering': ['engineering'],
+    'computer science': ['computer science', 'computing', 'cs', 'information technology', 'it', 'software engineering', 'ict'],
+    'medicine': ['medicine', 'medical', 'mbbs', 'health sciences', 'health'],
+    'law': ['law', 'laws', 'llb', 'llm', 'legal studies'],
+    'business': ['business', 'business administration', 'management', 'mba', 'finance', 'accounting'],
+    'economics': ['economics'],
+    'mathematics': ['mathematics', 'maths', 'math', 'statistics'],
+    'physics': ['physics'],
+    'chemistry': ['chemistry'],
+    'biology': ['biology', 'biological sciences', 'life sciences'],
+    'psychology': ['psychology'],
+    'sociology': ['sociology', 'social sciences'],
+    'anthropology': ['anthropology'],
+    'history': ['history'],
+    'literature': ['literature', 'english literature', 'english'],
+    'arts': ['arts', 'fine arts', 'humanities', 'creative arts'],
+    'design': ['design'],
+    'architecture': ['architecture'],
+    'agriculture': ['agriculture', 'agricultural sciences', 'agronomy'],
+    'environmental science': ['environmental', 'environmental science', 'environmental studies', 'climate'],
+    'education': ['education'],
+    'journalism': ['journalism', 'media'],
+    'communications': ['communication', 'communications', 'mass communication'],
+}
+
+# Aliases that name something else after certain words: "Latin America" is
+# not the United States, nor "North Korea" South Korea. Inside free text they
+# are skipped after one of these words; an exact value still resolves.
+QUALIFIED_ALIASES = {
+    'country': {
+        'america': ('latin', 'south', 'central', 'north', 'meso'),
+        'american': ('latin', 'south', 'central', 'north', 'meso'),
+        'england': ('new',),
+        'korea': ('north',),
+        'korean': ('north',),
+    },
+}
+
+VOCABULARIES = {
+    'country': COUNTRIES,
+    'level': LEVELS,
+    'field': FIELDS,
+}
+
+
+def _build_alias_index(vocabulary: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    aliases = {}
+    for term, names in vocabulary.items():
+        for name in [term] + names:
+            terms = aliases.setdefault(name, [])
+            if term not in terms:
+                terms.append(term)
+    return aliases
+
+
+def _build_alias_pattern(aliases: Dict[str, List[str]]):
+    # Longest aliases first so "united states of america" wins over "america";
+    # whole-word boundaries so "law" never matches inside "lawyer". Two-letter
+    # aliases (us, it, ma, ...) are too ambiguous to look for inside free text.
+    names = sorted((name for name in aliases if len(name) > 2), key=len, reverse=True)
+    return re.compile(r'(?<![\w.])(' + '|'.join(re.escape(name) for name in names) + r')(?![\w])')
+
+
+ALIASES = {facet: _build_alias_index(vocabulary) for facet, vocabulary in VOCABULARIES.items()}
+ALIAS_PATTERNS = {facet: _build_alias_pattern(aliases) for facet, aliases in ALIASES.items()}
+
+
+def find_aliases(facet: str, text: str) -> List[str]:
+    """Known aliases of facet named as whole words in lowercased text, skipping qualified ones"""
+    qualified = QUALIFIED_ALIASES.get(facet, {})
+    found = []
+    for match in ALIAS_PATTERNS[facet].finditer(text):
+        alias = match.group(1)
+        if alias in qualified:
+            preceding = text[:match.start()].split()
+            if preceding and preceding[-1].strip('-') in qualified[alias]:
+                continue
+        found.append(alias)
+    return found
+
+
+def resolve_terms(facet: str, value: str) -> List[str]:
+    """
+    Resolve one normalized (lowercased) facet value to canonical terms.
+
+    An exact alias wins; otherwise known aliases are looked up as whole
+    words inside the value ("open to nigerian and ghanaian students" style
+    text). Values with no known alias are returned as-is, so the vocabulary
+    can grow without losing data.
+    """
+    aliases = ALIASES.get(facet)
+    if aliases is None:
+        return [value]
+    if value in aliases:
+        return list(aliases[value])
+
+    terms = []
+    for alias in find_aliases(facet, value):
+        for term in aliases[alias]:
+            if term not in terms:
+                terms.append(term)
+    return terms or [value]
@@ -0,0 +1,64 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, bindparam, or_, select
+
+
+def upsert(connection, table, rows: List[Dict[str, Any]], conflict_columns: Iterable[str],
+           update_columns: Iterable[str], extra_updates: Optional[Dict[str, Any]] = None):
+    """
+    Insert rows, updating update_columns on rows that collide on conflict_columns.
+
+    Uses INSERT ... ON CONFLICT DO UPDATE on SQLite and PostgreSQL and falls
+    back to one lookup plus batched UPDATE/INSERT for other dialects, so the
+    number of statements never depends on len(rows). extra_updates holds
+    values (e.g. func.current_timestamp()) applied only on the update path.
+    """
+    if not rows:
+        return
+
+    conflict_columns = list(conflict_columns)
+    update_columns = list(update_columns)
+    extra_updates = extra_updates or {}
+    dialect = connection.dialect.name
+
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+
+        stmt = insert(table)
+        set_ = {name: stmt.excluded[name] for name in update_columns}
+        set_.update(extra_updates)
+        stmt = stmt.on_conflict_do_update(index_elements=conflict_columns, set_=set_)
+        connection.execute(stmt, rows)
+        return
+
+    # Generic path: one lookup for all keys, then one batched UPDATE and one
+    # batched INSERT, all within the caller's transaction
+    key_of = lambda row: tuple(row[name] for name in conflict_columns)
+    key_clauses = [and_(*[table.c[name] == row[name] for name in conflict_columns]) for row in rows]
+    existing = {
+        tuple(found) for found in connection.execute(
+            select(*[table.c[name] for name in conflict_columns]).where(or_(*key_clauses))
+        )
+    }
+
+    updates = [row for row in rows if key_of(row) in existing]
+    inserts = [row for row in rows if key_of(row) not in existing]
+
+    if updates:
+        stmt = table.update().where(
+            and_(*[table.c[name] == bindparam(f'key_{name}') for name in conflict_columns])
+        ).values(
+            **{name: bindparam(f'val_{name}') for name in update_columns},
+            **extra_updates
+        )
+        connection.execute(stmt, [
+            {
+                **{f'key_{name}': row[name] for name in conflict_columns},
+                **{f'val_{name}': row.get(name) for name in update_columns}
+            } for row in updates
+        ])
+    if inserts:
+        connection.execute(table.insert(), inserts)
@@ -0,0 +1,61 @@
+"""
+Shared fixtures: a Flask app on a throwaway SQLite database seeded with
+synthetic data, and the local model backend so no test needs an API key.
+
+Run from scholarship_platform_backend with `python -m pytest -q`.
+"""
+import os
+import sys
+
+import pytest
+
+# Ensure project root is in sys.path, as src/main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SEED_USERS = 20
+SEED_SCHOLARSHIPS = 200
+SEED_APPLICATIONS_PER_USER = 5
+
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    # Everything the app writes goes under one temporary directory; set
+    # before create_app so module-level services pick it up
+    root = tmp_path_factory.mktemp('scholarsync')
+    os.environ.pop('DATABASE_URL', None)
+    os.environ.update({
+        'DATABASE_PATH': str(root / 'app.db'),
+        'EMBEDDING_INDEX_DIR': str(root / 'embeddings'),
+        'INDEX_SNAPSHOT_DIR': str(root / 'snapshots'),
+        'SAVED_QUERY_INDEX_DIR': str(root / 'saved_query_embeddings'),
+        'AI_RECORDING_DIR': str(root / 'recordings'),
+        'AI_BACKEND': 'local',
+    })
+
+    from flask import Flask
+    from src.database import db, init_db
+    from src.services.seed import seed_database
+
+    # Seed first so create_app finds a catalog and skips the initial scrape
+    seeder = Flask('seed')
+    init_db(seeder)
+    with seeder.app_context():
+        summary = seed_database(db.engine, users=SEED_USERS, scholarships=SEED_SCHOLARSHIPS,
+                                applications_per_user=SEED_APPLICATIONS_PER_USER, report=None)
+
+    from src.main import create_app
+
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SEED_SUMMARY'] = summary
+    return app
+
+
+@pytest.fixture
+def client(app):
+    """Test client logged in as the first seeded user"""
+    summary = app.config['SEED_SUMMARY']
+    client = app.test_client()
+    response = client.post('/api/auth/login', json={'email': summary['first_user_email'], 'password': summary['password']})
+    assert response.status_code == 200, response.get_json()
+    return client
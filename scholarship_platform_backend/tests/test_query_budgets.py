@@ -0,0 +1,64 @@
+"""
+Per-test SQL budgets for the hot endpoints, and the N+1 detection behind them.
+"""
+import pytest
+from sqlalchemy import select
+
+from src.database import db
+from src.models.application import Application
+from src.models.scholarship import Scholarship
+from src.services.query_budget import (ENDPOINT_BUDGETS, QueryBudgetExceeded, check_endpoint_budgets, query_budget,
+                                       statement_shape)
+
+
+@pytest.mark.parametrize('endpoint', [
+    'POST /api/ai/match-scholarships',
+    '/api/scholarships/suggested?limit=10',
+    '/api/applications/',
+])
+def test_endpoint_within_budget(app, client, endpoint):
+    with app.app_context():
+        [result] = check_endpoint_budgets(client, {endpoint: ENDPOINT_BUDGETS[endpoint]})
+    assert result['status'] == 200, result
+    assert result['error'] is None, result['error']
+
+
+def test_budgets_are_pinned():
+    # Raising one of these needs a reason in review, not just a green run
+    assert ENDPOINT_BUDGETS['POST /api/ai/match-scholarships'] == (4, 1)
+    assert ENDPOINT_BUDGETS['/api/scholarships/suggested?limit=10'] == (3, 1)
+    assert ENDPOINT_BUDGETS['/api/applications/'] == (2, 1)
+
+
+def test_n_plus_one_loop_raises(app):
+    with app.app_context():
+        applications = db.session.execute(select(Application).limit(10)).scalars().all()
+        db.session.expire_all()
+        with pytest.raises(QueryBudgetExceeded, match='possible N\\+1'):
+            with query_budget(max_repeats=3, label='n+1'):
+                # One scholarship lookup per application: the loop the detector exists for
+                for application in applications:
+                    db.session.execute(select(Scholarship.title).where(Scholarship.id == application.scholarship_id)).scalar()
+
+
+def test_statement_count_over_budget_raises(app):
+    with app.app_context():
+        with pytest.raises(QueryBudgetExceeded, match='3 statements, budget is 2'):
+            with query_budget(max_queries=2, max_repeats=None, label='count'):
+                for table in (Application, Scholarship, Application):
+                    db.session.execute(select(table.id).limit(1)).all()
+
+
+def test_joined_lookup_stays_within_budget(app):
+    with app.app_context():
+        with query_budget(max_queries=1, max_repeats=1) as recorder:
+            db.session.execute(
+                select(Application, Scholarship).join(Scholarship, Application.scholarship_id == Scholarship.id).limit(10)
+            ).all()
+    assert recorder.count == 1
+
+
+def test_statement_shape_ignores_literals_and_parameter_lists():
+    assert statement_shape("SELECT * FROM t WHERE id IN (?, ?, ?) AND name = 'x'") == \
+        statement_shape("select *  from t where id in (?) and name = 'yy'")
+    assert statement_shape('SELECT * FROM t WHERE id = 1') != statement_shape('SELECT * FROM u WHERE id = 1')
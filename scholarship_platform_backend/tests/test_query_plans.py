@@ -0,0 +1,102 @@
+"""
+The Application lookups behind the hot endpoints must be index searches,
+never table scans; checked with EXPLAIN QUERY PLAN on the statements the
+endpoints actually execute.
+"""
+import re
+
+from sqlalchemy import event, select
+from sqlalchemy.engine import Engine
+
+from src.database import db
+from src.models.application import Application
+from src.models.scholarship import Scholarship
+
+_APPLICATION_RE = re.compile(r'\bapplication\b', re.IGNORECASE)
+_INDEX_LOOKUP_RE = re.compile(r'^SEARCH application USING (INDEX|COVERING INDEX|INTEGER PRIMARY KEY)\b')
+
+
+def _application_statements(client, method, path, **kwargs):
+    """(statement, parameters) of every statement on the application table one request executes"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if _APPLICATION_RE.search(statement):
+            statements.append((statement, parameters[0] if executemany else parameters))
+
+    event.listen(Engine, 'before_cursor_execute', record)
+    try:
+        response = client.open(path, method=method, **kwargs)
+    finally:
+        event.remove(Engine, 'before_cursor_execute', record)
+    assert response.status_code < 400, response.get_json()
+    return statements
+
+
+def _plan(app, statement, parameters):
+    with app.app_context():
+        connection = db.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute('EXPLAIN QUERY PLAN ' + statement, parameters)
+            return [row[3] for row in cursor.fetchall()]
+        finally:
+            connection.close()
+
+
+def _assert_index_lookups(app, statements):
+    lookups = [(s, p) for s, p in statements if not s.lstrip().upper().startswith('INSERT')]
+    assert lookups, 'no application lookups were executed'
+    for statement, parameters in lookups:
+        plan = _plan(app, statement, parameters)
+        application_steps = [step for step in plan if step.split()[1:2] == ['application']]
+        assert not [step for step in application_steps if step.startswith('SCAN')], (statement, plan)
+        assert application_steps and all(_INDEX_LOOKUP_RE.match(step) for step in application_steps), (statement, plan)
+
+
+def _unused_scholarship_id(app, user_id):
+    with app.app_context():
+        applied = select(Application.scholarship_id).where(Application.user_id == user_id)
+        return db.session.execute(
+            select(Scholarship.id).where(Scholarship.id.not_in(applied)).limit(1)
+        ).scalar_one()
+
+
+def test_user_applications_use_index(app, client):
+    _assert_index_lookups(app, _application_statements(client, 'GET', '/api/applications/'))
+
+
+def test_suggested_scholarships_use_index(app, client):
+    _assert_index_lookups(app, _application_statements(client, 'GET', '/api/scholarships/suggested?limit=10'))
+
+
+def test_create_application_uses_index(app, client):
+    with client.session_transaction() as session:
+        user_id = session['user_id']
+    statements = _application_statements(client, 'POST', '/api/applications/',
+                                          json={'scholarship_id': _unused_scholarship_id(app, user_id)})
+    _assert_index_lookups(app, statements)
+
+
+def test_match_upsert_conflicts_on_unique_index(app, client):
+    statements = _application_statements(client, 'POST', '/api/ai/match-scholarships')
+    upserts = [(s, p) for s, p in statements if 'ON CONFLICT' in s.upper()]
+    assert upserts, 'match-scholarships saved no scores'
+
+    for statement, parameters in upserts:
+        plan = _plan(app, statement, parameters)
+        assert not [step for step in plan if step.startswith('SCAN application')], (statement, plan)
+
+    # ON CONFLICT (user_id, scholarship_id) resolves through the unique index
+    # on exactly those columns; without it SQLite rejects the statement
+    with app.app_context():
+        connection = db.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            unique = [row[1] for row in cursor.execute('PRAGMA index_list(application)').fetchall() if row[2]]
+            columns = {name: [row[2] for row in cursor.execute(f'PRAGMA index_info({name})').fetchall()]
+                       for name in unique}
+        finally:
+            connection.close()
+    assert ['user_id', 'scholarship_id'] in columns.values(), columns
+